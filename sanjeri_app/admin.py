@@ -11,6 +11,7 @@ from django.utils.html import format_html
 # from .models import Wallet, WalletTransaction
 from .models import Order, OrderItem
 from django.urls import reverse
+from django.db.models import Q
 from .models.wallet import Wallet, WalletTransaction
 from .models.offer_models import ProductOffer, CategoryOffer, OfferApplication
 
@@ -213,11 +214,25 @@ class OrderAdmin(admin.ModelAdmin):
     
     def approve_selected_returns(self, request, queryset):
         """Admin action to approve selected returns"""
+        from .services.wallet_service import WalletService
+        
+        requested = queryset.filter(return_status='requested')
+        
+        # Orders paid online need a Razorpay refund call each, so they keep
+        # going through approve_return(); the rest are approved in one batch
         approved_count = 0
-        for order in queryset.filter(return_status='requested'):
+        for order in requested.exclude(razorpay_payment_id__isnull=True).exclude(razorpay_payment_id=''):
             if order.approve_return(approved_by=request.user):
                 approved_count += 1
         
+        refund_ids = WalletTransaction.objects.filter(
+            order__in=requested.filter(Q(razorpay_payment_id__isnull=True) | Q(razorpay_payment_id='')),
+            transaction_type='REFUND',
+            status='PENDING'
+        ).values_list('id', flat=True)
+        results = WalletService.bulk_approve_refunds(refund_ids, request.user, approve_returns=True)
+        approved_count += len({r['order_number'] for r in results if r['success']})
+        
         self.message_user(
             request, 
             f"{approved_count} return request(s) approved and refunds processed."
@@ -318,15 +333,18 @@ class WalletTransactionAdmin(admin.ModelAdmin):
     
     def approve_refunds(self, request, queryset):
         """Approve selected refund transactions"""
+        from .services.wallet_service import WalletService
+        
         pending_refunds = queryset.filter(
             transaction_type='REFUND',
             status='PENDING'
         )
         
-        approved_count = 0
-        for transaction in pending_refunds:
-            if transaction.mark_as_completed(approved_by=request.user):
-                approved_count += 1
+        results = WalletService.bulk_approve_refunds(
+            pending_refunds.values_list('id', flat=True),
+            approved_by=request.user
+        )
+        approved_count = sum(1 for result in results if result['success'])
         
         self.message_user(request, f"{approved_count} refund(s) approved and processed.")
     
@@ -334,6 +352,8 @@ class WalletTransactionAdmin(admin.ModelAdmin):
     
     def mark_as_completed(self, request, queryset):
         """Mark selected transactions as completed"""
+        from .services.ledger_service import LedgerService
+        LedgerService.bump_for_transactions(queryset.values_list('pk', flat=True))
         updated_count = queryset.update(status='COMPLETED')
         self.message_user(request, f"{updated_count} transaction(s) marked as completed.")
     
@@ -341,6 +361,8 @@ class WalletTransactionAdmin(admin.ModelAdmin):
     
     def mark_as_failed(self, request, queryset):
         """Mark selected transactions as failed"""
+        from .services.ledger_service import LedgerService
+        LedgerService.bump_for_transactions(queryset.values_list('pk', flat=True))
         updated_count = queryset.update(status='FAILED')
         self.message_user(request, f"{updated_count} transaction(s) marked as failed.")
     
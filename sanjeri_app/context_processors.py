@@ -37,31 +37,19 @@ def wallet_balance(request):
 def cart_and_wishlist_context(request):
     """
     Consolidated context processor for both cart and wishlist
+    (read from the cached per-user header summary)
     """
     context = {}
     
     if request.user.is_authenticated:
         # Import inside function
-        from sanjeri_app.models.cart import Cart
-        from sanjeri_app.models.wishlist import Wishlist
-        
-        # Cart count
-        try:
-            cart = Cart.objects.get(user=request.user)
-            context['cart_item_count'] = cart.total_items
-            context['cart_items_count'] = cart.total_items
-        except Cart.DoesNotExist:
-            context['cart_item_count'] = 0
-            context['cart_items_count'] = 0
-        
-        # Wishlist count
-        try:
-            wishlist = Wishlist.objects.get(user=request.user)
-            context['wishlist_count'] = wishlist.total_items
-            context['wishlist_items_count'] = wishlist.total_items
-        except Wishlist.DoesNotExist:
-            context['wishlist_count'] = 0
-            context['wishlist_items_count'] = 0
+        from sanjeri_app.services.account_summary_service import AccountSummaryService
+
+        summary = AccountSummaryService.summary(request.user.pk)
+        context['cart_item_count'] = summary['cart_count']
+        context['cart_items_count'] = summary['cart_count']
+        context['wishlist_count'] = summary['wishlist_count']
+        context['wishlist_items_count'] = summary['wishlist_count']
     else:
         context['cart_item_count'] = 0
         context['cart_items_count'] = 0
@@ -3,9 +3,6 @@ from django import forms
 from django.forms import inlineformset_factory
 from django.core.exceptions import ValidationError
 from ..models import Product, ProductVariant, Category
-from PIL import Image
-from io import BytesIO
-from django.core.files.base import ContentFile
 import os
 
 class ProductForm(forms.ModelForm):
@@ -47,54 +44,6 @@ class ProductForm(forms.ModelForm):
                 
         return main_image
 
-    def save(self, commit=True):
-        instance = super().save(commit=False)
-        
-        # Process main image if provided
-        if 'main_image' in self.changed_data and self.cleaned_data['main_image']:
-            instance.main_image = self.process_image(
-                self.cleaned_data['main_image'], 
-                (800, 800),  # Target size for main image
-                'main'
-            )
-        
-        if commit:
-            instance.save()
-        return instance
-    
-    def process_image(self, image_file, target_size, image_type='main'):
-        """Process and optimize uploaded image"""
-        try:
-            # Open image
-            image = Image.open(image_file)
-            
-            # Convert to RGB if necessary
-            if image.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-                image = background
-            elif image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Calculate new dimensions while maintaining aspect ratio
-            image.thumbnail(target_size, Image.Resampling.LANCZOS)
-            
-            # Create optimized image
-            output = BytesIO()
-            image.save(output, format='JPEG', quality=85, optimize=True)
-            output.seek(0)
-            
-            # Create new file name
-            name = os.path.splitext(image_file.name)[0]
-            new_filename = f"{name}_optimized.jpg"
-            
-            return ContentFile(output.read(), new_filename)
-            
-        except Exception as e:
-            # If processing fails, return original image
-            print(f"Image processing error: {e}")
-            return image_file
-
 
 class ProductVariantForm(forms.ModelForm):
     DELETE = forms.BooleanField(
@@ -169,54 +118,6 @@ class ProductVariantForm(forms.ModelForm):
         
         return cleaned_data
 
-    def save(self, commit=True):
-        instance = super().save(commit=False)
-        
-        # Process variant image if provided
-        if 'variant_image' in self.changed_data and self.cleaned_data['variant_image']:
-            instance.variant_image = self.process_image(
-                self.cleaned_data['variant_image'], 
-                (600, 600),  # Target size for variant image
-                'variant'
-            )
-        
-        if commit:
-            instance.save()
-        return instance
-    
-    def process_image(self, image_file, target_size, image_type='variant'):
-        """Process and optimize uploaded image"""
-        try:
-            # Open image
-            image = Image.open(image_file)
-            
-            # Convert to RGB if necessary
-            if image.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-                image = background
-            elif image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Calculate new dimensions while maintaining aspect ratio
-            image.thumbnail(target_size, Image.Resampling.LANCZOS)
-            
-            # Create optimized image
-            output = BytesIO()
-            image.save(output, format='JPEG', quality=85, optimize=True)
-            output.seek(0)
-            
-            # Create new file name
-            name = os.path.splitext(image_file.name)[0]
-            new_filename = f"{name}_optimized.jpg"
-            
-            return ContentFile(output.read(), new_filename)
-            
-        except Exception as e:
-            # If processing fails, return original image
-            print(f"Image processing error: {e}")
-            return image_file
-
 
 # Formset for variants
 ProductVariantFormSet = inlineformset_factory(
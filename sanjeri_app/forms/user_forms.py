@@ -1,7 +1,7 @@
 # sanjay_app/user_forms.py
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
-from ..models import CustomUser
+from ..models import CustomUser, CustomerSegment
 
 class CustomUserCreationForm(UserCreationForm):
     confirm_password = forms.CharField(widget=forms.PasswordInput())
@@ -48,6 +48,16 @@ class UserFilterForm(forms.Form):
         ('0-1000', 'Below ₹1000'),
     ]
     
+    SEGMENT_CHOICES = [('', 'All Segments')] + CustomerSegment.SEGMENT_CHOICES + [('none', 'No Purchases')]
+    
+    SORT_CHOICES = [
+        ('', 'Newest First'),
+        ('segment', 'Segment'),
+        ('-spend', 'Total Spent: High to Low'),
+        ('-orders', 'Most Orders'),
+        ('-last_order', 'Most Recent Order'),
+    ]
+    
     PAYMENT_CHOICES = [
         ('', 'All Methods'),
         ('UPI', 'UPI'),
@@ -93,4 +103,16 @@ class UserFilterForm(forms.Form):
         choices=PAYMENT_CHOICES,
         required=False,
         widget=forms.Select(attrs={'class': 'form-select'})
-    )
\ No newline at end of file
+    )
+    
+    segment = forms.ChoiceField(
+        choices=SEGMENT_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    
+    sort = forms.ChoiceField(
+        choices=SORT_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
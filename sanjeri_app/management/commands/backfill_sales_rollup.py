@@ -0,0 +1,46 @@
+# sanjeri_app/management/commands/backfill_sales_rollup.py
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from sanjeri_app.models import Order
+from sanjeri_app.services.sales_rollup_service import SalesRollupService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild SalesDailyRollup rows from orders (whole history by default)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day to rebuild (YYYY-MM-DD), defaults to today')
+        parser.add_argument(
+            '--window-days',
+            type=int,
+            default=31,
+            help='Days rebuilt per transaction',
+        )
+
+    def parse_date(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        end_date = self.parse_date(options['end']) if options['end'] else timezone.localdate()
+
+        if options['start']:
+            start_date = self.parse_date(options['start'])
+        else:
+            first_order = Order.objects.aggregate(first=Min('created_at'))['first']
+            if first_order is None:
+                self.stdout.write('No orders to roll up')
+                return
+            start_date = timezone.localdate(first_order)
+
+        if start_date > end_date:
+            raise CommandError('--start must not be after --end')
+
+        self.stdout.write(f'Rebuilding sales rollup from {start_date} to {end_date}...')
+        rows = SalesRollupService.backfill(start_date, end_date, window_days=options['window_days'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {rows} rollup rows'))
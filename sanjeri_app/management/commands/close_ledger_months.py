@@ -0,0 +1,74 @@
+# sanjeri_app/management/commands/close_ledger_months.py
+from datetime import datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from sanjeri_app.models import Order, WalletTransaction, LedgerMonthlyClosing
+from sanjeri_app.services.ledger_service import LedgerService
+
+
+class Command(BaseCommand):
+    help = 'Store monthly ledger closing balances used as the ledger book opening balance'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='from_month', help='First month to close (YYYY-MM)')
+        parser.add_argument(
+            '--through',
+            help='Last month to close (YYYY-MM), defaults to the previous month',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recompute every month from the first ledger entry',
+        )
+
+    def parse_month(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise CommandError(f'Invalid month "{value}", expected YYYY-MM')
+
+    def first_month(self):
+        firsts = [
+            Order.objects.aggregate(first=Min('created_at'))['first'],
+            WalletTransaction.objects.aggregate(first=Min('created_at'))['first'],
+        ]
+        firsts = [first for first in firsts if first is not None]
+        if not firsts:
+            return None
+        return timezone.localdate(min(firsts)).replace(day=1)
+
+    def handle(self, *args, **options):
+        this_month = timezone.localdate().replace(day=1)
+        if options['through']:
+            through = self.parse_month(options['through'])
+        else:
+            through = (this_month - timedelta(days=1)).replace(day=1)
+
+        if through >= this_month:
+            raise CommandError('Only completed months can be closed')
+
+        if options['from_month']:
+            month = self.parse_month(options['from_month'])
+        else:
+            latest = LedgerMonthlyClosing.objects.order_by('-month').first()
+            if latest and not options['rebuild']:
+                month = LedgerService.next_month(latest.month)
+            else:
+                month = self.first_month()
+                if month is None:
+                    self.stdout.write('No ledger entries to close')
+                    return
+
+        closed = 0
+        while month <= through:
+            closing = LedgerService.close_month(month)
+            self.stdout.write(
+                f"{month.strftime('%b %Y')}: opening ₹{closing.opening_balance}, "
+                f"debit ₹{closing.total_debit}, credit ₹{closing.total_credit}, "
+                f"closing ₹{closing.closing_balance} ({closing.entry_count} entries)"
+            )
+            month = LedgerService.next_month(month)
+            closed += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Closed {closed} month(s)'))
@@ -0,0 +1,28 @@
+# sanjeri_app/management/commands/compute_customer_segments.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from sanjeri_app.models import CustomerSegment
+
+try:
+    from sanjeri_app.services.customer_segment_service import CustomerSegmentService
+except ImportError:  # NumPy is only needed for segmentation
+    CustomerSegmentService = None
+
+
+class Command(BaseCommand):
+    help = 'Recompute RFM customer segments from paid orders (run nightly from cron)'
+
+    def handle(self, *args, **options):
+        if CustomerSegmentService is None:
+            raise CommandError('compute_customer_segments needs NumPy: pip install numpy')
+
+        started = time.monotonic()
+        counts = CustomerSegmentService.compute()
+
+        labels = dict(CustomerSegment.SEGMENT_CHOICES)
+        for segment, _ in CustomerSegment.SEGMENT_CHOICES:
+            if counts.get(segment):
+                self.stdout.write(f"{labels[segment]}: {counts[segment]}")
+        self.stdout.write(self.style.SUCCESS(
+            f'Segmented {sum(counts.values())} customer(s) in {time.monotonic() - started:.1f}s'
+        ))
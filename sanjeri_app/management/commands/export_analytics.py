@@ -0,0 +1,54 @@
+# sanjeri_app/management/commands/export_analytics.py
+import os
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from sanjeri_app.utils.export_utils import EXPORT_CHUNK_SIZE
+
+try:
+    from sanjeri_app.services.analytics_export_service import AnalyticsExportService
+except ImportError:  # NumPy is only needed for analytics exports
+    AnalyticsExportService = None
+
+TABLE_NAMES = ['orders', 'order_items', 'offer_applications', 'wallet_transactions']
+
+
+class Command(BaseCommand):
+    help = 'Export orders, items, offer applications and wallet transactions as columnar .npy arrays'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help='Snapshot directory (default: BASE_DIR/analytics/<timestamp>)',
+        )
+        parser.add_argument(
+            '--table',
+            action='append',
+            dest='tables',
+            choices=TABLE_NAMES,
+            help='Only export this table (may be repeated)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Rows fetched from the database per round trip',
+        )
+
+    def handle(self, *args, **options):
+        if AnalyticsExportService is None:
+            raise CommandError('export_analytics needs NumPy: pip install numpy')
+
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'analytics', timezone.localtime().strftime('%Y-%m-%d_%H%M%S')
+        )
+
+        started = time.monotonic()
+        manifest = AnalyticsExportService.export(output, options['tables'], options['chunk_size'])
+
+        for name, table in manifest.items():
+            self.stdout.write(f"{name}: {table['rows']} rows, {len(table['columns'])} columns")
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported to {output} in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,39 @@
+# sanjeri_app/management/commands/export_catalog.py
+from django.core.management.base import BaseCommand
+from sanjeri_app.services.catalog_service import CatalogService
+from sanjeri_app.utils.export_utils import EXPORT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Write the catalog as CSV or JSON Lines in the format import_catalog reads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='Output file (default: stdout)')
+        parser.add_argument(
+            '--format',
+            choices=CatalogService.FORMATS,
+            help='File format (default: from the file extension, csv for stdout)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Variants fetched from the database per round trip',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or (CatalogService.detect_format(path) if path else 'csv')
+        lines = CatalogService.export_lines(fmt, options['chunk_size'])
+
+        if not path:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        count = -1 if fmt == 'csv' else 0  # header row
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            for line in lines:
+                f.write(line)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f'Exported {count} variant(s) to {path}'))
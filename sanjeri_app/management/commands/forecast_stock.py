@@ -0,0 +1,23 @@
+# sanjeri_app/management/commands/forecast_stock.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+try:
+    from sanjeri_app.services.stock_forecast_service import StockForecastService
+except ImportError:  # NumPy is only needed for forecasting
+    StockForecastService = None
+
+
+class Command(BaseCommand):
+    help = 'Recompute sales velocity, days of cover and reorder points per variant (run nightly from cron)'
+
+    def handle(self, *args, **options):
+        if StockForecastService is None:
+            raise CommandError('forecast_stock needs NumPy: pip install numpy')
+
+        started = time.monotonic()
+        reorder_count = StockForecastService.compute()
+        self.stdout.write(self.style.SUCCESS(
+            f'{reorder_count} variant(s) at or below their reorder point '
+            f'(forecast in {time.monotonic() - started:.1f}s)'
+        ))
@@ -0,0 +1,63 @@
+# sanjeri_app/management/commands/import_catalog.py
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from sanjeri_app.services.catalog_service import CatalogService
+
+
+class Command(BaseCommand):
+    help = 'Create products and variants in bulk from a catalog CSV or JSON Lines file (same format as export_catalog)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Catalog file (.csv, or .jsonl / .ndjson)')
+        parser.add_argument(
+            '--format',
+            choices=CatalogService.FORMATS,
+            help='File format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--images-dir',
+            default=settings.MEDIA_ROOT,
+            help='Directory that relative image paths are read from (default: MEDIA_ROOT)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=CatalogService.IMAGE_WORKERS,
+            help='Processes fetching and resizing images',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the file without creating anything',
+        )
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or CatalogService.detect_format(options['path'])
+        started = time.monotonic()
+        try:
+            with open(options['path'], 'rb') as stream:
+                report = CatalogService.import_catalog(
+                    stream,
+                    fmt,
+                    images_dir=options['images_dir'],
+                    dry_run=options['dry_run'],
+                    workers=options['workers'],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']} {error['product']}: {error['message']}")
+        for warning in report['warnings']:
+            self.stderr.write(f"image {warning['source']}: {warning['message']}")
+
+        verb = 'Validated' if report['dry_run'] else 'Imported'
+        summary = (
+            f"{verb} {report['products']} product(s), {report['variants']} variant(s), "
+            f"{report['images']} image(s) in {time.monotonic() - started:.1f}s"
+        )
+        if report['errors']:
+            self.stdout.write(self.style.WARNING(f"{summary}; {len(report['errors'])} error(s), see above"))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
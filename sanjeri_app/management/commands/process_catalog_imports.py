@@ -0,0 +1,53 @@
+# sanjeri_app/management/commands/process_catalog_imports.py
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from sanjeri_app.services.catalog_service import CatalogService
+
+
+class Command(BaseCommand):
+    help = 'Import catalog files uploaded from the admin (run as a long-lived worker, or with --once from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the imports currently queued, then exit',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=10,
+            help='Seconds to wait when the queue is empty',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=CatalogService.IMAGE_WORKERS,
+            help='Processes fetching and resizing images',
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            close_old_connections()
+            catalog_import = CatalogService.claim_import()
+            if catalog_import is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            self.stdout.write(f'Importing {catalog_import.filename} (#{catalog_import.id})...')
+            catalog_import = CatalogService.run_import(catalog_import, workers=options['workers'])
+            processed += 1
+            if catalog_import.status == 'done':
+                report = catalog_import.report
+                self.stdout.write(self.style.SUCCESS(
+                    f"#{catalog_import.id} done: {report['products']} product(s), {report['variants']} variant(s), "
+                    f"{report['images']} image(s), {len(report['errors'])} error(s)"
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(f'#{catalog_import.id} failed: {catalog_import.error}'))
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} catalog import(s)'))
@@ -0,0 +1,69 @@
+# sanjeri_app/management/commands/process_image_renditions.py
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from sanjeri_app.models import Product, ProductImage, ProductVariant
+from sanjeri_app.services.image_rendition_service import ImageRenditionService
+
+
+class Command(BaseCommand):
+    help = 'Generate queued image renditions in a process pool (run as a long-lived worker, or with --once from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the images currently queued, then exit',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2,
+            help='Seconds to wait when the queue is empty',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Rendering processes (default: one per CPU)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Images claimed per round',
+        )
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='First queue every product, variant and gallery image uploaded so far',
+        )
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            sources = set(Product.objects.with_deleted().exclude(main_image='').values_list('main_image', flat=True))
+            sources |= set(ProductVariant.objects.with_deleted().exclude(variant_image='').values_list('variant_image', flat=True))
+            sources |= set(ProductImage.objects.values_list('image', flat=True))
+            ImageRenditionService.enqueue(*sources)
+            self.stdout.write(f'Queued {len(sources)} image(s)')
+
+        processed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                close_old_connections()
+                jobs = ImageRenditionService.claim(options['batch_size'])
+                if not jobs:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+
+                started = time.monotonic()
+                done = ImageRenditionService.process(jobs, executor)
+                processed += len(jobs)
+                self.stdout.write(
+                    f'{done}/{len(jobs)} image(s) rendered in {time.monotonic() - started:.1f}s'
+                )
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} image(s)'))
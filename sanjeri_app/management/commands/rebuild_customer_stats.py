@@ -0,0 +1,15 @@
+# sanjeri_app/management/commands/rebuild_customer_stats.py
+import time
+from django.core.management.base import BaseCommand
+from sanjeri_app.services.customer_stats_service import CustomerStatsService
+
+
+class Command(BaseCommand):
+    help = 'Recompute CustomerStats for every user (initial fill, or repair after bulk data changes)'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = CustomerStatsService.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt stats for {count} user(s) in {time.monotonic() - started:.1f}s'
+        ))
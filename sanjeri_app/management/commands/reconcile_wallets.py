@@ -0,0 +1,115 @@
+# sanjeri_app/management/commands/reconcile_wallets.py
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from sanjeri_app.models import Wallet, CustomUser
+from sanjeri_app.services.wallet_service import WalletService
+from sanjeri_app.services.customer_stats_service import CustomerStatsService
+from sanjeri_app.services.account_summary_service import AccountSummaryService
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare every Wallet.balance and CustomUser.wallet_balance against the sum of '
+        'COMPLETED wallet transactions and report (or --fix) the drift'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Write the expected balance back to drifted wallets and users',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows fetched per cursor round-trip and written per bulk_update',
+        )
+
+    def expected_balances(self, wallet_ids=None):
+        """One grouped query: wallet, its user and the balance implied by its transactions"""
+        wallets = Wallet.objects.all()
+        if wallet_ids is not None:
+            wallets = wallets.filter(id__in=wallet_ids)
+
+        return wallets.annotate(
+            expected=WalletService.completed_balance_expression()
+        ).values_list(
+            'id', 'user_id', 'user__email', 'balance', 'user__wallet_balance', 'expected'
+        ).order_by('id')
+
+    def handle(self, *args, **options):
+        fix = options['fix']
+        chunk_size = options['chunk_size']
+
+        scanned = 0
+        wallet_drift = 0
+        user_drift = 0
+        total_drift = Decimal('0')
+        pending = []
+
+        rows = self.expected_balances().iterator(chunk_size=chunk_size)
+        for wallet_id, user_id, email, balance, user_balance, expected in rows:
+            scanned += 1
+            wallet_off = balance != expected
+            user_off = user_balance != expected
+            if not (wallet_off or user_off):
+                continue
+
+            if wallet_off:
+                wallet_drift += 1
+                total_drift += balance - expected
+            if user_off:
+                user_drift += 1
+
+            self.stdout.write(
+                self.style.WARNING(
+                    f'Wallet #{wallet_id} ({email}): expected ₹{expected}, '
+                    f'wallet ₹{balance}, user ₹{user_balance}'
+                )
+            )
+
+            if fix:
+                pending.append(wallet_id)
+                if len(pending) >= chunk_size:
+                    self.apply_fixes(pending)
+                    pending = []
+
+        if fix and pending:
+            self.apply_fixes(pending)
+
+        self.stdout.write(
+            f'Scanned {scanned} wallets: {wallet_drift} wallet balances and '
+            f'{user_drift} user balances drifted (net wallet drift ₹{total_drift})'
+        )
+        if fix:
+            self.stdout.write(self.style.SUCCESS('Drifted balances corrected'))
+        elif wallet_drift or user_drift:
+            self.stdout.write('Run again with --fix to correct them')
+        else:
+            self.stdout.write(self.style.SUCCESS('All wallets reconciled'))
+
+    def apply_fixes(self, wallet_ids):
+        """
+        Lock one chunk of wallets, recompute their expected balance (transactions
+        may have landed since the scan) and write both balance columns in bulk.
+        """
+        with transaction.atomic():
+            list(Wallet.objects.select_for_update().filter(id__in=wallet_ids).values_list('id'))
+
+            wallets = []
+            users = []
+            wallet_users = []
+            for wallet_id, user_id, email, balance, user_balance, expected in self.expected_balances(wallet_ids):
+                if balance != expected:
+                    wallets.append(Wallet(id=wallet_id, balance=expected))
+                    wallet_users.append(user_id)
+                if user_balance != expected:
+                    users.append(CustomUser(id=user_id, wallet_balance=expected))
+
+            Wallet.objects.bulk_update(wallets, ['balance'])
+            CustomUser.objects.bulk_update(users, ['wallet_balance'])
+            # bulk_update skips the Wallet signals that keep CustomerStats and the header summary current
+            CustomerStatsService.schedule_refresh(*wallet_users)
+            AccountSummaryService.bump(*wallet_users)
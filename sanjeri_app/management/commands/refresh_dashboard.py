@@ -0,0 +1,50 @@
+# sanjeri_app/management/commands/refresh_dashboard.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from sanjeri_app.services.dashboard_service import DashboardService
+
+
+class Command(BaseCommand):
+    help = 'Recompute the cached admin dashboard widgets (run as a long-lived process, or with --once from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Refresh the widgets once, then exit',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help='Seconds between refreshes (defaults to DASHBOARD_REFRESH_INTERVAL)',
+        )
+        parser.add_argument(
+            '--widget',
+            action='append',
+            dest='widgets',
+            help='Only refresh this widget (may be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or DashboardService.refresh_interval()
+        widgets = options['widgets']
+        if widgets:
+            unknown = set(widgets) - set(DashboardService.WIDGETS)
+            if unknown:
+                raise CommandError(f"Unknown widget(s): {', '.join(sorted(unknown))}")
+
+        while True:
+            close_old_connections()
+            started = time.monotonic()
+            if widgets:
+                for name in widgets:
+                    DashboardService.refresh(name)
+            else:
+                DashboardService.refresh_all()
+            elapsed = time.monotonic() - started
+            self.stdout.write(f'Refreshed dashboard widgets in {elapsed:.2f}s')
+
+            if options['once']:
+                break
+            time.sleep(max(interval - elapsed, 0))
@@ -0,0 +1,37 @@
+# sanjeri_app/management/commands/refresh_sales_rollup.py
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from sanjeri_app.services.sales_rollup_service import SalesRollupService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the sales rollup days queued by order changes (run as a long-lived worker, or with --once from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Rebuild the days currently queued, then exit',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=10,
+            help='Seconds to wait when no day is queued',
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = 0
+        while True:
+            close_old_connections()
+            days = SalesRollupService.rebuild_pending()
+            rebuilt += days
+            if days:
+                self.stdout.write(f'Rebuilt {days} day(s)')
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rebuilt} sales rollup day(s)'))
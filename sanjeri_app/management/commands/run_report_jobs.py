@@ -0,0 +1,53 @@
+# sanjeri_app/management/commands/run_report_jobs.py
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from sanjeri_app.services.report_job_service import ReportJobService
+
+
+class Command(BaseCommand):
+    help = 'Generate queued report exports and delete expired ones (run as a long-lived worker, or with --once from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the jobs currently queued, then exit',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5,
+            help='Seconds to wait when the queue is empty',
+        )
+
+    # Seconds between passes deleting expired report files
+    EXPIRE_INTERVAL = 3600
+
+    def handle(self, *args, **options):
+        processed = 0
+        next_expiry = 0
+        while True:
+            close_old_connections()
+            if time.monotonic() >= next_expiry:
+                expired = ReportJobService.expire_artifacts()
+                if expired:
+                    self.stdout.write(f'Expired {expired} old report file(s)')
+                next_expiry = time.monotonic() + self.EXPIRE_INTERVAL
+
+            job = ReportJobService.claim_next()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            self.stdout.write(f'Generating {job} (#{job.id})...')
+            job = ReportJobService.run(job)
+            processed += 1
+            if job.status == 'done':
+                self.stdout.write(self.style.SUCCESS(f'#{job.id} done: {job.artifact} ({job.size} bytes)'))
+            else:
+                self.stdout.write(self.style.ERROR(f'#{job.id} failed: {job.error}'))
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} report job(s)'))
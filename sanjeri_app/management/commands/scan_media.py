@@ -0,0 +1,72 @@
+# sanjeri_app/management/commands/scan_media.py
+import time
+from django.core.management.base import BaseCommand
+from sanjeri_app.services.media_scan_service import MediaScanService
+
+
+class Command(BaseCommand):
+    help = 'Find image references with missing (or, with --verify, unreadable) files and unreferenced files in MEDIA_ROOT'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Also decode every referenced image (Pillow verify) to find corrupt files',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Threads used by --verify (default: Python\'s ThreadPoolExecutor default)',
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Clear references to missing and corrupt files (gallery images are deleted)',
+        )
+        parser.add_argument(
+            '--show',
+            type=int,
+            default=20,
+            help='How many examples of each problem to list',
+        )
+
+    def _list(self, title, names, describe):
+        self.stdout.write(f'{title}: {len(names)}')
+        for name in sorted(names)[:self.show]:
+            self.stdout.write(f'  {name}  {describe(name)}'.rstrip())
+        if len(names) > self.show:
+            self.stdout.write(f'  ... and {len(names) - self.show} more')
+
+    def handle(self, *args, **options):
+        self.show = options['show']
+        started = time.monotonic()
+        result = MediaScanService.scan(verify=options['verify'], workers=options['workers'])
+        self.stdout.write(
+            f"Scanned {result['references']} reference(s) and {result['files']} file(s) "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+
+        examples = result['examples']
+
+        def referenced_by(name):
+            label, pk = examples[name]
+            return f'({label} #{pk})'
+
+        self._list('Missing files', result['missing'], referenced_by)
+        if options['verify']:
+            self._list(
+                'Corrupt files', result['broken'], lambda name: f"{referenced_by(name)}: {result['broken'][name]}",
+            )
+        self._list('Unreferenced files', result['orphans'], lambda name: '')
+
+        bad = result['missing'] | set(result['broken'])
+        if options['fix'] and bad:
+            cleared = MediaScanService.clear_references(bad)
+            for label, count in sorted(cleared.items()):
+                self.stdout.write(self.style.WARNING(f'Cleared {count} {label} reference(s)'))
+
+        if bad and not options['fix']:
+            self.stdout.write(self.style.WARNING('Run with --fix to clear the broken references'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Done'))
@@ -0,0 +1,53 @@
+# sanjeri_app/management/commands/send_wishlist_notifications.py
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from sanjeri_app.services.wishlist_notification_service import WishlistNotificationService
+
+
+class Command(BaseCommand):
+    help = 'Mail wishlisters about price drops, restocks and new offers (run as a long-lived worker, or with --once from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the alerts and mails currently due, then exit',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=30,
+            help='Seconds to wait when nothing is due',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=WishlistNotificationService.SEND_BATCH_SIZE,
+            help='Mails claimed per round',
+        )
+
+    def handle(self, *args, **options):
+        alerts_done = queued = sent = 0
+        while True:
+            close_old_connections()
+            alerts, notifications = WishlistNotificationService.fan_out()
+            alerts_done += alerts
+            queued += notifications
+            if notifications:
+                self.stdout.write(f'{alerts} alert(s) -> {notifications} mail(s) queued')
+
+            batch = WishlistNotificationService.claim(options['batch_size'])
+            if batch:
+                done = WishlistNotificationService.send(batch)
+                sent += done
+                self.stdout.write(f'{done}/{len(batch)} mail(s) sent')
+
+            if not alerts and not batch:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {alerts_done} alert(s), queued {queued} and sent {sent} mail(s)'
+        ))
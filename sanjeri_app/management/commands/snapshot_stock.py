@@ -0,0 +1,11 @@
+# sanjeri_app/management/commands/snapshot_stock.py
+from django.core.management.base import BaseCommand
+from sanjeri_app.services.stock_ledger_service import StockLedgerService
+
+
+class Command(BaseCommand):
+    help = 'Snapshot every variant\'s stock so point-in-time stock lookups stay cheap (run nightly from cron)'
+
+    def handle(self, *args, **options):
+        count = StockLedgerService.snapshot()
+        self.stdout.write(self.style.SUCCESS(f'Snapshotted stock of {count} variant(s)'))
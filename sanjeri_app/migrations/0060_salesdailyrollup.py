@@ -0,0 +1,50 @@
+# Generated by Django 5.1.6 on 2026-10-19 18:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sanjeri_app', '0059_offerapplication_applied_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('level', models.CharField(choices=[('order', 'Order'), ('item', 'Item')], max_length=5)),
+                ('payment_method', models.CharField(max_length=20)),
+                ('status_group', models.CharField(choices=[('placed', 'Placed'), ('confirmed', 'Confirmed'), ('in_transit', 'In Transit'), ('delivered', 'Delivered'), ('cancelled', 'Cancelled'), ('returned', 'Returned'), ('other', 'Other')], max_length=20)),
+                ('is_paid', models.BooleanField(default=False)),
+                ('brand', models.CharField(blank=True, max_length=100, null=True)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('gross', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('discount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('coupon_discount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('tax', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('shipping', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='sanjeri_app.category')),
+                ('coupon', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='sanjeri_app.coupon')),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='sanjeri_app.product')),
+                ('variant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='sanjeri_app.productvariant')),
+            ],
+            options={
+                'verbose_name': 'Sales Daily Rollup',
+                'verbose_name_plural': 'Sales Daily Rollups',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='salesdailyrollup',
+            index=models.Index(fields=['level', 'day', 'status_group'], name='sanjeri_app_level_84974a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salesdailyrollup',
+            index=models.Index(fields=['day'], name='sanjeri_app_day_627358_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-19 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sanjeri_app', '0060_salesdailyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerMonthlyClosing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month', unique=True)),
+                ('opening_balance', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_debit', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_credit', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('closing_balance', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Ledger Monthly Closing',
+                'verbose_name_plural': 'Ledger Monthly Closings',
+                'ordering': ['-month'],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-19 18:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sanjeri_app', '0062_reportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderInvoice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('revision', models.PositiveIntegerField(default=0)),
+                ('file', models.CharField(blank=True, max_length=255)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('rendered_at', models.DateTimeField(blank=True, null=True)),
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='invoice', to='sanjeri_app.order')),
+            ],
+            options={
+                'verbose_name': 'Order Invoice',
+                'verbose_name_plural': 'Order Invoices',
+            },
+        ),
+    ]
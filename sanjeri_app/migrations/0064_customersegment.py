@@ -0,0 +1,52 @@
+# Generated by Django 5.1.6 on 2026-10-19 19:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sanjeri_app', '0063_orderinvoice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recency_days', models.PositiveIntegerField()),
+                ('frequency', models.PositiveIntegerField()),
+                ('monetary', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('first_order_at', models.DateTimeField()),
+                ('last_order_at', models.DateTimeField()),
+                ('r_score', models.PositiveSmallIntegerField()),
+                ('f_score', models.PositiveSmallIntegerField()),
+                ('m_score', models.PositiveSmallIntegerField()),
+                ('segment', models.CharField(choices=[('champions', 'Champions'), ('loyal', 'Loyal Customers'), ('potential_loyalist', 'Potential Loyalists'), ('new_customer', 'New Customers'), ('promising', 'Promising'), ('need_attention', 'Need Attention'), ('at_risk', 'At Risk'), ('cant_lose', "Can't Lose Them"), ('hibernating', 'Hibernating'), ('lost', 'Lost')], db_index=True, max_length=20)),
+                ('computed_at', models.DateTimeField()),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='segment', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Customer Segment',
+                'verbose_name_plural': 'Customer Segments',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='customersegment',
+            index=models.Index(fields=['segment', '-monetary'], name='sanjeri_app_segment_f65b12_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customersegment',
+            index=models.Index(fields=['-monetary'], name='sanjeri_app_monetar_8207e0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customersegment',
+            index=models.Index(fields=['-frequency'], name='sanjeri_app_frequen_ccbbee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customersegment',
+            index=models.Index(fields=['recency_days'], name='sanjeri_app_recency_e9c0d7_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.6 on 2026-10-19 19:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sanjeri_app', '0064_customersegment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('units_7d', models.PositiveIntegerField(default=0)),
+                ('units_30d', models.PositiveIntegerField(default=0)),
+                ('daily_velocity', models.DecimalField(decimal_places=3, default=0, max_digits=10)),
+                ('reorder_point', models.PositiveIntegerField(default=0)),
+                ('stock', models.PositiveIntegerField(default=0)),
+                ('days_of_cover', models.DecimalField(blank=True, decimal_places=1, max_digits=10, null=True)),
+                ('needs_reorder', models.BooleanField(default=False)),
+                ('computed_at', models.DateTimeField()),
+                ('variant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='forecast', to='sanjeri_app.productvariant')),
+            ],
+            options={
+                'verbose_name': 'Stock Forecast',
+                'verbose_name_plural': 'Stock Forecasts',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='stockforecast',
+            index=models.Index(fields=['days_of_cover'], name='sanjeri_app_days_of_86348b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockforecast',
+            index=models.Index(fields=['needs_reorder', 'days_of_cover'], name='sanjeri_app_needs_r_617dc1_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.1.6 on 2026-10-19 19:21
+
+import re
+from django.db import migrations, models
+
+TRIGRAM_INDEX = 'sanjeri_app_order_search_text_trgm'
+
+
+def normalize_phone(phone):
+    return re.sub(r'\D', '', phone or '')[-10:]
+
+
+def backfill_search_fields(apps, schema_editor):
+    Order = apps.get_model('sanjeri_app', 'Order')
+    rows = Order.objects.order_by().values_list(
+        'id', 'order_number', 'user__email', 'user__first_name', 'user__last_name',
+        'shipping_address__full_name', 'shipping_address__phone',
+    )
+    batch = []
+    for order_id, order_number, email, first_name, last_name, full_name, phone in rows.iterator():
+        parts = [order_number, email, first_name, last_name, full_name, normalize_phone(phone)]
+        batch.append(Order(
+            id=order_id,
+            search_text=' '.join(part.strip() for part in parts if part and part.strip()).lower(),
+            search_phone=normalize_phone(phone),
+        ))
+        if len(batch) >= 1000:
+            Order.objects.bulk_update(batch, ['search_text', 'search_phone'])
+            batch = []
+    Order.objects.bulk_update(batch, ['search_text', 'search_phone'])
+
+
+def create_trigram_index(apps, schema_editor):
+    # Substring search on PostgreSQL; other databases fall back to a scan
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} '
+        'ON sanjeri_app_order USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sanjeri_app', '0065_stockforecast'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='search_phone',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_fields, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.1.6 on 2026-10-19 19:44
+
+import sanjeri_app.storage
+from collections import Counter
+from django.db import migrations, models
+from django.db.models import Count
+
+IMAGE_FIELDS = [
+    ('Product', 'main_image'),
+    ('ProductVariant', 'variant_image'),
+    ('ProductImage', 'image'),
+    ('OrderItem', 'product_image'),
+]
+
+
+def count_references(apps, schema_editor):
+    # Files uploaded so far keep their names; count who points at each one
+    MediaBlob = apps.get_model('sanjeri_app', 'MediaBlob')
+    counts = Counter()
+    for model_name, field in IMAGE_FIELDS:
+        model = apps.get_model('sanjeri_app', model_name)
+        rows = model._base_manager.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+        for name, total in rows.values(field).annotate(total=Count('pk')).order_by().values_list(field, 'total'):
+            counts[name] += total
+    MediaBlob.objects.bulk_create(
+        [MediaBlob(name=name, ref_count=total) for name, total in counts.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sanjeri_app', '0070_imagerendition'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='orderitem',
+            name='product_image',
+            field=models.ImageField(blank=True, null=True, storage=sanjeri_app.storage.product_media_storage, upload_to='order_items/'),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='main_image',
+            field=models.ImageField(blank=True, null=True, storage=sanjeri_app.storage.product_media_storage, upload_to='products/main/'),
+        ),
+        migrations.AlterField(
+            model_name='productimage',
+            name='image',
+            field=models.ImageField(storage=sanjeri_app.storage.product_media_storage, upload_to='products/gallery/'),
+        ),
+        migrations.AlterField(
+            model_name='productvariant',
+            name='variant_image',
+            field=models.ImageField(blank=True, null=True, storage=sanjeri_app.storage.product_media_storage, upload_to='products/variants/'),
+        ),
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Media Blob',
+                'verbose_name_plural': 'Media Blobs',
+                'indexes': [models.Index(fields=['ref_count'], name='sanjeri_app_ref_cou_410a69_idx')],
+            },
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
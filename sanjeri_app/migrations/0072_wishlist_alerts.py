@@ -0,0 +1,92 @@
+# Generated by Django 5.1.6 on 2026-10-19 19:56
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sanjeri_app', '0071_mediablob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WishlistAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('price_drop', 'Price Drop'), ('back_in_stock', 'Back in Stock'), ('offer', 'New Offer')], max_length=20)),
+                ('old_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('new_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('offer_name', models.CharField(blank=True, default='', max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('due_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Wishlist Alert',
+                'verbose_name_plural': 'Wishlist Alerts',
+            },
+        ),
+        migrations.CreateModel(
+            name='WishlistNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('price_drop', 'Price Drop'), ('back_in_stock', 'Back in Stock'), ('offer', 'New Offer')], max_length=20)),
+                ('email', models.EmailField(max_length=254)),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Wishlist Notification',
+                'verbose_name_plural': 'Wishlist Notifications',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='wishlistitem',
+            index=models.Index(fields=['product', 'wishlist'], name='sanjeri_app_product_232d9a_idx'),
+        ),
+        migrations.AddField(
+            model_name='wishlistalert',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wishlist_alerts', to='sanjeri_app.product'),
+        ),
+        migrations.AddField(
+            model_name='wishlistalert',
+            name='variant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='wishlist_alerts', to='sanjeri_app.productvariant'),
+        ),
+        migrations.AddField(
+            model_name='wishlistnotification',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wishlist_notifications', to='sanjeri_app.product'),
+        ),
+        migrations.AddField(
+            model_name='wishlistnotification',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wishlist_notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='wishlistalert',
+            index=models.Index(fields=['processed_at', 'due_at'], name='sanjeri_app_process_e6e081_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wishlistnotification',
+            index=models.Index(fields=['status', 'created_at'], name='sanjeri_app_status_1c0147_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wishlistnotification',
+            index=models.Index(fields=['user', 'created_at'], name='sanjeri_app_user_id_874a70_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wishlistnotification',
+            index=models.Index(fields=['product', 'created_at'], name='sanjeri_app_product_c1aefd_idx'),
+        ),
+    ]
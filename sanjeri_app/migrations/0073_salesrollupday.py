@@ -0,0 +1,26 @@
+# Generated by Django 5.1.6 on 2026-10-19 20:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sanjeri_app', '0072_wishlist_alerts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRollupDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('rebuilt_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Sales Rollup Day',
+                'verbose_name_plural': 'Sales Rollup Days',
+            },
+        ),
+    ]
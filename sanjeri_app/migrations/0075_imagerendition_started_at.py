@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 20:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sanjeri_app', '0074_ledgerday_reportjob_expired'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagerendition',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-19 20:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sanjeri_app', '0075_imagerendition_started_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRollupPendingDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Sales Rollup Pending Day',
+                'verbose_name_plural': 'Sales Rollup Pending Days',
+            },
+        ),
+    ]
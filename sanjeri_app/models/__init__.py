@@ -10,6 +10,19 @@ from .payment import PaymentTransaction
 from .wallet import Wallet, WalletTransaction
 # sanjeri_app/models/__init__.py
 from .offer_models import BaseOffer, ProductOffer, CategoryOffer, OfferApplication
+from .sales_rollup import SalesDailyRollup, SalesRollupDay, SalesRollupPendingDay
+from .ledger import LedgerMonthlyClosing, LedgerDay
+from .report_job import ReportJob
+from .invoice import OrderInvoice
+from .customer_segment import CustomerSegment
+from .stock_forecast import StockForecast
+from .customer_stats import CustomerStats
+from .referral import ReferralCoupon
+from .stock_movement import StockMovement, StockSnapshot
+from .image_rendition import ImageRendition
+from .media_blob import MediaBlob
+from .wishlist_alert import WishlistAlert, WishlistNotification
+from .catalog_import import CatalogImport
 
 __all__ = [
     'Product', 'ProductVariant', 'ProductImage','Category', 'Brand', 'Volume', 'Gender',
@@ -21,6 +34,24 @@ __all__ = [
     'Wallet',             
     'WalletTransaction',
     'ProductOffer', 'CategoryOffer', 'OfferApplication', 'BaseOffer',
+    'SalesDailyRollup',
+    'SalesRollupDay',
+    'SalesRollupPendingDay',
+    'LedgerMonthlyClosing',
+    'LedgerDay',
+    'ReportJob',
+    'OrderInvoice',
+    'CustomerSegment',
+    'StockForecast',
+    'CustomerStats',
+    'ReferralCoupon',
+    'StockMovement',
+    'StockSnapshot',
+    'ImageRendition',
+    'MediaBlob',
+    'WishlistAlert',
+    'WishlistNotification',
+    'CatalogImport',
     
 ]
 
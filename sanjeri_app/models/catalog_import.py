@@ -0,0 +1,52 @@
+# sanjeri_app/models/catalog_import.py
+from django.conf import settings
+from django.db import models
+
+
+class CatalogImport(models.Model):
+    """
+    A catalog file uploaded from the admin. The upload is validated in the
+    request; the import itself (which fetches and resizes every image) is
+    run by the `process_catalog_imports` worker, and its report kept here.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('jsonl', 'JSON Lines'),
+    ]
+
+    file = models.CharField(max_length=255)  # Name in catalog_import_storage
+    filename = models.CharField(max_length=255)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    report = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='catalog_imports'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Catalog Import'
+        verbose_name_plural = 'Catalog Imports'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
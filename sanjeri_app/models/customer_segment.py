@@ -0,0 +1,61 @@
+# sanjeri_app/models/customer_segment.py
+from django.conf import settings
+from django.db import models
+
+
+class CustomerSegment(models.Model):
+    """
+    RFM (recency, frequency, monetary) figures and segment of a customer
+    with at least one paid order, recomputed by `compute_customer_segments`.
+    Customers without a row have not purchased yet.
+    """
+    SEGMENT_CHOICES = [
+        ('champions', 'Champions'),
+        ('loyal', 'Loyal Customers'),
+        ('potential_loyalist', 'Potential Loyalists'),
+        ('new_customer', 'New Customers'),
+        ('promising', 'Promising'),
+        ('need_attention', 'Need Attention'),
+        ('at_risk', 'At Risk'),
+        ('cant_lose', "Can't Lose Them"),
+        ('hibernating', 'Hibernating'),
+        ('lost', 'Lost'),
+    ]
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='segment'
+    )
+
+    # Raw figures over paid, not cancelled orders
+    recency_days = models.PositiveIntegerField()
+    frequency = models.PositiveIntegerField()
+    monetary = models.DecimalField(max_digits=12, decimal_places=2)
+    first_order_at = models.DateTimeField()
+    last_order_at = models.DateTimeField()
+
+    # Quintile scores, 5 is best
+    r_score = models.PositiveSmallIntegerField()
+    f_score = models.PositiveSmallIntegerField()
+    m_score = models.PositiveSmallIntegerField()
+
+    segment = models.CharField(max_length=20, choices=SEGMENT_CHOICES, db_index=True)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Customer Segment'
+        verbose_name_plural = 'Customer Segments'
+        indexes = [
+            models.Index(fields=['segment', '-monetary']),
+            models.Index(fields=['-monetary']),
+            models.Index(fields=['-frequency']),
+            models.Index(fields=['recency_days']),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.get_segment_display()} ({self.rfm_score})"
+
+    @property
+    def rfm_score(self):
+        return f"{self.r_score}{self.f_score}{self.m_score}"
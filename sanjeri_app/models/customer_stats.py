@@ -0,0 +1,44 @@
+# sanjeri_app/models/customer_stats.py
+from django.conf import settings
+from django.db import models
+
+
+class CustomerStats(models.Model):
+    """
+    Live per-customer totals for the admin user list and detail pages,
+    refreshed by CustomerStatsService after every order, wallet or referral
+    change of the customer (see signals/customer_stats_signals.py).
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='stats'
+    )
+
+    # Orders placed, excluding cancelled orders and failed payments
+    order_count = models.PositiveIntegerField(default=0)
+    # Paid orders that were not cancelled or refunded
+    lifetime_spend = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    last_order_at = models.DateTimeField(null=True, blank=True)
+
+    wallet_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Sign-ups through the customer's referral link
+    referral_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Customer Stats'
+        verbose_name_plural = 'Customer Stats'
+        indexes = [
+            models.Index(fields=['-lifetime_spend']),
+            models.Index(fields=['-last_order_at']),
+            models.Index(fields=['-order_count']),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.order_count} order(s), ₹{self.lifetime_spend}"
+
+    @property
+    def avg_order_value(self):
+        return self.lifetime_spend / self.order_count if self.order_count else 0
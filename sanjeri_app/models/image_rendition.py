@@ -0,0 +1,37 @@
+# sanjeri_app/models/image_rendition.py
+from django.db import models
+
+
+class ImageRendition(models.Model):
+    """
+    Resized WebP / JPEG copies of one uploaded image (a path in default
+    storage). Uploads are stored as-is and queued here; the
+    `process_image_renditions` worker fills `renditions`:
+
+        {"card": {"width": 400, "height": 300, "webp": "<path>", "jpeg": "<path>"}, ...}
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    source = models.CharField(max_length=255, unique=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    renditions = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Image Rendition'
+        verbose_name_plural = 'Image Renditions'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.source} ({self.status})"
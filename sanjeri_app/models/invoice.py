@@ -0,0 +1,31 @@
+# sanjeri_app/models/invoice.py
+from django.db import models
+
+
+class OrderInvoice(models.Model):
+    """
+    The stored PDF invoice of an order. It is rendered when the order is
+    confirmed and re-rendered as a new revision when items are cancelled or
+    returned; other changes to the order clear `rendered_at` and the next
+    download renders it. Downloads otherwise serve the file instead of
+    rebuilding the PDF. Kept apart from Order so a full Order.save() from
+    a stale instance cannot overwrite the revision.
+    """
+    order = models.OneToOneField('Order', on_delete=models.CASCADE, related_name='invoice')
+    revision = models.PositiveIntegerField(default=0)
+
+    # Path inside the invoice storage (see InvoiceService)
+    file = models.CharField(max_length=255, blank=True)
+    size = models.PositiveIntegerField(default=0)
+    rendered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Order Invoice'
+        verbose_name_plural = 'Order Invoices'
+
+    def __str__(self):
+        return f"Invoice for order #{self.order.order_number} (r{self.revision})"
+
+    @property
+    def etag(self):
+        return f'"{self.order.order_number}-r{self.revision}"'
@@ -0,0 +1,45 @@
+# sanjeri_app/models/ledger.py
+from django.db import models
+
+
+class LedgerMonthlyClosing(models.Model):
+    """
+    Ledger totals and closing balance for one calendar month, written by
+    `close_ledger_months`. The ledger book starts its running balance from
+    the latest closing before the requested range instead of from zero.
+    """
+    month = models.DateField(unique=True, help_text='First day of the month')
+    opening_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_debit = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_credit = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    closing_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    entry_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-month']
+        verbose_name = 'Ledger Monthly Closing'
+        verbose_name_plural = 'Ledger Monthly Closings'
+
+    def __str__(self):
+        return f"{self.month.strftime('%b %Y')}: closing ₹{self.closing_balance}"
+
+
+class LedgerDay(models.Model):
+    """
+    Change counter for one day of ledger entries, bumped (after commit) by
+    LedgerService whenever an order, wallet transaction or customer shown
+    on that day changes, and on the day after a month is (re)closed.
+    Ledger exports are keyed on the sum of versions up to the end of their
+    range: the opening balance carries every earlier day forward.
+    """
+    day = models.DateField(unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Ledger Day'
+        verbose_name_plural = 'Ledger Days'
+
+    def __str__(self):
+        return f"{self.day} (v{self.version})"
@@ -0,0 +1,53 @@
+# sanjeri_app/models/media_blob.py
+from collections import Counter
+from django.db import models
+from django.db.models import Case, F, Value, When
+
+
+class MediaBlob(models.Model):
+    """
+    Reference count of one stored image file. Product, variant, gallery
+    and order item images share files (ContentAddressedStorage stores
+    identical uploads once), so a file may only be deleted when no row
+    points at it any more. Counts are kept by media_signals and rebuilt
+    with MediaBlobService.recount().
+    """
+    name = models.CharField(max_length=255, unique=True)
+    ref_count = models.IntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Media Blob'
+        verbose_name_plural = 'Media Blobs'
+        indexes = [
+            models.Index(fields=['ref_count']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+    @classmethod
+    def adjust(cls, deltas):
+        """
+        Apply {name: delta} (or an iterable of names, +1 each) with one
+        insert for unseen names and one CASE UPDATE.
+        """
+        if not isinstance(deltas, dict):
+            deltas = Counter(deltas)
+        deltas = {name: delta for name, delta in deltas.items() if name and delta}
+        if not deltas:
+            return
+
+        cls.objects.bulk_create(
+            [cls(name=name) for name in deltas],
+            ignore_conflicts=True,
+        )
+        cls.objects.filter(name__in=deltas).update(
+            ref_count=F('ref_count') + Case(
+                *[When(name=name, then=Value(delta)) for name, delta in deltas.items()],
+                default=Value(0),
+                output_field=models.IntegerField(),
+            )
+        )
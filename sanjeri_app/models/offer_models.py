@@ -2,8 +2,9 @@
 from django.db import models
 from django.utils import timezone
 from decimal import Decimal
+from .tracking import FieldTrackerMixin
 
-class BaseOffer(models.Model):
+class BaseOffer(FieldTrackerMixin, models.Model):
     """Abstract base class for all offers - SIMPLIFIED AND CONSISTENT"""
     name = models.CharField(max_length=200)
     description = models.TextField(blank=True)
@@ -35,6 +36,8 @@ class BaseOffer(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    tracked_fields = ('is_active', 'valid_from', 'valid_to', 'discount_percentage', 'discount_fixed')
+
     class Meta:
         abstract = True
 
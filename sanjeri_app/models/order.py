@@ -5,11 +5,15 @@ from django.conf import settings
 from django.utils import timezone
 from .product import ProductVariant
 from .user_models import Address
+from .tracking import FieldTrackerMixin
+from .stock_movement import StockMovement
+from ..storage import product_media_storage
 from decimal import Decimal
 from datetime import timedelta 
+import re
 # from .wallet import WalletTransaction,Wallet
 
-class Order(models.Model):
+class Order(FieldTrackerMixin, models.Model):
     ORDER_STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('confirmed', 'Confirmed'),
@@ -120,6 +124,18 @@ class Order(models.Model):
         default='not_requested'
     )
 
+    # Denormalized for admin search (see OrderSearchService): order number,
+    # customer email/name and shipping name/phone, lowercased
+    search_text = models.TextField(blank=True, default='', editable=False)
+    # Last 10 digits of the shipping phone, for exact phone lookups
+    search_phone = models.CharField(max_length=10, blank=True, default='', editable=False, db_index=True)
+
+
+    tracked_fields = (
+        'status', 'payment_status', 'return_status', 'payment_method', 'coupon',
+        'total_amount', 'discount_amount', 'coupon_discount', 'tax_amount', 'shipping_charge',
+        'user', 'shipping_address',
+    )
     
     class Meta:
         ordering = ['-created_at']
@@ -133,10 +149,40 @@ class Order(models.Model):
     def __str__(self):
         return f"Order #{self.order_number} - {self.user.get_full_name() or self.user.email}"
     
+    @staticmethod
+    def normalize_phone(phone):
+        """Last 10 digits of a phone number (drops +91, spaces and dashes)"""
+        return re.sub(r'\D', '', phone or '')[-10:]
+    
+    @staticmethod
+    def build_search_fields(order_number, email, first_name, last_name, full_name, phone):
+        """(search_text, search_phone) for the given order, customer and address values"""
+        parts = [order_number, email, first_name, last_name, full_name, Order.normalize_phone(phone)]
+        search_text = ' '.join(part.strip() for part in parts if part and part.strip()).lower()
+        return search_text, Order.normalize_phone(phone)
+    
+    def refresh_search_fields(self):
+        address = self.shipping_address
+        self.search_text, self.search_phone = Order.build_search_fields(
+            self.order_number,
+            self.user.email,
+            self.user.first_name,
+            self.user.last_name,
+            address.full_name if address else '',
+            address.phone if address else '',
+        )
+    
     def save(self, *args, **kwargs):
         if not self.order_number:
             self.order_number = self.generate_order_number()
         
+        # Customer or address edits are picked up by signals; a full save
+        # that moves the order to another user or address rebuilds here
+        if kwargs.get('update_fields') is None and (
+            self._state.adding or self.has_changed('user') or self.has_changed('shipping_address')
+        ):
+            self.refresh_search_fields()
+        
         # Update payment status for COD on delivery
         if self.status == 'delivered' and self.delivered_at is None:
             self.delivered_at = timezone.now()
@@ -318,10 +364,12 @@ class Order(models.Model):
             return False
         
         try:
-            # Restore stock for all items
-            for item in self.items.all():
-                item.variant.stock += item.quantity
-                item.variant.save()
+            # Restore stock for all items (individually cancelled items were restored already)
+            StockMovement.restock(
+                self.items.filter(is_cancelled=False),
+                reason='cancellation',
+                note=f"Order #{self.order_number} cancelled: {reason}",
+            )
             
             # ========== FIXED REFUND LOGIC ==========
             refund_amount = Decimal('0')
@@ -682,7 +730,7 @@ class Order(models.Model):
         self.save()
 
 
-class OrderItem(models.Model):
+class OrderItem(FieldTrackerMixin, models.Model):
     """Individual items within an order"""
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
     variant = models.ForeignKey(ProductVariant, on_delete=models.CASCADE)
@@ -715,7 +763,9 @@ class OrderItem(models.Model):
     return_rejected_at = models.DateTimeField(null=True, blank=True)
 
     # Store image at time of order
-    product_image = models.ImageField(upload_to='order_items/', blank=True, null=True)
+    product_image = models.ImageField(upload_to='order_items/', storage=product_media_storage, blank=True, null=True)
+    
+    tracked_fields = ('variant', 'quantity', 'total_price', 'is_cancelled', 'return_status', 'product_image')
     
     class Meta:
         ordering = ['-id']
@@ -794,8 +844,7 @@ class OrderItem(models.Model):
                 self.order.user.save(update_fields=['wallet_balance'])
             
             # Restore stock
-            self.variant.stock += self.quantity
-            self.variant.save()
+            StockMovement.restock([self], reason='return', actor=approved_by)
             
             print(f"✅ Item return approved: {self.product_name} - ₹{self.total_price} refunded")
             return True
@@ -862,8 +911,7 @@ class OrderItem(models.Model):
         
         try:
             # Restore stock
-            self.variant.stock += self.quantity
-            self.variant.save()
+            StockMovement.restock([self], reason='cancellation', note=reason)
             
             self.is_cancelled = True
             self.cancellation_reason = reason
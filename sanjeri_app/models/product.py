@@ -4,6 +4,8 @@ from django.db import models
 from django.utils import timezone
 from django.utils.text import slugify
 from .category import Category
+from .tracking import FieldTrackerMixin
+from ..storage import product_media_storage
 from django.db.models import Q, UniqueConstraint
 
 
@@ -28,7 +30,7 @@ class ProductVariantManager(models.Manager):
         return super().get_queryset().filter(is_deleted=True)
     
 
-class Product(models.Model):
+class Product(FieldTrackerMixin, models.Model):
     GENDER_CHOICES = [
         ("Male", "Male"),
         ("Female", "Female"), 
@@ -43,7 +45,7 @@ class Product(models.Model):
     
     # Common product description
     description = models.TextField()
-    main_image = models.ImageField(upload_to="products/main/", blank=True, null=True)
+    main_image = models.ImageField(upload_to="products/main/", storage=product_media_storage, blank=True, null=True)
     
     # Brand & Perfume-specific (common to all variants)
     brand = models.CharField(max_length=100, blank=True, null=True)
@@ -65,6 +67,10 @@ class Product(models.Model):
 
     objects = ProductManager()
 
+    # A new main image queues its renditions (see image_signals) and moves
+    # its file reference (see media_signals)
+    tracked_fields = ('main_image',)
+
     def save(self, *args, **kwargs):
         if self.is_deleted is None:
             self.is_deleted = False
@@ -121,7 +127,7 @@ class Product(models.Model):
         ]
 
 
-class ProductVariant(models.Model):
+class ProductVariant(FieldTrackerMixin, models.Model):
     GENDER_CHOICES = [
         ("Male", "Male"),
         ("Female", "Female"), 
@@ -142,7 +148,7 @@ class ProductVariant(models.Model):
     stock = models.PositiveIntegerField(default=0)
     
     # Variant-specific image (optional)
-    variant_image = models.ImageField(upload_to="products/variants/", blank=True, null=True)
+    variant_image = models.ImageField(upload_to="products/variants/", storage=product_media_storage, blank=True, null=True)
     
     # System fields
     is_active = models.BooleanField(default=True)
@@ -151,6 +157,10 @@ class ProductVariant(models.Model):
     is_deleted = models.BooleanField(default=False)
 
     objects = ProductVariantManager()
+
+    # Stock edits made through save() are recorded as StockMovements; a new
+    # variant image queues its renditions; price changes refresh cart subtotals
+    tracked_fields = ('stock', 'variant_image', 'price', 'discount_price')
     
     class Meta:
         constraints = [
@@ -221,12 +231,15 @@ class ProductVariant(models.Model):
             return first_img.image
         return None
 
-class ProductImage(models.Model):
+class ProductImage(FieldTrackerMixin, models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="images")
-    image = models.ImageField(upload_to='products/gallery/')
+    image = models.ImageField(upload_to='products/gallery/', storage=product_media_storage)
     alt_text = models.CharField(max_length=150, blank=True, null=True)
     is_default = models.BooleanField(default=False)
 
+    # Image file references are counted in media_signals
+    tracked_fields = ('image',)
+
     def __str__(self):
         return f"Image for {self.product.name}"
 
@@ -0,0 +1,72 @@
+# sanjeri_app/models/report_job.py
+from django.conf import settings
+from django.db import models
+
+
+class ReportJob(models.Model):
+    """
+    A report export requested from the admin and generated by the
+    `run_report_jobs` worker. Finished files are stored once per cache_key
+    (report type, params, format and data version), so asking for the same
+    report again reuses the stored artifact instead of regenerating it.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+        ('expired', 'Expired'),  # Done, but the artifact was cleaned up
+    ]
+
+    REPORT_TYPE_CHOICES = [
+        ('sales_report', 'Sales Report'),
+        ('ledger_book', 'Ledger Book'),
+    ]
+
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('excel', 'Excel'),
+        ('pdf', 'PDF'),
+    ]
+
+    report_type = models.CharField(max_length=30, choices=REPORT_TYPE_CHOICES)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    params = models.JSONField(default=dict)
+    data_version = models.CharField(max_length=64)
+    cache_key = models.CharField(max_length=64, db_index=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    progress = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    # Artifact (path inside default storage)
+    artifact = models.CharField(max_length=255, blank=True)
+    filename = models.CharField(max_length=255, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='report_jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Report Job'
+        verbose_name_plural = 'Report Jobs'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_report_type_display()} ({self.format}) - {self.status}"
+
+    @property
+    def is_finished(self):
+        return self.status in ['done', 'failed', 'expired']
@@ -0,0 +1,135 @@
+# sanjeri_app/models/sales_rollup.py
+from django.db import models
+
+
+class SalesDailyRollupQuerySet(models.QuerySet):
+    def orders(self):
+        """Order-level rows: one per day / payment method / status group / paid flag / coupon"""
+        return self.filter(level='order')
+
+    def items(self):
+        """Item-level rows: one per day / order dimensions / variant"""
+        return self.filter(level='item')
+
+    def between(self, start_date, end_date):
+        return self.filter(day__range=[start_date, end_date])
+
+
+class SalesDailyRollup(models.Model):
+    """
+    Pre-aggregated sales per day. Order and item changes queue their day
+    (SalesRollupPendingDay), the `refresh_sales_rollup` worker rebuilds
+    queued days, and `backfill_sales_rollup` rebuilds whole ranges.
+
+    Order-level rows carry the order totals (gross is Order.total_amount);
+    item-level rows carry units and item revenue (gross is OrderItem.total_price)
+    per variant, so product/category/brand breakdowns never touch OrderItem.
+    """
+    LEVEL_CHOICES = [
+        ('order', 'Order'),
+        ('item', 'Item'),
+    ]
+
+    STATUS_GROUP_CHOICES = [
+        ('placed', 'Placed'),
+        ('confirmed', 'Confirmed'),
+        ('in_transit', 'In Transit'),
+        ('delivered', 'Delivered'),
+        ('cancelled', 'Cancelled'),
+        ('returned', 'Returned'),
+        ('other', 'Other'),
+    ]
+
+    # Order.status -> status_group
+    STATUS_GROUPS = {
+        'pending': 'placed',
+        'confirmed': 'confirmed',
+        'shipped': 'in_transit',
+        'out_for_delivery': 'in_transit',
+        'delivered': 'delivered',
+        'cancelled': 'cancelled',
+        'return_requested': 'returned',
+        'refunded': 'returned',
+    }
+
+    # Groups counted as sales by the sales report and as revenue by the dashboard
+    SALE_GROUPS = ['confirmed', 'in_transit', 'delivered']
+    REVENUE_GROUPS = ['confirmed', 'delivered']
+
+    PAID_PAYMENT_STATUSES = ['completed', 'success']
+
+    day = models.DateField()
+    level = models.CharField(max_length=5, choices=LEVEL_CHOICES)
+
+    # Order dimensions (both levels)
+    payment_method = models.CharField(max_length=20)
+    status_group = models.CharField(max_length=20, choices=STATUS_GROUP_CHOICES)
+    is_paid = models.BooleanField(default=False)
+    coupon = models.ForeignKey('Coupon', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    # Item dimensions (item level only)
+    variant = models.ForeignKey('ProductVariant', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    product = models.ForeignKey('Product', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    category = models.ForeignKey('Category', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    brand = models.CharField(max_length=100, blank=True, null=True)
+
+    # Measures
+    order_count = models.PositiveIntegerField(default=0)
+    gross = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    discount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    coupon_discount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    tax = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    shipping = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    units = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = SalesDailyRollupQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Sales Daily Rollup'
+        verbose_name_plural = 'Sales Daily Rollups'
+        indexes = [
+            models.Index(fields=['level', 'day', 'status_group']),
+            models.Index(fields=['day']),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.level} {self.payment_method}/{self.status_group}: ₹{self.gross}"
+
+
+class SalesRollupDay(models.Model):
+    """
+    One row per rolled-up day. Rebuilds lock the row for their days before
+    replacing the rollup rows, so concurrent rebuilds of a day run one
+    after the other, and bump `version`; caches derived from the rollup are
+    keyed on the sum of versions, which only ever grows.
+    """
+    day = models.DateField(unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    rebuilt_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Sales Rollup Day'
+        verbose_name_plural = 'Sales Rollup Days'
+
+    def __str__(self):
+        return f"{self.day} (v{self.version})"
+
+
+class SalesRollupPendingDay(models.Model):
+    """
+    A day whose rollup is out of date. Rows are only inserted by the write
+    path (after commit, so writers never wait on the day locks) and
+    deleted by the `refresh_sales_rollup` worker once the day is rebuilt;
+    a day may be queued several times.
+    """
+    day = models.DateField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Sales Rollup Pending Day'
+        verbose_name_plural = 'Sales Rollup Pending Days'
+
+    def __str__(self):
+        return f"{self.day} (queued {self.created_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,73 @@
+# sanjeri_app/models/stock_forecast.py
+from decimal import Decimal
+from django.db import models
+from django.db.models import Case, DecimalField, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Cast, Least
+from .product import ProductVariant
+
+
+class StockForecast(models.Model):
+    """
+    Sales velocity of a variant and how long its stock will last, recomputed
+    by `forecast_stock`. `stock`, `days_of_cover` and `needs_reorder` are
+    also kept current whenever the variant's stock is saved.
+    """
+    MAX_DAYS_OF_COVER = 99999
+
+    variant = models.OneToOneField(
+        ProductVariant,
+        on_delete=models.CASCADE,
+        related_name='forecast'
+    )
+
+    # Units sold (not cancelled) over the rolling windows
+    units_7d = models.PositiveIntegerField(default=0)
+    units_30d = models.PositiveIntegerField(default=0)
+
+    # Exponentially smoothed units sold per day
+    daily_velocity = models.DecimalField(max_digits=10, decimal_places=3, default=0)
+    reorder_point = models.PositiveIntegerField(default=0)
+
+    stock = models.PositiveIntegerField(default=0)
+    # stock / daily_velocity; NULL when the variant is not selling
+    days_of_cover = models.DecimalField(max_digits=10, decimal_places=1, null=True, blank=True)
+    needs_reorder = models.BooleanField(default=False)
+
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Stock Forecast'
+        verbose_name_plural = 'Stock Forecasts'
+        indexes = [
+            models.Index(fields=['days_of_cover']),
+            models.Index(fields=['needs_reorder', 'days_of_cover']),
+        ]
+
+    def __str__(self):
+        return f"{self.variant_id}: {self.days_of_cover} day(s) of cover"
+
+    @classmethod
+    def sync_stock(cls, variant_ids):
+        """
+        Copy the variants' current stock and recompute days of cover and the
+        reorder flag from it (two UPDATEs however many variants)
+        """
+        forecasts = cls.objects.filter(variant_id__in=variant_ids)
+        forecasts.update(stock=Subquery(
+            ProductVariant.objects.with_deleted().filter(pk=OuterRef('variant_id')).values('stock')[:1]
+        ))
+        selling = Q(daily_velocity__gt=0)
+        return forecasts.update(
+            days_of_cover=Case(
+                When(selling, then=Least(
+                    Cast('stock', DecimalField(max_digits=12, decimal_places=3)) / F('daily_velocity'),
+                    Value(Decimal(cls.MAX_DAYS_OF_COVER)),
+                )),
+                default=None,
+                output_field=DecimalField(max_digits=10, decimal_places=1),
+            ),
+            needs_reorder=Case(
+                When(selling & Q(reorder_point__gte=F('stock')), then=Value(True)),
+                default=Value(False),
+            ),
+        )
@@ -0,0 +1,150 @@
+# sanjeri_app/models/stock_movement.py
+from collections import defaultdict
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from .product import ProductVariant
+from .stock_forecast import StockForecast
+from .wishlist_alert import WishlistAlert
+
+
+class StockMovement(models.Model):
+    """
+    One change to a variant's stock, with who or what made it. Rows are
+    only ever appended; together with StockSnapshot they give the stock of
+    any variant at any past moment.
+    """
+    REASON_CHOICES = [
+        ('opening', 'Opening Stock'),
+        ('manual', 'Manual Adjustment'),
+        ('bulk_upload', 'Bulk Inventory Update'),
+        ('sale', 'Sale'),
+        ('cancellation', 'Order Cancellation'),
+        ('return', 'Return'),
+        ('correction', 'Correction'),
+    ]
+
+    variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.CASCADE,
+        related_name='stock_movements'
+    )
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+
+    order = models.ForeignKey(
+        'Order',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='stock_movements'
+    )
+    order_item = models.ForeignKey(
+        'OrderItem',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='stock_movements'
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='stock_movements'
+    )
+    note = models.CharField(max_length=255, blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = 'Stock Movement'
+        verbose_name_plural = 'Stock Movements'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['variant', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.variant_id}: {self.delta:+d} ({self.get_reason_display()})"
+
+    @classmethod
+    def apply(cls, movements):
+        """
+        Apply unsaved movements to stock: one UPDATE adds each variant's net
+        delta, one INSERT records the movements. Returns the number of
+        variants changed. The UPDATE bypasses ProductVariant.save(), so the
+        forecast is synced and variants coming back from zero stock are
+        queued as wishlist alerts here (one SELECT for the whole batch).
+        """
+        movements = [movement for movement in movements if movement.delta]
+        if not movements:
+            return 0
+
+        net = defaultdict(int)
+        for movement in movements:
+            net[movement.variant_id] += movement.delta
+
+        with transaction.atomic():
+            restocked = [variant_id for variant_id, delta in net.items() if delta > 0]
+            if restocked:
+                restocked = list(
+                    ProductVariant.objects.with_deleted().filter(id__in=restocked, stock=0)
+                    .values_list('id', 'product_id')
+                )
+            ProductVariant.objects.with_deleted().filter(id__in=net).update(
+                stock=F('stock') + Case(
+                    *[When(id=variant_id, then=Value(delta)) for variant_id, delta in net.items()],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                ),
+                updated_at=timezone.now(),
+            )
+            cls.objects.bulk_create(movements)
+            StockForecast.sync_stock(list(net))
+            if restocked:
+                WishlistAlert.record_restocks(restocked)
+        return len(net)
+
+    @classmethod
+    def restock(cls, order_items, reason, actor=None, note=''):
+        """Put the quantities of `order_items` back into stock (cancellations and returns)"""
+        return cls.apply([
+            cls(
+                variant_id=item.variant_id,
+                delta=item.quantity,
+                reason=reason,
+                order_id=item.order_id,
+                order_item=item,
+                actor=actor,
+                note=note[:255],
+            )
+            for item in order_items
+        ])
+
+
+class StockSnapshot(models.Model):
+    """
+    A variant's stock at `taken_at`, written periodically by
+    `snapshot_stock` so point-in-time lookups only sum the movements since
+    the nearest snapshot.
+    """
+    variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.CASCADE,
+        related_name='stock_snapshots'
+    )
+    stock = models.IntegerField()
+    taken_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Stock Snapshot'
+        verbose_name_plural = 'Stock Snapshots'
+        ordering = ['-taken_at']
+        constraints = [
+            models.UniqueConstraint(fields=['variant', 'taken_at'], name='unique_stock_snapshot'),
+        ]
+
+    def __str__(self):
+        return f"{self.variant_id}: {self.stock} at {self.taken_at}"
@@ -0,0 +1,63 @@
+# sanjeri_app/models/tracking.py
+
+
+class FieldTrackerMixin:
+    """
+    Remember the values of `tracked_fields` as they were loaded (or first set),
+    so save() callers and post_save signals can see what changed without
+    re-reading the row. The snapshot is refreshed after every save and
+    refresh_from_db().
+    """
+    tracked_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._snapshot_tracked_fields()
+
+    def _snapshot_tracked_fields(self, fields=None):
+        deferred = self.get_deferred_fields()
+        snapshot = {
+            name: self.__dict__.get(self._meta.get_field(name).attname)
+            for name in self.tracked_fields
+            if self._meta.get_field(name).attname not in deferred
+            and (fields is None or name in fields)
+        }
+        if fields is None:
+            self._tracked_initial = snapshot
+        else:
+            self._tracked_initial.update(snapshot)
+
+    def previous_value(self, name):
+        """Value of a tracked field when the instance was loaded or last saved"""
+        return self._tracked_initial.get(name)
+
+    def has_changed(self, name):
+        """True if a tracked field differs from its loaded value (always True for new rows)"""
+        if self._state.adding or name not in self._tracked_initial:
+            return True
+        attname = self._meta.get_field(name).attname
+        return self._tracked_initial[name] != self.__dict__.get(attname)
+
+    @property
+    def changed_fields(self):
+        return [name for name in self.tracked_fields if self.has_changed(name)]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Only the fields actually written are now in sync with the database
+        update_fields = kwargs.get('update_fields')
+        self._snapshot_tracked_fields(set(update_fields) if update_fields is not None else None)
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._snapshot_tracked_fields(set(fields) if fields is not None else None)
+
+
+def watches(update_fields, *fields):
+    """
+    For post_save receivers: False when the save was restricted with
+    update_fields and none of the watched fields were written.
+    """
+    if update_fields is None:
+        return True
+    return bool(set(update_fields) & set(fields))
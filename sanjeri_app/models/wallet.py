@@ -123,7 +123,11 @@ class WalletTransaction(models.Model):
         ('FAILED', 'Failed'),
         ('CANCELLED', 'Cancelled'),
     ]
-    
+
+    # Types that add to / take from the wallet balance once COMPLETED
+    CREDIT_TYPES = ['DEPOSIT', 'REFUND', 'CASHBACK']
+    DEBIT_TYPES = ['WITHDRAWAL']
+
     wallet = models.ForeignKey(
         Wallet,
         on_delete=models.CASCADE,
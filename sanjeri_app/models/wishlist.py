@@ -33,5 +33,9 @@ class WishlistItem(models.Model):
 
     class Meta:
         unique_together = ['wishlist', 'product']
+        indexes = [
+            # Product -> wishlisters, for fanning out wishlist alerts
+            models.Index(fields=['product', 'wishlist']),
+        ]
     def __str__(self):
         return f"{self.product.name} in {self.wishlist}"
\ No newline at end of file
@@ -0,0 +1,98 @@
+# sanjeri_app/models/wishlist_alert.py
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from .product import Product, ProductVariant
+
+
+class WishlistAlert(models.Model):
+    """
+    One change worth telling a product's wishlisters about: a lower price,
+    a variant back in stock, or an offer going live. Rows are written on
+    the write path without looking at wishlists at all (one INSERT per
+    batch of changes); the `send_wishlist_notifications` worker later
+    claims them and fans them out to users.
+    """
+    KIND_CHOICES = [
+        ('price_drop', 'Price Drop'),
+        ('back_in_stock', 'Back in Stock'),
+        ('offer', 'New Offer'),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='wishlist_alerts')
+    variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='wishlist_alerts'
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    old_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    new_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    offer_name = models.CharField(max_length=200, blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    due_at = models.DateTimeField(default=timezone.now)  # Later than created_at for offers that start later
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Wishlist Alert'
+        verbose_name_plural = 'Wishlist Alerts'
+        indexes = [
+            models.Index(fields=['processed_at', 'due_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: product {self.product_id}"
+
+    @classmethod
+    def record_restocks(cls, variants):
+        """Queue back-in-stock alerts for `variants`, (variant_id, product_id) pairs, in one INSERT"""
+        cls.objects.bulk_create([
+            cls(product_id=product_id, variant_id=variant_id, kind='back_in_stock')
+            for variant_id, product_id in variants
+        ])
+
+
+class WishlistNotification(models.Model):
+    """
+    The outbound mail for one user about one alert. Doubles as the log the
+    dedup window and the daily cap are checked against, so rows are kept
+    after they are sent.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='wishlist_notifications'
+    )
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='wishlist_notifications')
+    kind = models.CharField(max_length=20, choices=WishlistAlert.KIND_CHOICES)
+    email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Wishlist Notification'
+        verbose_name_plural = 'Wishlist Notifications'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['product', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for {self.user_id}: product {self.product_id} ({self.status})"
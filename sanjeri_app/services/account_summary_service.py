@@ -0,0 +1,124 @@
+# sanjeri_app/services/account_summary_service.py
+import time
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Max, Q, Sum
+from django.db.models.functions import Coalesce, NullIf
+from ..models import CartItem, Wallet
+from .personalization_service import PersonalizationService
+
+
+class AccountSummaryService:
+    """
+    The header counters (cart, wishlist, wallet, pending refunds) as one
+    cached payload per user. Every user has a version counter in the cache,
+    bumped after each commit that changes one of the inputs (see
+    account_summary_signals); cart subtotals also depend on a catalog-wide
+    price version. The ETag is built from the two counters alone, so a
+    revalidation that matches costs one cache read and no queries.
+    """
+
+    CACHE_PREFIX = 'account_summary:'
+    CATALOG_VERSION_KEY = CACHE_PREFIX + 'catalog_version'
+    CACHE_TIMEOUT = 60 * 60 * 24
+
+    @staticmethod
+    def version_key(user_id):
+        return f"{AccountSummaryService.CACHE_PREFIX}version:{user_id}"
+
+    @staticmethod
+    def _fresh_version():
+        # Counters restart from the clock, so one evicted from the cache can
+        # never come back to a value a browser still holds an ETag for
+        return time.time_ns() // 1000
+
+    @staticmethod
+    def versions(user_id):
+        """(user version, catalog version), created on first use"""
+        user_key = AccountSummaryService.version_key(user_id)
+        catalog_key = AccountSummaryService.CATALOG_VERSION_KEY
+        versions = cache.get_many([user_key, catalog_key])
+        for key in (user_key, catalog_key):
+            if key not in versions:
+                cache.add(key, AccountSummaryService._fresh_version(), None)
+                versions[key] = cache.get(key)
+        return versions[user_key], versions[catalog_key]
+
+    @staticmethod
+    def etag(user_id):
+        return '"%s.%s"' % AccountSummaryService.versions(user_id)
+
+    @staticmethod
+    def _bump(keys):
+        for key in keys:
+            try:
+                cache.incr(key)
+            except ValueError:
+                pass  # Not created yet (or evicted); the next read starts a fresh one
+
+    @staticmethod
+    def bump(*user_ids):
+        """Invalidate the users' summaries once the current transaction commits"""
+        keys = [AccountSummaryService.version_key(user_id) for user_id in set(user_ids) if user_id]
+        if keys:
+            transaction.on_commit(lambda: AccountSummaryService._bump(keys))
+
+    @staticmethod
+    def bump_catalog():
+        """Invalidate every cached cart subtotal (a variant price changed)"""
+        transaction.on_commit(lambda: AccountSummaryService._bump([AccountSummaryService.CATALOG_VERSION_KEY]))
+
+    @staticmethod
+    def _build(user_id):
+        money = DecimalField(max_digits=12, decimal_places=2)
+        cart = CartItem.objects.filter(cart__user_id=user_id).aggregate(
+            count=Coalesce(Sum('quantity'), 0),
+            # Same rule as ProductVariant.display_price: the discount price when set
+            subtotal=Coalesce(
+                Sum(F('quantity') * Coalesce(NullIf('variant__discount_price', Decimal('0')), 'variant__price'),
+                    output_field=money),
+                Decimal('0'),
+                output_field=money,
+            ),
+        )
+        wallet = Wallet.objects.filter(user_id=user_id).aggregate(
+            balance=Coalesce(Max('balance'), Decimal('0'), output_field=money),
+            pending_withdrawals=Coalesce(
+                Sum('transactions__amount', filter=Q(
+                    transactions__status='PENDING', transactions__transaction_type='WITHDRAWAL',
+                )),
+                Decimal('0'),
+                output_field=money,
+            ),
+            pending_refunds=Count('transactions', filter=Q(
+                transactions__status='PENDING', transactions__transaction_type='REFUND',
+            )),
+            pending_refund_amount=Coalesce(
+                Sum('transactions__amount', filter=Q(
+                    transactions__status='PENDING', transactions__transaction_type='REFUND',
+                )),
+                Decimal('0'),
+                output_field=money,
+            ),
+        )
+        return {
+            'cart_count': cart['count'],
+            'cart_subtotal': float(cart['subtotal']),
+            'wishlist_count': len(PersonalizationService.load(user_id, 'wishlist')),
+            'wallet_balance': float(wallet['balance']),
+            'wallet_available_balance': float(wallet['balance'] - wallet['pending_withdrawals']),
+            'pending_refunds': wallet['pending_refunds'],
+            'pending_refund_amount': float(wallet['pending_refund_amount']),
+        }
+
+    @staticmethod
+    def summary(user_id):
+        """The user's counters, cached under the current versions"""
+        user_version, catalog_version = AccountSummaryService.versions(user_id)
+        key = f"{AccountSummaryService.CACHE_PREFIX}data:{user_id}:{user_version}:{catalog_version}"
+        data = cache.get(key)
+        if data is None:
+            data = AccountSummaryService._build(user_id)
+            cache.set(key, data, AccountSummaryService.CACHE_TIMEOUT)
+        return data
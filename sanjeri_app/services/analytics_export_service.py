@@ -0,0 +1,135 @@
+# sanjeri_app/services/analytics_export_service.py
+import os
+import shutil
+from django.db import connection, transaction
+from django.utils import timezone
+from ..models import Order, OrderItem, OfferApplication, WalletTransaction
+from ..utils.analytics_arrays import ColumnarWriter, write_manifest
+from ..utils.export_utils import EXPORT_CHUNK_SIZE
+
+
+class AnalyticsExportService:
+    """
+    Dump orders, items, offer applications and wallet transactions into a
+    columnar snapshot (see utils/analytics_arrays.py) for offline analysis.
+    """
+
+    # table -> (model, [(column, ORM lookup, kind), ...])
+    TABLES = {
+        'orders': (Order, [
+            ('id', 'id', 'int'),
+            ('user_id', 'user_id', 'int'),
+            ('created_at', 'created_at', 'datetime'),
+            ('delivered_at', 'delivered_at', 'datetime'),
+            ('status', 'status', 'category'),
+            ('payment_status', 'payment_status', 'category'),
+            ('payment_method', 'payment_method', 'category'),
+            ('return_status', 'return_status', 'category'),
+            ('coupon_id', 'coupon_id', 'int'),
+            ('coupon_code', 'coupon__code', 'category'),
+            ('subtotal', 'subtotal', 'float'),
+            ('offer_discount', 'offer_discount', 'float'),
+            ('coupon_discount', 'coupon_discount', 'float'),
+            ('discount_amount', 'discount_amount', 'float'),
+            ('shipping_charge', 'shipping_charge', 'float'),
+            ('tax_amount', 'tax_amount', 'float'),
+            ('total_amount', 'total_amount', 'float'),
+            ('wallet_used', 'wallet_used', 'bool'),
+            ('wallet_amount_used', 'wallet_amount_used', 'float'),
+        ]),
+        'order_items': (OrderItem, [
+            ('id', 'id', 'int'),
+            ('order_id', 'order_id', 'int'),
+            ('order_created_at', 'order__created_at', 'datetime'),
+            ('user_id', 'order__user_id', 'int'),
+            ('variant_id', 'variant_id', 'int'),
+            ('product_id', 'variant__product_id', 'int'),
+            ('category_id', 'variant__product__category_id', 'int'),
+            ('brand', 'variant__product__brand', 'category'),
+            ('volume_ml', 'variant__volume_ml', 'int'),
+            ('gender', 'variant__gender', 'category'),
+            ('quantity', 'quantity', 'int'),
+            ('unit_price', 'unit_price', 'float'),
+            ('total_price', 'total_price', 'float'),
+            ('is_cancelled', 'is_cancelled', 'bool'),
+            ('return_status', 'return_status', 'category'),
+        ]),
+        'offer_applications': (OfferApplication, [
+            ('id', 'id', 'int'),
+            ('offer_type', 'offer_type', 'category'),
+            ('product_offer_id', 'product_offer_id', 'int'),
+            ('category_offer_id', 'category_offer_id', 'int'),
+            ('order_id', 'order_id', 'int'),
+            ('order_item_id', 'order_item_id', 'int'),
+            ('product_id', 'product_id', 'int'),
+            ('original_price', 'original_price', 'float'),
+            ('discount_amount', 'discount_amount', 'float'),
+            ('final_price', 'final_price', 'float'),
+        ]),
+        'wallet_transactions': (WalletTransaction, [
+            ('id', 'id', 'int'),
+            ('wallet_id', 'wallet_id', 'int'),
+            ('user_id', 'wallet__user_id', 'int'),
+            ('order_id', 'order_id', 'int'),
+            ('transaction_type', 'transaction_type', 'category'),
+            ('status', 'status', 'category'),
+            ('amount', 'amount', 'float'),
+            ('created_at', 'created_at', 'datetime'),
+        ]),
+    }
+
+    @staticmethod
+    def export_table(name, directory, chunk_size=EXPORT_CHUNK_SIZE):
+        """Stream one table through a server-side cursor into its column files"""
+        model, columns = AnalyticsExportService.TABLES[name]
+        queryset = model.objects.order_by('id')
+        rows = queryset.count()
+
+        writer = ColumnarWriter(
+            os.path.join(directory, name),
+            rows,
+            [(column, kind) for column, _, kind in columns]
+        )
+        chunk = []
+        for row in queryset.values_list(*[lookup for _, lookup, _ in columns]).iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                writer.write(chunk)
+                chunk = []
+        writer.write(chunk)
+        return writer.close()
+
+    @staticmethod
+    def export(directory, tables=None, chunk_size=EXPORT_CHUNK_SIZE):
+        """
+        Write a snapshot of `tables` (default all) to `directory`. Everything
+        is read in one transaction (REPEATABLE READ on PostgreSQL), so row
+        counts and rows agree and tables are consistent with each other.
+        The snapshot is built next to `directory` and moved into place when
+        complete.
+        """
+        tables = tables or list(AnalyticsExportService.TABLES)
+        partial = f"{directory.rstrip(os.sep)}.partial"
+        if os.path.exists(partial):
+            shutil.rmtree(partial)
+        os.makedirs(partial)
+
+        try:
+            manifest = {}
+            with transaction.atomic():
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY')
+                exported_at = timezone.now()
+                for name in tables:
+                    manifest[name] = AnalyticsExportService.export_table(name, partial, chunk_size)
+
+            write_manifest(partial, manifest, exported_at.isoformat())
+        except Exception:
+            shutil.rmtree(partial, ignore_errors=True)
+            raise
+
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
+        os.rename(partial, directory)
+        return manifest
@@ -0,0 +1,457 @@
+# sanjeri_app/services/catalog_service.py
+import csv
+import io
+import json
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from functools import partial
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+from django.utils.text import slugify
+from ..models import CatalogImport, Category, MediaBlob, Product, ProductImage, ProductVariant, StockMovement
+from ..storage import product_media_storage
+from ..utils.export_utils import EXPORT_CHUNK_SIZE, Echo
+from ..utils.image_utils import fetch_product_image
+from .image_rendition_service import ImageRenditionService
+
+
+catalog_import_storage = FileSystemStorage(location=settings.CATALOG_IMPORT_ROOT)
+
+
+def _text(value):
+    return '' if value is None else str(value).strip()
+
+
+def _decimal(value):
+    try:
+        amount = Decimal(_text(value))
+    except InvalidOperation:
+        return None
+    return amount if amount.is_finite() else None
+
+
+class CatalogService:
+    """
+    Bulk catalog import and export in one flat format: a record per variant
+    with its product's fields repeated, as CSV (COLUMNS is the header) or
+    JSON Lines (COLUMNS are the keys). `images` lists URLs or paths under the
+    images directory ('|'-separated in CSV) and is read from a product's
+    first record.
+
+    Imports stream the file and work a batch of products at a time: records
+    are validated against slug / SKU sets loaded with one query each, images
+    are fetched and capped at the largest rendition size in a process pool,
+    then products, variants, opening stock movements and images are written
+    with bulk_create and the images' renditions queued. A product's records
+    must be consecutive. Admin uploads are only validated in the request
+    and imported by the `process_catalog_imports` worker.
+    """
+
+    PRODUCT_COLUMNS = [
+        'product_sku', 'name', 'slug', 'category', 'brand', 'fragrance_type', 'occasion', 'description', 'images',
+    ]
+    VARIANT_COLUMNS = ['sku', 'volume_ml', 'gender', 'price', 'discount_price', 'stock']
+    COLUMNS = PRODUCT_COLUMNS + VARIANT_COLUMNS
+    REQUIRED_COLUMNS = ['product_sku', 'name', 'category', 'volume_ml', 'gender', 'price']
+    FORMATS = ['csv', 'jsonl']
+
+    IMAGE_SEPARATOR = '|'
+    MAX_IMAGES = 10
+    MAX_PRICE = Decimal('99999999.99')
+    BATCH_SIZE = 200  # products per batch
+    IMAGE_WORKERS = 4
+
+    # A running import not finished after this long is assumed to have lost its worker
+    STALE_AFTER = timedelta(hours=2)
+
+    @staticmethod
+    def detect_format(filename):
+        return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+    @staticmethod
+    def iter_records(stream, fmt):
+        """(line, record, error) for each record of the binary `stream`, read lazily"""
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+        if fmt == 'csv':
+            reader = csv.DictReader(text)
+            columns = {(name or '').strip().lower() for name in reader.fieldnames or []}
+            missing = set(CatalogService.REQUIRED_COLUMNS) - columns
+            if missing:
+                raise ValueError(f"Missing column(s): {', '.join(sorted(missing))}")
+            for row in reader:
+                record = {key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+                if any(record.values()):
+                    yield reader.line_num, record, None
+            return
+
+        for line, raw in enumerate(text, start=1):
+            if not raw.strip():
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError as e:
+                yield line, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line, None, "Each line must be a JSON object"
+                continue
+            yield line, record, None
+
+    @staticmethod
+    def _image_sources(value):
+        if isinstance(value, list):
+            sources = [_text(source) for source in value]
+        else:
+            sources = _text(value).split(CatalogService.IMAGE_SEPARATOR)
+        return [source for source in sources if source][:CatalogService.MAX_IMAGES]
+
+    @staticmethod
+    def _load_state():
+        """Existing slugs, SKUs and categories, one query each"""
+        return {
+            'slugs': set(Product.objects.values_list('slug', flat=True)),
+            'skus': set(ProductVariant.objects.with_deleted().values_list('sku', flat=True)),
+            'categories': {
+                name.strip().lower(): category_id
+                for category_id, name in Category.objects.filter(is_deleted=False).values_list('id', 'name')
+            },
+        }
+
+    @staticmethod
+    def _validate_product(group, state):
+        """(Product, [ProductVariant], image sources, errors) for one product's records"""
+        first_line, first = group[0]
+        name = _text(first.get('name'))
+        errors = []
+
+        def error(line, message):
+            errors.append({'line': line, 'product': name, 'message': message})
+
+        product_fields = {
+            'name': name,
+            'sku': _text(first.get('product_sku')),
+            'brand': _text(first.get('brand')),
+            'fragrance_type': _text(first.get('fragrance_type')),
+            'occasion': _text(first.get('occasion')),
+        }
+        for field, value in product_fields.items():
+            max_length = Product._meta.get_field(field).max_length
+            if len(value) > max_length:
+                error(first_line, f"{field} is longer than {max_length} characters")
+        if not name:
+            error(first_line, "name is required")
+        if not product_fields['sku']:
+            error(first_line, "product_sku is required")
+
+        category = _text(first.get('category'))
+        category_id = state['categories'].get(category.lower())
+        if category_id is None:
+            error(first_line, f"Unknown category '{category}'")
+
+        # Same rules as Product.save(), checked against the set instead of a query per attempt
+        slug = slugify(_text(first.get('slug')))
+        if slug:
+            if slug in state['slugs']:
+                error(first_line, f"Slug '{slug}' already exists")
+        elif name:
+            base_slug = slug = slugify(name)
+            counter = 1
+            while slug in state['slugs']:
+                slug = f"{base_slug}-{counter}"
+                counter += 1
+            if not slug:
+                error(first_line, "Could not derive a slug from the name; give one")
+
+        variants, skus, combinations = [], set(), set()
+        genders = {gender for gender, _ in ProductVariant.GENDER_CHOICES}
+        for line, record in group:
+            try:
+                volume_ml = int(_text(record.get('volume_ml')))
+            except ValueError:
+                volume_ml = 0
+            if volume_ml <= 0:
+                error(line, "volume_ml must be a positive whole number")
+                continue
+
+            gender = _text(record.get('gender')).capitalize()
+            if gender not in genders:
+                error(line, f"gender must be one of {', '.join(sorted(genders))}")
+                continue
+            if (volume_ml, gender) in combinations:
+                error(line, f"{volume_ml}ml {gender} appears more than once")
+                continue
+
+            price = _decimal(record.get('price'))
+            if price is None or not 0 < price <= CatalogService.MAX_PRICE:
+                error(line, "price must be a positive amount")
+                continue
+            discount_price = None
+            if _text(record.get('discount_price')):
+                discount_price = _decimal(record.get('discount_price'))
+                if discount_price is None or not 0 < discount_price < price:
+                    error(line, "discount_price must be a positive amount below price")
+                    continue
+
+            try:
+                stock = int(_text(record.get('stock')) or 0)
+            except ValueError:
+                stock = -1
+            if stock < 0:
+                error(line, "stock must be a whole number of 0 or more")
+                continue
+
+            sku = _text(record.get('sku'))
+            if sku:
+                if sku in state['skus'] or sku in skus:
+                    error(line, f"SKU '{sku}' already exists")
+                    continue
+                if len(sku) > ProductVariant._meta.get_field('sku').max_length:
+                    error(line, "sku is too long")
+                    continue
+            else:
+                base_sku = sku = f"{product_fields['sku']}-{volume_ml}-{gender[:3].upper()}"
+                counter = 1
+                while sku in state['skus'] or sku in skus:
+                    sku = f"{base_sku}-{counter}"
+                    counter += 1
+
+            combinations.add((volume_ml, gender))
+            skus.add(sku)
+            variants.append(ProductVariant(
+                volume_ml=volume_ml,
+                gender=gender,
+                sku=sku,
+                price=price,
+                discount_price=discount_price,
+                stock=stock,
+                is_active=True,
+                is_deleted=False,
+            ))
+
+        if errors:
+            return None, [], [], errors
+
+        state['slugs'].add(slug)
+        state['skus'].update(skus)
+        product = Product(
+            category_id=category_id,
+            name=name,
+            slug=slug,
+            sku=product_fields['sku'],
+            description=_text(first.get('description')),
+            brand=product_fields['brand'] or None,
+            fragrance_type=product_fields['fragrance_type'] or None,
+            occasion=product_fields['occasion'] or None,
+            is_active=True,
+            is_deleted=False,
+        )
+        return product, variants, CatalogService._image_sources(first.get('images')), []
+
+    @staticmethod
+    def _import_batch(batch, state, report, images_dir, dry_run, executor):
+        accepted = []
+        for group in batch:
+            product, variants, sources, errors = CatalogService._validate_product(group, state)
+            if errors:
+                report['errors'].extend(errors)
+            else:
+                accepted.append((group[0][0], product, variants, sources))
+
+        if not dry_run and accepted:
+            # Fetch and resize before opening the transaction
+            sources = list(dict.fromkeys(source for _, _, _, product_sources in accepted for source in product_sources))
+            images = {}
+            for source, data, error in executor.map(partial(fetch_product_image, base_dir=images_dir), sources):
+                if error:
+                    report['warnings'].append({'source': source, 'message': error})
+                else:
+                    images[source] = data
+
+            with transaction.atomic():
+                product_images = []
+                for _, product, _, product_sources in accepted:
+                    fetched = [source for source in product_sources if source in images]
+                    for position, source in enumerate(fetched, start=1):
+                        name = product_media_storage().save(
+                            f"products/gallery/{product.slug}-{position}.jpg", ContentFile(images[source])
+                        )
+                        if position == 1:
+                            product.main_image = name
+                        product_images.append(ProductImage(
+                            product=product, image=name, alt_text=product.name[:150], is_default=position == 1,
+                        ))
+
+                Product.objects.bulk_create([product for _, product, _, _ in accepted])
+                variants = []
+                for _, product, product_variants, _ in accepted:
+                    for variant in product_variants:
+                        variant.product = product
+                        variants.append(variant)
+                ProductVariant.objects.bulk_create(variants, batch_size=1000)
+                StockMovement.objects.bulk_create([
+                    StockMovement(variant=variant, delta=variant.stock, reason='opening', note='Catalog import')
+                    for variant in variants if variant.stock
+                ], batch_size=1000)
+                ProductImage.objects.bulk_create(product_images, batch_size=1000)
+                # bulk_create sends no post_save, so count the file references and queue the renditions here
+                names = [product_image.image.name for product_image in product_images]
+                MediaBlob.adjust(names + [product.main_image.name for _, product, _, _ in accepted if product.main_image])
+                ImageRenditionService.enqueue(*names)
+            report['images'] += len(product_images)
+
+        report['products'] += len(accepted)
+        report['variants'] += sum(len(variants) for _, _, variants, _ in accepted)
+
+    @staticmethod
+    def import_catalog(stream, fmt, images_dir=None, dry_run=False, workers=None):
+        """
+        Import products from a binary `stream`. Invalid products are skipped
+        and reported; the rest are created. Returns
+        {'products', 'variants', 'images', 'errors', 'warnings', 'dry_run'}.
+        """
+        if fmt not in CatalogService.FORMATS:
+            raise ValueError(f"Unknown format '{fmt}'")
+
+        report = {'products': 0, 'variants': 0, 'images': 0, 'errors': [], 'warnings': [], 'dry_run': dry_run}
+        state = CatalogService._load_state()
+        executor = None if dry_run else ProcessPoolExecutor(max_workers=workers or CatalogService.IMAGE_WORKERS)
+        try:
+            batch, group, group_key = [], [], None
+            for line, record, error in CatalogService.iter_records(stream, fmt):
+                if error:
+                    report['errors'].append({'line': line, 'product': '', 'message': error})
+                    continue
+                key = slugify(_text(record.get('slug')) or _text(record.get('name')))
+                if group and key != group_key:
+                    batch.append(group)
+                    group = []
+                    if len(batch) >= CatalogService.BATCH_SIZE:
+                        CatalogService._import_batch(batch, state, report, images_dir, dry_run, executor)
+                        batch = []
+                group_key = key
+                group.append((line, record))
+
+            if group:
+                batch.append(group)
+            if batch:
+                CatalogService._import_batch(batch, state, report, images_dir, dry_run, executor)
+        finally:
+            if executor:
+                executor.shutdown()
+        return report
+
+    @staticmethod
+    def queue_import(uploaded, fmt, user=None):
+        """
+        Store an uploaded catalog, validate it (no images are fetched) and
+        queue it for the `process_catalog_imports` worker. Returns
+        (validation report, CatalogImport); nothing is queued, and the
+        import is None, when no product in the file is valid.
+        """
+        name = catalog_import_storage.save(
+            f"{timezone.localdate():%Y/%m}/{uploaded.name}", uploaded,
+        )
+        with catalog_import_storage.open(name, 'rb') as stream:
+            report = CatalogService.import_catalog(stream, fmt, dry_run=True)
+        if not report['products']:
+            catalog_import_storage.delete(name)
+            return report, None
+
+        catalog_import = CatalogImport.objects.create(
+            file=name, filename=uploaded.name[:255], format=fmt, requested_by=user,
+        )
+        return report, catalog_import
+
+    @staticmethod
+    def claim_import():
+        """Mark the oldest queued (or abandoned) import running and return it"""
+        stale = timezone.now() - CatalogService.STALE_AFTER
+        with transaction.atomic():
+            catalog_import = CatalogImport.objects.select_for_update(skip_locked=True).filter(
+                Q(status='queued') | Q(status='running', started_at__lt=stale)
+            ).order_by('created_at').first()
+            if catalog_import is None:
+                return None
+            catalog_import.status = 'running'
+            catalog_import.started_at = timezone.now()
+            catalog_import.error = ''
+            catalog_import.save(update_fields=['status', 'started_at', 'error'])
+        return catalog_import
+
+    @staticmethod
+    def run_import(catalog_import, workers=None):
+        """Import a claimed upload (images from URLs or MEDIA_ROOT) and record the report"""
+        try:
+            with catalog_import_storage.open(catalog_import.file, 'rb') as stream:
+                report = CatalogService.import_catalog(
+                    stream, catalog_import.format, images_dir=settings.MEDIA_ROOT, workers=workers,
+                )
+            catalog_import.report = report
+            catalog_import.status = 'done'
+            catalog_import_storage.delete(catalog_import.file)
+        except Exception as e:
+            print(f"❌ Catalog import {catalog_import.id} failed: {e}")
+            traceback.print_exc()
+            catalog_import.status = 'failed'
+            catalog_import.error = str(e)
+
+        catalog_import.finished_at = timezone.now()
+        catalog_import.save()
+        return catalog_import
+
+    @staticmethod
+    def export_records(chunk_size=EXPORT_CHUNK_SIZE):
+        """Catalog records (dicts keyed by COLUMNS), streamed from the database"""
+        variants = ProductVariant.objects.filter(product__is_deleted=False).select_related(
+            'product__category'
+        ).prefetch_related(
+            Prefetch('product__images', queryset=ProductImage.objects.order_by('-is_default', 'id'))
+        ).order_by('product_id', 'id')
+
+        for variant in variants.iterator(chunk_size=chunk_size):
+            product = variant.product
+            images = [image.image.name for image in product.images.all()]
+            if not images and product.main_image:
+                images = [product.main_image.name]
+            yield {
+                'product_sku': product.sku,
+                'name': product.name,
+                'slug': product.slug,
+                'category': product.category.name,
+                'brand': product.brand or '',
+                'fragrance_type': product.fragrance_type or '',
+                'occasion': product.occasion or '',
+                'description': product.description,
+                'images': images,
+                'sku': variant.sku,
+                'volume_ml': variant.volume_ml,
+                'gender': variant.gender,
+                'price': str(variant.price),
+                'discount_price': str(variant.discount_price) if variant.discount_price is not None else '',
+                'stock': variant.stock,
+            }
+
+    @staticmethod
+    def export_lines(fmt, chunk_size=EXPORT_CHUNK_SIZE):
+        """The export as text lines in `fmt`, produced as rows are read"""
+        if fmt not in CatalogService.FORMATS:
+            raise ValueError(f"Unknown format '{fmt}'")
+
+        records = CatalogService.export_records(chunk_size)
+        if fmt == 'jsonl':
+            for record in records:
+                yield json.dumps(record, ensure_ascii=False) + '\n'
+            return
+
+        writer = csv.writer(Echo())
+        yield writer.writerow(CatalogService.COLUMNS)
+        for record in records:
+            record['images'] = CatalogService.IMAGE_SEPARATOR.join(record['images'])
+            yield writer.writerow([record[column] for column in CatalogService.COLUMNS])
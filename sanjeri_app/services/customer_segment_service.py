@@ -0,0 +1,130 @@
+# sanjeri_app/services/customer_segment_service.py
+from collections import Counter
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+from ..models import Order, CustomerSegment
+from .ledger_service import LedgerService
+
+
+class CustomerSegmentService:
+    """
+    RFM segmentation: per-customer recency, frequency and monetary totals
+    from one grouped query over paid orders, quintile scores and segments
+    computed on NumPy arrays, stored in CustomerSegment.
+    """
+
+    EXCLUDED_STATUSES = ['cancelled', 'refunded']
+    BINS = 5
+    BATCH_SIZE = 1000
+
+    UPDATE_FIELDS = [
+        'recency_days', 'frequency', 'monetary', 'first_order_at', 'last_order_at',
+        'r_score', 'f_score', 'm_score', 'segment', 'computed_at',
+    ]
+
+    @staticmethod
+    def customer_totals():
+        """(user_id, frequency, monetary, first_order_at, last_order_at) per customer"""
+        return Order.objects.filter(
+            payment_status__in=LedgerService.PAID_PAYMENT_STATUSES
+        ).exclude(
+            status__in=CustomerSegmentService.EXCLUDED_STATUSES
+        ).values('user_id').annotate(
+            frequency=Count('id'),
+            monetary=Sum('total_amount'),
+            first_order_at=Min('created_at'),
+            last_order_at=Max('created_at'),
+        ).order_by().values_list('user_id', 'frequency', 'monetary', 'first_order_at', 'last_order_at')
+
+    @staticmethod
+    def quantile_scores(values, higher_is_better=True):
+        """
+        Score each value 1..BINS by its percentile rank. Tied values share
+        their mid rank, so equal figures always get the same score.
+        """
+        bins = CustomerSegmentService.BINS
+        if len(values) == 0:
+            return np.zeros(0, dtype=np.int16)
+
+        uniques, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+        below = np.cumsum(counts) - counts
+        percentile = (below + (counts - 1) / 2) / len(values)
+        scores = np.minimum((percentile * bins).astype(np.int16) + 1, bins)[inverse]
+        if not higher_is_better:
+            scores = bins + 1 - scores
+        return scores
+
+    @staticmethod
+    def segments(r_scores, f_scores, m_scores, frequency):
+        """Segment name per customer from the R/F/M scores (first matching rule wins)"""
+        single = frequency == 1  # F scores of one-time buyers depend on how common they are
+        frequent = ~single & (f_scores >= 4)
+        occasional = ~single & (f_scores < 4)
+        rules = [
+            ('champions', (r_scores >= 4) & frequent & (m_scores >= 4)),
+            ('loyal', (r_scores >= 3) & frequent),
+            ('potential_loyalist', (r_scores >= 4) & occasional),
+            ('new_customer', (r_scores >= 4) & single),
+            ('need_attention', (r_scores == 3) & occasional),
+            ('promising', (r_scores == 3) & single),
+            ('cant_lose', (r_scores <= 2) & frequent),
+            ('at_risk', (r_scores <= 2) & occasional),
+            ('lost', (r_scores == 1) & single),
+        ]
+        return np.select(
+            [condition for _, condition in rules],
+            [name for name, _ in rules],
+            default='hibernating'
+        )
+
+    @staticmethod
+    def compute(now=None):
+        """Recompute every customer's segment; returns {segment: customer count}"""
+        now = now or timezone.now()
+        totals = list(CustomerSegmentService.customer_totals())
+
+        frequency = np.fromiter((row[1] for row in totals), np.int64, len(totals))
+        monetary = np.fromiter((float(row[2] or 0) for row in totals), np.float64, len(totals))
+        last_order = np.fromiter((row[4].timestamp() for row in totals), np.float64, len(totals))
+        recency_days = np.maximum((now.timestamp() - last_order) // 86400, 0).astype(np.int64)
+
+        r_scores = CustomerSegmentService.quantile_scores(recency_days, higher_is_better=False)
+        f_scores = CustomerSegmentService.quantile_scores(frequency)
+        m_scores = CustomerSegmentService.quantile_scores(monetary)
+        segments = CustomerSegmentService.segments(r_scores, f_scores, m_scores, frequency)
+
+        existing = CustomerSegment.objects.in_bulk(field_name='user_id')
+        to_update = []
+        to_create = []
+        for index, (user_id, _, total, first_order_at, last_order_at) in enumerate(totals):
+            values = {
+                'recency_days': int(recency_days[index]),
+                'frequency': int(frequency[index]),
+                'monetary': total or 0,
+                'first_order_at': first_order_at,
+                'last_order_at': last_order_at,
+                'r_score': int(r_scores[index]),
+                'f_score': int(f_scores[index]),
+                'm_score': int(m_scores[index]),
+                'segment': str(segments[index]),
+                'computed_at': now,
+            }
+            segment = existing.get(user_id)
+            if segment is None:
+                to_create.append(CustomerSegment(user_id=user_id, **values))
+            else:
+                for field, value in values.items():
+                    setattr(segment, field, value)
+                to_update.append(segment)
+
+        with transaction.atomic():
+            CustomerSegment.objects.bulk_update(
+                to_update, CustomerSegmentService.UPDATE_FIELDS, batch_size=CustomerSegmentService.BATCH_SIZE
+            )
+            CustomerSegment.objects.bulk_create(to_create, batch_size=CustomerSegmentService.BATCH_SIZE)
+            # Customers whose paid orders were all cancelled since the last run
+            CustomerSegment.objects.filter(computed_at__lt=now).delete()
+
+        return Counter(str(segment) for segment in segments)
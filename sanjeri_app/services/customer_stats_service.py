@@ -0,0 +1,109 @@
+# sanjeri_app/services/customer_stats_service.py
+import traceback
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from ..models import CustomerStats, CustomUser, Order, Wallet
+from ..models.referral import ReferralCoupon
+from .ledger_service import LedgerService
+
+
+class CustomerStatsService:
+    """
+    Keeps CustomerStats in step with orders, wallets and referrals. A
+    change schedules its customer for a refresh when the transaction
+    commits; the refresh recomputes that customer's row from grouped
+    queries over their own orders (user_id index), so it is as cheap as a
+    delta but cannot drift the way +1/-1 updates can.
+    """
+
+    PLACED_EXCLUDED_STATUSES = ['cancelled']
+    SPEND_EXCLUDED_STATUSES = ['cancelled', 'refunded']
+    BATCH_SIZE = 1000
+
+    UPDATE_FIELDS = ['order_count', 'lifetime_spend', 'last_order_at', 'wallet_balance', 'referral_count', 'updated_at']
+
+    @staticmethod
+    def refresh(user_ids):
+        """Recompute and upsert the stats of `user_ids` (one statement per query, not per user)"""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+
+        placed = ~Q(status__in=CustomerStatsService.PLACED_EXCLUDED_STATUSES) & ~Q(payment_status='failed')
+        paid = (
+            Q(payment_status__in=LedgerService.PAID_PAYMENT_STATUSES)
+            & ~Q(status__in=CustomerStatsService.SPEND_EXCLUDED_STATUSES)
+        )
+        orders = {
+            row['user_id']: row
+            for row in Order.objects.filter(user_id__in=user_ids).values('user_id').annotate(
+                order_count=Count('id', filter=placed),
+                lifetime_spend=Sum('total_amount', filter=paid),
+                last_order_at=Max('created_at', filter=placed),
+            ).order_by()
+        }
+        balances = dict(Wallet.objects.filter(user_id__in=user_ids).values_list('user_id', 'balance'))
+        referrals = dict(
+            ReferralCoupon.objects.filter(referrer_id__in=user_ids).values('referrer_id').annotate(
+                count=Count('id')
+            ).order_by().values_list('referrer_id', 'count')
+        )
+
+        stats = []
+        for user_id in CustomUser.objects.filter(id__in=user_ids).values_list('id', flat=True):
+            totals = orders.get(user_id, {})
+            stats.append(CustomerStats(
+                user_id=user_id,
+                order_count=totals.get('order_count') or 0,
+                lifetime_spend=totals.get('lifetime_spend') or Decimal('0'),
+                last_order_at=totals.get('last_order_at'),
+                wallet_balance=balances.get(user_id, Decimal('0')),
+                referral_count=referrals.get(user_id, 0),
+            ))
+
+        CustomerStats.objects.bulk_create(
+            stats,
+            batch_size=CustomerStatsService.BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=CustomerStatsService.UPDATE_FIELDS,
+        )
+        return len(stats)
+
+    @staticmethod
+    def rebuild():
+        """Recompute every customer's stats in batches; returns the number of customers"""
+        user_ids = list(CustomUser.objects.order_by('id').values_list('id', flat=True))
+        batch_size = CustomerStatsService.BATCH_SIZE
+        for start in range(0, len(user_ids), batch_size):
+            with transaction.atomic():
+                CustomerStatsService.refresh(user_ids[start:start + batch_size])
+        return len(user_ids)
+
+    @staticmethod
+    def schedule_refresh(*user_ids):
+        """
+        Refresh the customers' stats once the current transaction commits.
+        Every customer touched inside one transaction is refreshed together
+        by the first callback to run.
+        """
+        connection = transaction.get_connection()
+        pending = getattr(connection, '_customer_stats_pending', None)
+        if pending is None:
+            pending = connection._customer_stats_pending = set()
+        pending.update(user_id for user_id in user_ids if user_id)
+
+        def refresh_pending():
+            if not pending:
+                return
+            batch = list(pending)
+            pending.clear()
+            try:
+                CustomerStatsService.refresh(batch)
+            except Exception as e:
+                # The change itself is committed; rebuild_customer_stats repairs the rows
+                print(f"❌ Customer stats refresh failed for users {batch}: {e}")
+                traceback.print_exc()
+
+        transaction.on_commit(refresh_pending)
@@ -0,0 +1,208 @@
+# sanjeri_app/services/dashboard_service.py
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncMonth, TruncYear
+from django.utils import timezone
+from ..models import Coupon, CustomUser, Product, ProductVariant, SalesDailyRollup
+
+
+def rollup_chart_data(period, status_groups):
+    """Revenue / order-count series for the dashboard chart, one query over SalesDailyRollup"""
+    rollups = SalesDailyRollup.objects.orders().filter(status_group__in=status_groups)
+
+    if period == 'yearly':
+        orders_chart = rollups.annotate(
+            period=TruncYear('day')
+        ).values('period').annotate(
+            total=Sum('gross'),
+            count=Sum('order_count')
+        ).order_by('period')
+    elif period == 'daily':
+        # Last 30 days
+        thirty_days_ago = (timezone.now() - timedelta(days=30)).date()
+        orders_chart = rollups.filter(
+            day__gte=thirty_days_ago
+        ).values(period=F('day')).annotate(
+            total=Sum('gross'),
+            count=Sum('order_count')
+        ).order_by('period')
+    else:  # monthly (default)
+        # Last 12 months
+        twelve_months_ago = (timezone.now() - timedelta(days=365)).date()
+        orders_chart = rollups.filter(
+            day__gte=twelve_months_ago
+        ).annotate(
+            period=TruncMonth('day')
+        ).values('period').annotate(
+            total=Sum('gross'),
+            count=Sum('order_count')
+        ).order_by('period')[:12]
+
+    chart_labels = []
+    chart_revenue = []
+    chart_orders = []
+
+    for item in orders_chart:
+        if period == 'yearly':
+            chart_labels.append(item['period'].strftime('%Y'))
+        elif period == 'daily':
+            chart_labels.append(item['period'].strftime('%d %b'))
+        else:
+            chart_labels.append(item['period'].strftime('%b %Y'))
+
+        chart_revenue.append(float(item['total']))
+        chart_orders.append(item['count'])
+
+    return chart_labels, chart_revenue, chart_orders
+
+
+def totals_widget():
+    order_totals = SalesDailyRollup.objects.orders().aggregate(
+        total_orders=Sum('order_count'),
+        total_revenue=Sum('gross', filter=Q(status_group__in=SalesDailyRollup.REVENUE_GROUPS)),
+    )
+    return {
+        'total_users': CustomUser.objects.count(),
+        'total_products': Product.objects.filter(is_deleted=False).count(),
+        'total_variants': ProductVariant.objects.filter(is_deleted=False).count(),
+        'total_coupons': Coupon.objects.filter(active=True).count(),
+        'total_orders': order_totals['total_orders'] or 0,
+        'total_revenue': order_totals['total_revenue'] or 0,
+    }
+
+
+def best_sellers_widget():
+    """Top 10 products, categories and brands from the item-level rollup rows"""
+    sold_items = SalesDailyRollup.objects.items().filter(
+        status_group__in=SalesDailyRollup.REVENUE_GROUPS
+    )
+    best_products = sold_items.filter(product__isnull=False).values(
+        'product_id',
+        'product__name',
+        'product__slug'
+    ).annotate(
+        total_quantity=Sum('units'),
+        total_revenue=Sum('gross')
+    ).order_by('-total_quantity')[:10]
+
+    best_categories = sold_items.values(
+        'category_id',
+        'category__name'
+    ).annotate(
+        total_quantity=Sum('units'),
+        total_revenue=Sum('gross')
+    ).order_by('-total_quantity')[:10]
+
+    best_brands = sold_items.values(
+        'brand'
+    ).annotate(
+        total_quantity=Sum('units'),
+        total_revenue=Sum('gross')
+    ).order_by('-total_quantity')[:10]
+
+    return {
+        'best_products': list(best_products),
+        'best_categories': list(best_categories),
+        'best_brands': list(best_brands),
+    }
+
+
+def stock_alerts_widget():
+    """
+    Variants at or below their reorder point, fewest days of cover first
+    (see StockForecast), and the out-of-stock count
+    """
+    variants = ProductVariant.objects.filter(is_deleted=False)
+    low_stock_variants = variants.filter(forecast__needs_reorder=True).values(
+        'id', 'product__name', 'volume_ml', 'gender', 'stock',
+        'forecast__days_of_cover', 'forecast__daily_velocity'
+    ).order_by('forecast__days_of_cover')[:10]
+    return {
+        'low_stock_variants': list(low_stock_variants),
+        'reorder_count': variants.filter(forecast__needs_reorder=True).count(),
+        'out_of_stock_count': variants.filter(stock=0).count(),
+    }
+
+
+def chart_widget(period):
+    def compute():
+        labels, revenue, orders = rollup_chart_data(period, SalesDailyRollup.REVENUE_GROUPS)
+        return {'chart_labels': labels, 'chart_revenue': revenue, 'chart_orders': orders}
+    return compute
+
+
+class DashboardService:
+    """
+    Admin dashboard widgets. Each widget's figures are computed by the
+    `refresh_dashboard` command every DASHBOARD_REFRESH_INTERVAL seconds and
+    stored in the cache with the time they were computed; the dashboard
+    reads them all in one cache round trip and only computes a widget
+    itself when its entry is missing.
+    """
+
+    WIDGETS = {
+        'totals': totals_widget,
+        'best_sellers': best_sellers_widget,
+        'stock_alerts': stock_alerts_widget,
+        'chart_daily': chart_widget('daily'),
+        'chart_monthly': chart_widget('monthly'),
+        'chart_yearly': chart_widget('yearly'),
+    }
+
+    CHART_PERIODS = ['daily', 'monthly', 'yearly']
+
+    @staticmethod
+    def refresh_interval():
+        return getattr(settings, 'DASHBOARD_REFRESH_INTERVAL', 300)
+
+    @staticmethod
+    def cache_timeout():
+        # Outlives a few missed refreshes so a slow refresher still serves figures
+        return DashboardService.refresh_interval() * 3
+
+    @staticmethod
+    def cache_key(name):
+        return f"dashboard:widget:{name}"
+
+    @staticmethod
+    def compute(name):
+        return {
+            'data': DashboardService.WIDGETS[name](),
+            'computed_at': timezone.now(),
+        }
+
+    @staticmethod
+    def refresh(name):
+        """Recompute one widget and store it"""
+        if name not in DashboardService.WIDGETS:
+            raise ValueError(f"Unknown dashboard widget '{name}'")
+        payload = DashboardService.compute(name)
+        cache.set(DashboardService.cache_key(name), payload, DashboardService.cache_timeout())
+        return payload
+
+    @staticmethod
+    def refresh_all():
+        payloads = {name: DashboardService.compute(name) for name in DashboardService.WIDGETS}
+        cache.set_many(
+            {DashboardService.cache_key(name): payload for name, payload in payloads.items()},
+            DashboardService.cache_timeout()
+        )
+        return payloads
+
+    @staticmethod
+    def get_widgets(names):
+        """{name: {'data', 'computed_at'}} for the widgets, computing any not cached"""
+        keys = {DashboardService.cache_key(name): name for name in names}
+        cached = cache.get_many(keys.keys())
+        widgets = {keys[key]: payload for key, payload in cached.items()}
+
+        missing = {name: DashboardService.compute(name) for name in names if name not in widgets}
+        if missing:
+            cache.set_many(
+                {DashboardService.cache_key(name): payload for name, payload in missing.items()},
+                DashboardService.cache_timeout()
+            )
+            widgets.update(missing)
+        return widgets
@@ -0,0 +1,191 @@
+# sanjeri_app/services/image_rendition_service.py
+import hashlib
+import traceback
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from ..models import ImageRendition
+from ..storage import product_media_storage
+from ..utils.image_utils import RENDITION_SIZES, render_image
+
+
+class ImageRenditionService:
+    """
+    Queue and read image renditions. Saving an upload only records an
+    ImageRendition row (after commit); the `process_image_renditions`
+    worker claims queued rows, renders them in a process pool and stores
+    the files under renditions/. Templates read the result through
+    `renditions_for`, which is cached so pages don't query per image.
+    """
+
+    ROOT = 'renditions'
+    CACHE_PREFIX = 'image_renditions:'
+    CACHE_TIMEOUT = 60 * 60 * 24
+    PENDING_CACHE_TIMEOUT = 60  # Re-check images still being processed every minute
+
+    # A running row not finished after this long is assumed to have lost its worker
+    STALE_AFTER = timedelta(minutes=30)
+
+    @staticmethod
+    def cache_key(source):
+        return ImageRenditionService.CACHE_PREFIX + hashlib.sha1(source.encode()).hexdigest()
+
+    @staticmethod
+    def enqueue(*sources):
+        """
+        Queue renditions of the stored files `sources` once the transaction
+        commits. Stored names never change content (identical uploads share
+        one content-addressed file), so sources already rendered are left
+        alone and only failed ones are retried.
+        """
+        sources = sorted({source for source in sources if source})
+        if not sources:
+            return
+
+        def queue():
+            ImageRendition.objects.bulk_create(
+                [ImageRendition(source=source) for source in sources],
+                ignore_conflicts=True,
+            )
+            ImageRendition.objects.filter(source__in=sources, status='failed').update(status='queued', error='')
+
+        transaction.on_commit(queue)
+
+    @staticmethod
+    def discard(*sources):
+        """Delete the renditions of `sources` (files and rows), e.g. after the originals were deleted"""
+        jobs = list(ImageRendition.objects.filter(source__in=[source for source in sources if source]))
+        for job in jobs:
+            for rendition in job.renditions.values():
+                for fmt in ('webp', 'jpeg'):
+                    if rendition.get(fmt):
+                        default_storage.delete(rendition[fmt])
+        ImageRendition.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+        cache.delete_many([ImageRenditionService.cache_key(job.source) for job in jobs])
+
+    @staticmethod
+    def claim(limit):
+        """
+        Mark up to `limit` queued (or abandoned) rows running and return
+        them (safe with several workers)
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            jobs = list(
+                ImageRendition.objects.select_for_update(skip_locked=True).filter(
+                    Q(status='queued')
+                    | Q(status='running', started_at__lt=now - ImageRenditionService.STALE_AFTER)
+                    | Q(status='running', started_at__isnull=True)  # Claimed before started_at existed
+                ).order_by('created_at')[:limit]
+            )
+            ImageRendition.objects.filter(pk__in=[job.pk for job in jobs]).update(status='running', started_at=now)
+        return jobs
+
+    @staticmethod
+    def rendition_path(source, name, fmt):
+        digest = hashlib.sha1(source.encode()).hexdigest()
+        extension = 'jpg' if fmt == 'jpeg' else fmt
+        return f"{ImageRenditionService.ROOT}/{digest[:2]}/{digest[2:18]}/{name}.{extension}"
+
+    @staticmethod
+    def _read(source):
+        try:
+            with product_media_storage().open(source, 'rb') as f:
+                return f.read()
+        except OSError as e:
+            print(f"❌ Could not read {source} for renditions: {e}")
+            return None
+
+    @staticmethod
+    def process(jobs, executor):
+        """Render `jobs` in `executor` and store the results; returns the number done"""
+        data = [ImageRenditionService._read(job.source) for job in jobs]
+        readable = [(job, blob) for job, blob in zip(jobs, data) if blob is not None]
+        for job, blob in zip(jobs, data):
+            if blob is None:
+                ImageRenditionService._finish(job, 'failed', error='Source file is missing')
+
+        done = 0
+        results = executor.map(render_image, [blob for _, blob in readable])
+        for (job, _), (renditions, error) in zip(readable, results):
+            if error:
+                ImageRenditionService._finish(job, 'failed', error=error)
+                continue
+            try:
+                stored = {}
+                for name, rendition in renditions.items():
+                    entry = {'width': rendition['width'], 'height': rendition['height']}
+                    for fmt in ('webp', 'jpeg'):
+                        path = ImageRenditionService.rendition_path(job.source, name, fmt)
+                        # Paths are fixed per source, so replace rather than letting storage rename
+                        default_storage.delete(path)
+                        entry[fmt] = default_storage.save(path, ContentFile(rendition[fmt]))
+                    stored[name] = entry
+            except Exception as e:
+                traceback.print_exc()
+                ImageRenditionService._finish(job, 'failed', error=str(e))
+                continue
+            ImageRenditionService._finish(job, 'done', renditions=stored)
+            done += 1
+        return done
+
+    @staticmethod
+    def _finish(job, status, renditions=None, error=''):
+        job.status = status
+        job.renditions = renditions or {}
+        job.error = error
+        job.processed_at = timezone.now()
+        # A re-upload may have queued the source again while this ran
+        ImageRendition.objects.filter(pk=job.pk, status='running').update(
+            status=status, renditions=job.renditions, error=error, processed_at=job.processed_at,
+        )
+        cache.delete(ImageRenditionService.cache_key(job.source))
+
+    @staticmethod
+    def renditions_for(source):
+        """The stored renditions of `source` ({} until they are ready)"""
+        if not source:
+            return {}
+        key = ImageRenditionService.cache_key(source)
+        renditions = cache.get(key)
+        if renditions is None:
+            renditions = ImageRendition.objects.filter(source=source, status='done').values_list(
+                'renditions', flat=True
+            ).first() or {}
+            cache.set(
+                key,
+                renditions,
+                ImageRenditionService.CACHE_TIMEOUT if renditions else ImageRenditionService.PENDING_CACHE_TIMEOUT,
+            )
+        return renditions
+
+    @staticmethod
+    def srcsets(source):
+        """{'webp': srcset, 'jpeg': srcset} for `source`, or None until it has been rendered"""
+        renditions = ImageRenditionService.renditions_for(source)
+        if not renditions:
+            return None
+
+        ordered = sorted(renditions.items(), key=lambda item: item[1]['width'])
+        srcsets = {}
+        for fmt in ('webp', 'jpeg'):
+            seen, candidates = set(), []
+            for _, rendition in ordered:
+                if rendition['width'] not in seen:
+                    seen.add(rendition['width'])
+                    candidates.append(f"{default_storage.url(rendition[fmt])} {rendition['width']}w")
+            srcsets[fmt] = ', '.join(candidates)
+        return srcsets
+
+    @staticmethod
+    def url(source, size):
+        """JPEG URL of the `size` rendition (or the nearest smaller one that exists), else None"""
+        renditions = ImageRenditionService.renditions_for(source)
+        for name in sorted(RENDITION_SIZES, key=RENDITION_SIZES.get, reverse=True):
+            if RENDITION_SIZES[name] <= RENDITION_SIZES[size] and name in renditions:
+                return default_storage.url(renditions[name]['jpeg'])
+        return None
@@ -0,0 +1,123 @@
+# sanjeri_app/services/inventory_service.py
+import csv
+import io
+from django.db import transaction
+from ..models import ProductVariant, StockMovement
+
+
+class InventoryService:
+    """
+    Bulk stock changes keyed by variant SKU (JSON API and CSV upload).
+    A batch is validated against one `sku__in` query and applied with a
+    single StockMovement.apply (one CASE UPDATE, one bulk insert) inside
+    one transaction. If any row is invalid nothing is applied.
+    """
+
+    MODES = ['set', 'adjust']  # absolute quantity / delta
+    MAX_ROWS = 5000
+
+    @staticmethod
+    def parse_csv(uploaded_file):
+        """
+        Rows of an inventory CSV with `sku` and `quantity` columns and an
+        optional `mode` column. Raises ValueError when the file can't be read.
+        """
+        try:
+            text = uploaded_file.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise ValueError("File must be UTF-8 encoded CSV")
+
+        reader = csv.DictReader(io.StringIO(text))
+        columns = {(name or '').strip().lower() for name in reader.fieldnames or []}
+        missing = {'sku', 'quantity'} - columns
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(sorted(missing))}")
+
+        rows = []
+        for row in reader:
+            row = {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+            if not any(row.values()):
+                continue
+            rows.append({'sku': row.get('sku', ''), 'quantity': row.get('quantity', ''), 'mode': row.get('mode', '')})
+            if len(rows) > InventoryService.MAX_ROWS:
+                raise ValueError(f"At most {InventoryService.MAX_ROWS} rows per upload")
+        return rows
+
+    @staticmethod
+    def apply(rows, actor=None, default_mode='set', dry_run=False, note=''):
+        """
+        Validate and apply `rows` ({'sku', 'quantity', 'mode'}). Returns
+        {'success', 'applied', 'errors', 'rows'} where rows is a per-row
+        report in input order.
+        """
+        if default_mode not in InventoryService.MODES:
+            raise ValueError(f"Unknown mode '{default_mode}'")
+        if len(rows) > InventoryService.MAX_ROWS:
+            raise ValueError(f"At most {InventoryService.MAX_ROWS} rows per update")
+
+        with transaction.atomic():
+            skus = {str(row.get('sku', '')).strip() for row in rows}
+            # Lock in id order so concurrent batches cannot deadlock
+            variants = {
+                variant['sku']: variant
+                for variant in ProductVariant.objects.select_for_update().filter(
+                    sku__in=skus
+                ).order_by('id').values('id', 'sku', 'stock')
+            }
+
+            report = []
+            seen = set()
+            new_stock = {}
+            movements = []
+            for line, row in enumerate(rows, start=1):
+                sku = str(row.get('sku', '')).strip()
+                mode = str(row.get('mode') or default_mode).strip().lower()
+                entry = {'line': line, 'sku': sku, 'mode': mode, 'status': 'error'}
+                report.append(entry)
+
+                variant = variants.get(sku)
+                try:
+                    quantity = int(str(row.get('quantity', '')).strip())
+                except ValueError:
+                    quantity = None
+
+                if not sku:
+                    entry['message'] = "SKU is required"
+                elif variant is None:
+                    entry['message'] = "Unknown SKU"
+                elif sku in seen:
+                    entry['message'] = "SKU appears more than once"
+                elif mode not in InventoryService.MODES:
+                    entry['message'] = "Mode must be 'set' or 'adjust'"
+                elif quantity is None:
+                    entry['message'] = "Quantity must be a whole number"
+                else:
+                    old = variant['stock']
+                    new = quantity if mode == 'set' else old + quantity
+                    entry.update({'old_stock': old, 'new_stock': new})
+                    if new < 0:
+                        entry['message'] = "Stock cannot go below 0"
+                    elif new == old:
+                        entry['status'] = 'unchanged'
+                    else:
+                        entry['status'] = 'ok'
+                        new_stock[variant['id']] = new
+                        movements.append(StockMovement(
+                            variant_id=variant['id'],
+                            delta=new - old,
+                            reason='bulk_upload',
+                            actor=actor,
+                            note=note,
+                        ))
+                seen.add(sku)
+
+            errors = sum(1 for entry in report if entry['status'] == 'error')
+            result = {'success': errors == 0, 'applied': 0, 'errors': errors, 'rows': report}
+            if errors or dry_run or not new_stock:
+                return result
+
+            # Rows are locked, so applying the deltas lands exactly on the new values
+            StockMovement.apply(movements)
+
+            result['applied'] = len(new_stock)
+            return result
@@ -0,0 +1,289 @@
+# sanjeri_app/services/invoice_service.py
+import traceback
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.http import FileResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from ..models import Order, OrderInvoice
+
+
+invoice_storage = FileSystemStorage(location=settings.INVOICE_ROOT)
+
+
+class InvoiceService:
+    """Render order invoices once per revision and serve the stored PDFs"""
+
+    # Orders in these statuses have not been placed yet and get no invoice
+    UNINVOICED_STATUSES = ['pending', 'pending_payment']
+
+    @staticmethod
+    def is_invoiced(order):
+        return order.status not in InvoiceService.UNINVOICED_STATUSES
+
+    @staticmethod
+    def file_name(order, revision):
+        created = timezone.localtime(order.created_at)
+        return f"{created:%Y/%m}/{order.order_number}-r{revision}.pdf"
+
+    @staticmethod
+    def render(order):
+        """Build the invoice PDF for `order` and return its bytes"""
+        # Latest completed wallet refund (transactions are ordered newest first)
+        wallet_refund = next((
+            wallet_transaction for wallet_transaction in order.wallet_transactions.all()
+            if wallet_transaction.transaction_type == 'REFUND' and wallet_transaction.status == 'COMPLETED'
+        ), None)
+
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=letter)
+
+        # Container for the 'Flowable' objects
+        elements = []
+        styles = getSampleStyleSheet()
+
+        # Add title
+        title_style = styles['Heading1']
+        title_style.alignment = 1  # Center alignment
+        elements.append(Paragraph("SANJERI PERFUMES", title_style))
+        elements.append(Spacer(1, 12))
+
+        # Add invoice title
+        elements.append(Paragraph(f"INVOICE - #{order.order_number}", styles['Heading2']))
+        elements.append(Spacer(1, 12))
+
+        # Order details
+        order_details = [
+            [f"Order Date: {order.created_at.strftime('%B %d, %Y')}", f"Status: {order.get_status_display()}"],
+            [f"Payment Method: {order.get_payment_method_display()}", f"Payment Status: {order.get_payment_status_display()}"],
+        ]
+
+        order_table = Table(order_details, colWidths=[250, 250])
+        order_table.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]))
+        elements.append(order_table)
+        elements.append(Spacer(1, 20))
+
+        # Billing information
+        address = order.shipping_address
+        billing_info = [
+            ['BILL TO:', 'SHIP TO:'],
+            [address.full_name, address.full_name],
+            [address.phone, address.phone],
+            [address.address_line1, address.address_line1],
+            [address.city, address.city],
+            [f"{address.state} - {address.postal_code}", f"{address.state} - {address.postal_code}"],
+        ]
+
+        billing_table = Table(billing_info, colWidths=[250, 250])
+        billing_table.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ]))
+        elements.append(billing_table)
+        elements.append(Spacer(1, 20))
+
+        # Order items
+        items_table_data = [['Product', 'Variant', 'Quantity', 'Unit Price', 'Total']]
+        for item in order.items.all():
+            variant_details = item.variant_details
+            if item.is_cancelled:
+                variant_details += ' (Cancelled)'
+            elif item.return_status in ['approved', 'completed']:
+                variant_details += ' (Returned)'
+            items_table_data.append([
+                item.product_name,
+                variant_details,
+                str(item.quantity),
+                f"Rs.{item.unit_price}",
+                f"Rs.{item.total_price}"
+            ])
+
+        items_table = Table(items_table_data, colWidths=[180, 120, 60, 80, 80])
+        items_table.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+            ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]))
+        elements.append(items_table)
+        elements.append(Spacer(1, 20))
+
+        # Order summary
+        summary_data = [
+            ['Subtotal:', f"Rs.{order.subtotal}"],
+            ['Shipping:', f"Rs.{order.shipping_charge}" if order.shipping_charge > 0 else 'FREE'],
+            ['Tax (18%):', f"Rs.{order.tax_amount:.2f}"],
+        ]
+
+        if order.discount_amount > 0:
+            summary_data.append(['Discount:', f"-Rs.{order.discount_amount}"])
+
+        if order.wallet_amount_used > 0:
+            summary_data.append(['Wallet Payment:', f"-Rs.{order.wallet_amount_used:.2f}"])
+
+        summary_data.append(['TOTAL:', f"Rs.{order.total_amount:.2f}"])
+
+        summary_table = Table(summary_data, colWidths=[400, 120])
+        summary_table.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (-1, -2), 'Helvetica'),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]))
+        elements.append(summary_table)
+        elements.append(Spacer(1, 30))
+
+        # Add refund information if applicable
+        if order.status in ['cancelled', 'returned'] and wallet_refund:
+            refund_info = Paragraph(
+                f"<b>REFUND INFORMATION:</b><br/>"
+                f"Refund Amount: Rs.{wallet_refund.amount}<br/>"
+                f"Refund Method: Wallet<br/>"
+                f"Refund Date: {wallet_refund.created_at.strftime('%B %d, %Y')}<br/>"
+                f"Status: Refunded to customer's wallet",
+                styles['Normal']
+            )
+            elements.append(refund_info)
+            elements.append(Spacer(1, 20))
+
+        # Footer
+        footer = Paragraph(
+            "Thank you for your business!<br/>"
+            "Sanjeri Perfumes - A Scent Beyond the Soul<br/>"
+            "For any queries, please contact our customer support",
+            styles['Normal']
+        )
+        elements.append(footer)
+
+        doc.build(elements)
+        return buffer.getvalue()
+
+    @staticmethod
+    def generate(order_id):
+        """Render the order's invoice as a new revision and store it"""
+        order = Order.objects.select_related('shipping_address').prefetch_related(
+            'items', 'wallet_transactions'
+        ).get(pk=order_id)
+        pdf = InvoiceService.render(order)
+
+        with transaction.atomic():
+            invoice, _ = OrderInvoice.objects.select_for_update().get_or_create(order=order)
+            previous = invoice.file
+            invoice.revision += 1
+            invoice.file = invoice_storage.save(
+                InvoiceService.file_name(order, invoice.revision), ContentFile(pdf)
+            )
+            invoice.size = len(pdf)
+            invoice.rendered_at = timezone.now()
+            invoice.save()
+
+        if previous and previous != invoice.file:
+            invoice_storage.delete(previous)
+        invoice.order = order
+        return invoice
+
+    @staticmethod
+    def schedule_generate(order_id):
+        """
+        Re-render the order's invoice once the current transaction commits.
+        Several changes to one order inside a transaction (status, items,
+        refunds) collapse into a single render.
+        """
+        connection = transaction.get_connection()
+        pending = getattr(connection, '_invoice_pending', None)
+        if pending is None:
+            pending = connection._invoice_pending = {}
+        token = object()
+        pending[order_id] = token
+
+        def generate_if_latest():
+            if pending.get(order_id) is not token:
+                return
+            del pending[order_id]
+            try:
+                InvoiceService.generate(order_id)
+            except Exception as e:
+                # The order change is already committed; the download falls back to rendering
+                print(f"❌ Invoice render failed for order {order_id}: {e}")
+                traceback.print_exc()
+
+        transaction.on_commit(generate_if_latest)
+
+    @staticmethod
+    def mark_stale(order_id):
+        """Have the next download render a new revision (the stored file no longer matches the order)"""
+        OrderInvoice.objects.filter(order_id=order_id).update(rendered_at=None)
+
+    @staticmethod
+    def get(order):
+        """The order's stored invoice, rendering it now if it is missing or stale"""
+        try:
+            invoice = order.invoice
+        except OrderInvoice.DoesNotExist:
+            invoice = None
+        if (
+            invoice is None or not invoice.file or invoice.rendered_at is None
+            or not invoice_storage.exists(invoice.file)
+        ):
+            invoice = InvoiceService.generate(order.pk)
+        return invoice
+
+    @staticmethod
+    def serve(request, order):
+        """
+        Download response for the order's invoice. Answers conditional
+        requests with 304 and hands the stored file to FileResponse, which
+        lets the WSGI server send it with sendfile().
+        """
+        invoice = InvoiceService.get(order)
+        last_modified = int(invoice.rendered_at.timestamp())
+
+        not_modified = get_conditional_response(request, etag=invoice.etag, last_modified=last_modified)
+        if not_modified is not None:
+            not_modified['ETag'] = invoice.etag
+            return not_modified
+
+        response = FileResponse(
+            invoice_storage.open(invoice.file, 'rb'),
+            as_attachment=True,
+            filename=f"invoice_{order.order_number}.pdf",
+            content_type='application/pdf'
+        )
+        response['ETag'] = invoice.etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @staticmethod
+    def iter_files(orders):
+        """
+        Yield (archive name, path) of the stored invoice of each order.
+        Orders whose invoice can't be rendered are logged and left out: the
+        archive is already streaming, so an exception would truncate it.
+        """
+        for order in orders:
+            try:
+                invoice = InvoiceService.get(order)
+            except Exception as e:
+                print(f"❌ Invoice for order #{order.order_number} left out of the archive: {e}")
+                traceback.print_exc()
+                continue
+            yield f"invoice_{order.order_number}.pdf", invoice_storage.path(invoice.file)
@@ -0,0 +1,279 @@
+# sanjeri_app/services/ledger_service.py
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from ..models import CustomUser, Order, Wallet, WalletTransaction, LedgerDay, LedgerMonthlyClosing
+from ..utils.export_utils import EXPORT_CHUNK_SIZE
+
+
+class LedgerService:
+    """
+    Ledger book entries straight from the database: paid orders (debits) and
+    completed wallet refunds, withdrawals and deposits, merged with UNION ALL
+    and carrying a running balance computed by a window SUM.
+    """
+
+    PAID_PAYMENT_STATUSES = ['completed', 'success']
+    CREDIT_TYPES = ['REFUND', 'WITHDRAWAL']  # Money going out
+    DEBIT_TYPES = ['DEPOSIT']  # Money coming in
+
+    @staticmethod
+    def _bounds(start_date, end_date):
+        """
+        [start of start_date, start of the day after end_date) as raw SQL
+        params. Passed through the backend's datetime adapter, as the ORM
+        does: SQLite compares them as text against the stored values.
+        """
+        start = timezone.make_aware(datetime.combine(start_date, time.min))
+        end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+        adapt = connection.ops.adapt_datetimefield_value
+        return adapt(start), adapt(end)
+
+    @staticmethod
+    def _entries_sql(start_date, end_date):
+        """
+        SQL selecting the normalised ledger rows for the range:
+        (source, id, date, kind, debit, credit, order_number, payment_method,
+        order_id, reason, user_id). source is 0 for orders and 1 for wallet
+        transactions, which keeps orders first on equal timestamps.
+        """
+        qn = connection.ops.quote_name
+        orders = qn(Order._meta.db_table)
+        transactions = qn(WalletTransaction._meta.db_table)
+        wallets = qn(Wallet._meta.db_table)
+
+        paid = ', '.join(['%s'] * len(LedgerService.PAID_PAYMENT_STATUSES))
+        credit_types = ', '.join(['%s'] * len(LedgerService.CREDIT_TYPES))
+        debit_types = ', '.join(['%s'] * len(LedgerService.DEBIT_TYPES))
+        start, end = LedgerService._bounds(start_date, end_date)
+
+        sql = f"""
+            SELECT 0 AS source, o.id AS id, o.created_at AS date, 'ORDER' AS kind,
+                   o.total_amount AS debit, 0 AS credit,
+                   o.order_number AS order_number, o.payment_method AS payment_method,
+                   o.id AS order_id, '' AS reason, o.user_id AS user_id
+            FROM {orders} o
+            WHERE o.created_at >= %s AND o.created_at < %s
+              AND o.payment_status IN ({paid})
+            UNION ALL
+            SELECT 1, t.id, t.created_at, t.transaction_type,
+                   CASE WHEN t.transaction_type IN ({debit_types}) THEN t.amount ELSE 0 END,
+                   CASE WHEN t.transaction_type IN ({credit_types}) THEN t.amount ELSE 0 END,
+                   ro.order_number, 'wallet',
+                   t.order_id, t.reason, w.user_id
+            FROM {transactions} t
+            JOIN {wallets} w ON w.id = t.wallet_id
+            LEFT JOIN {orders} ro ON ro.id = t.order_id
+            WHERE t.created_at >= %s AND t.created_at < %s
+              AND t.status = 'COMPLETED'
+              AND t.transaction_type IN ({debit_types}, {credit_types})
+        """
+        params = (
+            [start, end, *LedgerService.PAID_PAYMENT_STATUSES,
+             *LedgerService.DEBIT_TYPES, *LedgerService.CREDIT_TYPES,
+             start, end, *LedgerService.DEBIT_TYPES, *LedgerService.CREDIT_TYPES]
+        )
+        return sql, params
+
+    @staticmethod
+    def totals(start_date, end_date):
+        """Counts and debit/credit totals for the range in one query"""
+        entries_sql, params = LedgerService._entries_sql(start_date, end_date)
+        sql = f"""
+            SELECT
+                COALESCE(SUM(CASE WHEN e.source = 0 THEN 1 ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN e.source = 1 THEN 1 ELSE 0 END), 0),
+                COALESCE(SUM(e.debit), 0),
+                COALESCE(SUM(e.credit), 0),
+                COALESCE(SUM(CASE WHEN e.source = 0 THEN e.debit ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN e.kind = 'REFUND' THEN e.credit ELSE 0 END), 0)
+            FROM ({entries_sql}) e
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            orders_count, wallet_count, debit, credit, revenue, refunds = cursor.fetchone()
+
+        return {
+            'orders_count': orders_count,
+            'wallet_count': wallet_count,
+            'total_debit': Decimal(str(debit)),
+            'total_credit': Decimal(str(credit)),
+            'total_revenue': Decimal(str(revenue)),
+            'total_refunds': Decimal(str(refunds)),
+        }
+
+    @staticmethod
+    def opening_balance(start_date):
+        """
+        Balance carried into start_date: the latest stored monthly closing
+        before it, plus the flow between that month's end and start_date.
+        Zero when no month has been closed yet.
+        """
+        month_start = start_date.replace(day=1)
+        closing = LedgerMonthlyClosing.objects.filter(month__lt=month_start).order_by('-month').first()
+        if closing is None:
+            return Decimal('0')
+
+        balance = closing.closing_balance
+        gap_start = LedgerService.next_month(closing.month)
+        if gap_start < start_date:
+            gap = LedgerService.totals(gap_start, start_date - timedelta(days=1))
+            balance += gap['total_debit'] - gap['total_credit']
+        return balance
+
+    @staticmethod
+    def next_month(month):
+        return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+    @staticmethod
+    def data_version(end_date):
+        """
+        Changes whenever an entry dated up to end_date, or a monthly closing
+        an opening balance in that span is carried from, changes. Read from
+        the database, so it survives cache restarts and agrees across processes.
+        """
+        return LedgerDay.objects.filter(day__lte=end_date).aggregate(version=Sum('version'))['version'] or 0
+
+    @staticmethod
+    def bump(days):
+        """
+        Bump the LedgerDay versions of `days` once the current transaction
+        commits (a short UPDATE of its own, so writers never wait on each
+        other for the day rows; a failure is logged, not raised).
+        """
+        days = set(days)
+        if days:
+            transaction.on_commit(lambda: LedgerService._bump(days), robust=True)
+
+    @staticmethod
+    def _bump(days):
+        LedgerDay.objects.bulk_create([LedgerDay(day=day) for day in days], ignore_conflicts=True)
+        LedgerDay.objects.filter(day__in=days).update(version=F('version') + 1, updated_at=timezone.now())
+
+    @staticmethod
+    def bump_for_orders(order_ids):
+        """Bump the days of the given orders (for queryset.update() paths that skip signals)"""
+        created = Order.objects.filter(id__in=order_ids).values_list('created_at', flat=True)
+        LedgerService.bump(timezone.localdate(created_at) for created_at in created)
+
+    @staticmethod
+    def bump_for_transactions(transaction_ids):
+        created = WalletTransaction.objects.filter(id__in=transaction_ids).values_list('created_at', flat=True)
+        LedgerService.bump(timezone.localdate(created_at) for created_at in created)
+
+    @staticmethod
+    def bump_for_user(user_id):
+        """Bump every day with an entry of the user (their name and email are on the entries)"""
+        days = Order.objects.filter(
+            user_id=user_id, payment_status__in=LedgerService.PAID_PAYMENT_STATUSES,
+        ).datetimes('created_at', 'day')
+        transaction_days = WalletTransaction.objects.filter(
+            wallet__user_id=user_id, status='COMPLETED',
+        ).datetimes('created_at', 'day')
+        LedgerService.bump([moment.date() for moment in [*days, *transaction_days]])
+
+    @staticmethod
+    def entries(start_date, end_date, opening_balance=Decimal('0')):
+        """
+        Yield ledger entry dicts in date order with their running balance.
+        One query, read through a server-side cursor in chunks.
+        """
+        entries_sql, params = LedgerService._entries_sql(start_date, end_date)
+        users = connection.ops.quote_name(CustomUser._meta.db_table)
+        sql = f"""
+            SELECT e.source, e.id, e.date, e.kind, e.debit, e.credit,
+                   e.order_number, e.payment_method, e.order_id, e.reason,
+                   u.first_name, u.last_name, u.username, u.email,
+                   %s + SUM(e.debit - e.credit) OVER (
+                       ORDER BY e.date, e.source, e.id
+                       ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                   ) AS balance
+            FROM ({entries_sql}) e
+            JOIN {users} u ON u.id = e.user_id
+            ORDER BY e.date, e.source, e.id
+        """
+        type_display = dict(WalletTransaction.TRANSACTION_TYPES)
+
+        with connection.chunked_cursor() as cursor:
+            cursor.execute(sql, [opening_balance, *params])
+            while True:
+                rows = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    yield LedgerService._entry(row, type_display)
+
+    @staticmethod
+    def _entry(row, type_display):
+        (source, pk, date, kind, debit, credit, order_number, payment_method,
+         order_id, reason, first_name, last_name, username, email, balance) = row
+
+        if isinstance(date, str):
+            # SQLite returns the UNIONed timestamp column as text
+            date = parse_datetime(date)
+        if timezone.is_naive(date):
+            # ...or as a naive datetime, depending on the driver's converters
+            date = timezone.make_aware(date, dt_timezone.utc)
+
+        if source == 0:
+            full_name = f"{first_name} {last_name}".strip()
+            return {
+                'date': date,
+                'source': 'order',
+                'transaction_id': f"ORD-{order_number}",
+                'description': f"Order #{order_number} - {full_name or username}",
+                'debit': float(debit),  # Money coming in (debit for company)
+                'credit': 0,
+                'balance': float(balance),
+                'user': email,
+                'type': 'Sale',
+                'payment_method': payment_method,
+                'order_id': order_id
+            }
+
+        if kind in LedgerService.CREDIT_TYPES:
+            # Refunds and withdrawals are CREDITS (money going out)
+            description = f"Wallet {type_display.get(kind, kind)}"
+            if order_number:
+                description += f" - Order #{order_number}"
+            if reason:
+                description += f" ({reason})"
+            entry_type = type_display.get(kind, kind)
+        else:
+            description = f"Wallet Deposit - {reason or 'Manual top-up'}"
+            entry_type = 'Deposit'
+
+        return {
+            'date': date,
+            'source': 'wallet',
+            'transaction_id': f"WLT-{pk}",
+            'description': description,
+            'debit': float(debit),
+            'credit': float(credit),
+            'balance': float(balance),
+            'user': email,
+            'type': entry_type,
+            'payment_method': 'wallet',
+            'order_id': order_id
+        }
+
+    @staticmethod
+    def close_month(month):
+        """Store (or refresh) the closing for the month starting at `month`"""
+        opening = LedgerService.opening_balance(month)
+        totals = LedgerService.totals(month, LedgerService.next_month(month) - timedelta(days=1))
+
+        closing, _ = LedgerMonthlyClosing.objects.update_or_create(
+            month=month,
+            defaults={
+                'opening_balance': opening,
+                'total_debit': totals['total_debit'],
+                'total_credit': totals['total_credit'],
+                'closing_balance': opening + totals['total_debit'] - totals['total_credit'],
+                'entry_count': totals['orders_count'] + totals['wallet_count'],
+            }
+        )
+        return closing
@@ -0,0 +1,106 @@
+# sanjeri_app/services/media_blob_service.py
+from collections import Counter
+from django.db import transaction
+from django.db.models import Count
+from ..models import MediaBlob, OrderItem, Product, ProductImage, ProductVariant
+from ..storage import product_media_storage
+from .image_rendition_service import ImageRenditionService
+
+
+class MediaBlobService:
+    """
+    Lifecycle of shared image files. Product, variant, gallery and order
+    item images point at content-addressed blobs that several rows can
+    share; MediaBlob keeps a reference count per file and `release`
+    deletes a file (and its renditions) only once nothing points at it.
+    """
+
+    # Every field whose files are reference counted
+    IMAGE_FIELDS = [
+        (Product, 'main_image'),
+        (ProductVariant, 'variant_image'),
+        (ProductImage, 'image'),
+        (OrderItem, 'product_image'),
+    ]
+
+    @staticmethod
+    def _queryset(model):
+        manager = model.objects
+        return manager.with_deleted() if hasattr(manager, 'with_deleted') else manager.all()
+
+    @staticmethod
+    def references(names=None):
+        """{name: number of rows pointing at it}, over all image fields (one grouped query per field)"""
+        counts = Counter()
+        for model, field in MediaBlobService.IMAGE_FIELDS:
+            rows = MediaBlobService._queryset(model).exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+            if names is not None:
+                rows = rows.filter(**{f'{field}__in': names})
+            for name, total in rows.values(field).annotate(total=Count('pk')).order_by().values_list(field, 'total'):
+                counts[name] += total
+        return counts
+
+    @staticmethod
+    def product_files(product):
+        """Names of the files used by `product`, its variants (including deleted ones), its gallery and its order items"""
+        names = {product.main_image.name} if product.main_image else set()
+        names.update(ProductVariant.objects.with_deleted().filter(product=product).exclude(
+            variant_image__isnull=True
+        ).exclude(variant_image='').values_list('variant_image', flat=True))
+        names.update(product.images.values_list('image', flat=True))
+        names.update(OrderItem.objects.filter(variant__product=product).exclude(
+            product_image__isnull=True
+        ).exclude(product_image='').values_list('product_image', flat=True))
+        return names
+
+    @staticmethod
+    def release(names):
+        """
+        Delete the files among `names` that nothing references any more,
+        with their renditions. Counts are double-checked against the image
+        fields first, so a drifted count can never delete a file in use.
+        Returns the names deleted.
+        """
+        names = {name for name in names if name}
+        if not names:
+            return []
+
+        with transaction.atomic():
+            counted = dict(
+                MediaBlob.objects.select_for_update().filter(name__in=names).values_list('name', 'ref_count')
+            )
+            candidates = {name for name in names if counted.get(name, 0) <= 0}
+            in_use = MediaBlobService.references(candidates) if candidates else {}
+            if in_use:
+                # The counts had drifted; put the real ones back
+                MediaBlob.objects.bulk_create(
+                    [MediaBlob(name=name, ref_count=total) for name, total in in_use.items()],
+                    update_conflicts=True,
+                    unique_fields=['name'],
+                    update_fields=['ref_count'],
+                )
+            unused = sorted(candidates - set(in_use))
+            MediaBlob.objects.filter(name__in=unused).delete()
+
+        storage = product_media_storage()
+        for name in unused:
+            storage.delete(name)
+        ImageRenditionService.discard(*unused)
+        if unused:
+            print(f"🗑️ Deleted {len(unused)} unreferenced image file(s)")
+        return unused
+
+    @staticmethod
+    def recount():
+        """Rebuild every reference count from the image fields; returns the number of files referenced"""
+        counts = MediaBlobService.references()
+        with transaction.atomic():
+            MediaBlob.objects.exclude(name__in=list(counts)).update(ref_count=0)
+            MediaBlob.objects.bulk_create(
+                [MediaBlob(name=name, ref_count=total) for name, total in counts.items()],
+                update_conflicts=True,
+                unique_fields=['name'],
+                update_fields=['ref_count'],
+                batch_size=1000,
+            )
+        return len(counts)
@@ -0,0 +1,129 @@
+# sanjeri_app/services/media_scan_service.py
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import transaction
+from PIL import Image
+from ..models import Category, CustomUser
+from ..storage import ContentAddressedStorage
+from .image_rendition_service import ImageRenditionService
+from .media_blob_service import MediaBlobService
+
+
+class MediaScanService:
+    """
+    Integrity check of uploaded images against MEDIA_ROOT. Image paths are
+    streamed from each image field with values_list().iterator() and the
+    media directory is listed once with os.scandir, so missing files and
+    orphans fall out of two set differences instead of one storage call
+    per row. Decoding every image (`verify`) is optional and runs in a
+    thread pool.
+    """
+
+    IMAGE_FIELDS = MediaBlobService.IMAGE_FIELDS + [
+        (CustomUser, 'profile_image'),
+        (Category, 'thumbnail'),
+    ]
+    # Generated files with their own bookkeeping, and uploads still being written
+    SKIP_DIRS = {ImageRenditionService.ROOT, ContentAddressedStorage.TMP_DIR}
+    CHUNK_SIZE = 2000
+
+    @staticmethod
+    def iter_references():
+        """(label, pk, name) for every non-empty image field, streamed"""
+        for model, field in MediaScanService.IMAGE_FIELDS:
+            label = f"{model.__name__}.{field}"
+            rows = model._base_manager.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''}).order_by()
+            for pk, name in rows.values_list('pk', field).iterator(chunk_size=MediaScanService.CHUNK_SIZE):
+                yield label, pk, name
+
+    @staticmethod
+    def list_files(root):
+        """Relative paths ('/'-separated) of every file under `root`, from one scandir walk"""
+        files = set()
+        pending = [('', root)]
+        while pending:
+            prefix, directory = pending.pop()
+            try:
+                entries = os.scandir(directory)
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    name = prefix + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if name not in MediaScanService.SKIP_DIRS:
+                            pending.append((name + '/', entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        files.add(name)
+        return files
+
+    @staticmethod
+    def _verify_file(path):
+        """Error message if the image at `path` can't be decoded, else None"""
+        try:
+            with Image.open(path) as image:
+                image.verify()
+            return None
+        except Exception as e:
+            return str(e) or e.__class__.__name__
+
+    @staticmethod
+    def scan(root=None, verify=False, workers=None):
+        """
+        {'references', 'files', 'missing', 'orphans', 'broken', 'examples'}
+        where missing / orphans / broken are sets of names and examples maps
+        a name to the first (label, pk) referencing it.
+        """
+        root = root or settings.MEDIA_ROOT
+        files = MediaScanService.list_files(root)
+
+        examples = {}
+        references = 0
+        for label, pk, name in MediaScanService.iter_references():
+            references += 1
+            examples.setdefault(name, (label, pk))
+
+        names = set(examples)
+        missing = names - files
+        orphans = files - names
+        broken = {}
+        if verify:
+            present = sorted(names & files)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(MediaScanService._verify_file, [os.path.join(root, name) for name in present])
+                broken = {name: error for name, error in zip(present, results) if error}
+
+        return {
+            'references': references,
+            'files': len(files),
+            'missing': missing,
+            'orphans': orphans,
+            'broken': broken,
+            'examples': examples,
+        }
+
+    @staticmethod
+    def clear_references(names):
+        """
+        Drop every reference to `names` in bulk: nullable image fields are
+        set to NULL with one UPDATE per field and batch, and gallery rows
+        (whose image is required) are deleted. Reference counts are rebuilt
+        afterwards. Returns {label: rows changed}.
+        """
+        names = sorted(names)
+        cleared = defaultdict(int)
+        with transaction.atomic():
+            for model, field in MediaScanService.IMAGE_FIELDS:
+                label = f"{model.__name__}.{field}"
+                nullable = model._meta.get_field(field).null
+                for start in range(0, len(names), 1000):
+                    rows = model._base_manager.filter(**{f'{field}__in': names[start:start + 1000]})
+                    if nullable:
+                        cleared[label] += rows.update(**{field: None})
+                    else:
+                        cleared[label] += rows.delete()[1].get(model._meta.label, 0)
+            # update() sends no signals
+            MediaBlobService.recount()
+        return {label: count for label, count in cleared.items() if count}
@@ -0,0 +1,89 @@
+# sanjeri_app/services/order_search_service.py
+import json
+import re
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+from ..models import Order
+
+
+class OrderSearchService:
+    """
+    Admin order search over the denormalized Order.search_text /
+    search_phone columns. On PostgreSQL search_text carries a pg_trgm GIN
+    index (migration 0066), so substring matches don't scan the orders,
+    users and addresses tables; elsewhere the same LIKE query runs unindexed.
+    """
+
+    ORDER_NUMBER_RE = re.compile(r'ORD\d{12}[0-9A-F]{3}', re.IGNORECASE)
+    PHONE_RE = re.compile(r'\+?[\d\s\-()]+')
+    BATCH_SIZE = 1000
+
+    # Result sets the planner expects to be larger than this are not counted exactly
+    ESTIMATE_THRESHOLD = 10000
+
+    @staticmethod
+    def search(queryset, query):
+        """Orders in `queryset` matching `query`"""
+        query = ' '.join(query.split())
+        if not query:
+            return queryset
+
+        # Exact fast paths: a full order number or a full phone number
+        if OrderSearchService.ORDER_NUMBER_RE.fullmatch(query):
+            return queryset.filter(order_number=query.upper())
+        if OrderSearchService.PHONE_RE.fullmatch(query):
+            phone = Order.normalize_phone(query)
+            if len(phone) == 10:
+                return queryset.filter(search_phone=phone)
+
+        return queryset.filter(search_text__contains=query.lower())
+
+    @staticmethod
+    def count(queryset):
+        """(count, is_estimate); large PostgreSQL result sets use the planner's row estimate"""
+        if connection.vendor == 'postgresql':
+            sql, params = queryset.order_by().values('pk').query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+            if estimate > OrderSearchService.ESTIMATE_THRESHOLD:
+                return estimate, True
+        return queryset.count(), False
+
+    @staticmethod
+    def refresh(queryset):
+        """Rebuild search_text / search_phone for `queryset`; returns the number of orders changed"""
+        rows = queryset.order_by().values_list(
+            'id', 'order_number', 'user__email', 'user__first_name', 'user__last_name',
+            'shipping_address__full_name', 'shipping_address__phone', 'search_text', 'search_phone',
+        )
+        changed = []
+        for order_id, order_number, email, first_name, last_name, full_name, phone, text, stored_phone in rows.iterator():
+            search_text, search_phone = Order.build_search_fields(
+                order_number, email, first_name, last_name, full_name, phone
+            )
+            if (search_text, search_phone) != (text, stored_phone):
+                changed.append(Order(id=order_id, search_text=search_text, search_phone=search_phone))
+
+        Order.objects.bulk_update(changed, ['search_text', 'search_phone'], batch_size=OrderSearchService.BATCH_SIZE)
+        return len(changed)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that takes its count from OrderSearchService.count"""
+
+    @cached_property
+    def count_info(self):
+        return OrderSearchService.count(self.object_list)
+
+    @cached_property
+    def count(self):
+        return self.count_info[0]
+
+    @property
+    def count_is_estimate(self):
+        return self.count_info[1]
@@ -0,0 +1,110 @@
+# sanjeri_app/services/personalization_service.py
+from django.core.cache import cache
+from django.db import transaction
+from ..models import CartItem, Product, WishlistItem
+
+
+class Personalization:
+    """
+    One user's membership sets for the current request. Each set is read
+    (from cache, or one query on a miss) the first time it's needed and
+    reused for the rest of the request; `apply` flags only the objects
+    about to be rendered.
+    """
+
+    def __init__(self, user):
+        self.user_id = user.pk if user.is_authenticated else None
+        self._sets = {}
+
+    def _get(self, kind):
+        if kind not in self._sets:
+            self._sets[kind] = PersonalizationService.load(self.user_id, kind) if self.user_id else frozenset()
+        return self._sets[kind]
+
+    @property
+    def wishlist_product_ids(self):
+        return self._get('wishlist')
+
+    @property
+    def cart_variant_ids(self):
+        return self._get('cart')
+
+    @property
+    def recently_viewed_ids(self):
+        return self._get('viewed')
+
+    def apply(self, objects):
+        """
+        Set is_in_wishlist / is_recently_viewed on each product in `objects`
+        (products, or variants via .product) and is_in_cart on variants.
+        Returns `objects`; pass a page, not a whole queryset.
+        """
+        for obj in objects:
+            product = obj if isinstance(obj, Product) else obj.product
+            product.is_in_wishlist = product.pk in self.wishlist_product_ids
+            product.is_recently_viewed = product.pk in self.recently_viewed_ids
+            if product is not obj:
+                obj.is_in_cart = obj.pk in self.cart_variant_ids
+        return objects
+
+
+class PersonalizationService:
+    """
+    Cached per-user membership sets used to decorate product listings:
+    wishlist product ids, cart variant ids and recently viewed product ids.
+    Wishlist and cart sets are rebuilt from one query on a cache miss and
+    dropped by personalization_signals whenever an item is added or removed;
+    recently viewed ids live only in the cache.
+    """
+
+    CACHE_PREFIX = 'personalization:'
+    CACHE_TIMEOUT = 60 * 60  # Also bounds how long a set refilled mid-write can stay stale
+    RECENTLY_VIEWED_LIMIT = 20
+    RECENTLY_VIEWED_TIMEOUT = 60 * 60 * 24 * 30
+
+    @staticmethod
+    def for_request(request):
+        """The request's Personalization (created once per request)"""
+        if not hasattr(request, '_personalization'):
+            request._personalization = Personalization(request.user)
+        return request._personalization
+
+    @staticmethod
+    def cache_key(user_id, kind):
+        return f"{PersonalizationService.CACHE_PREFIX}{kind}:{user_id}"
+
+    @staticmethod
+    def _query(user_id, kind):
+        if kind == 'wishlist':
+            return WishlistItem.objects.filter(wishlist__user_id=user_id).values_list('product_id', flat=True)
+        if kind == 'cart':
+            return CartItem.objects.filter(cart__user_id=user_id).values_list('variant_id', flat=True)
+        return []  # Recently viewed ids only exist in the cache
+
+    @staticmethod
+    def load(user_id, kind):
+        """frozenset of ids of `kind` ('wishlist', 'cart' or 'viewed') for the user"""
+        key = PersonalizationService.cache_key(user_id, kind)
+        ids = cache.get(key)
+        if ids is None:
+            ids = list(PersonalizationService._query(user_id, kind))
+            cache.set(key, ids, PersonalizationService.CACHE_TIMEOUT)
+        return frozenset(ids)
+
+    @staticmethod
+    def invalidate(user_id, *kinds):
+        """Drop the cached sets once the current transaction commits"""
+        keys = [PersonalizationService.cache_key(user_id, kind) for kind in kinds]
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+    @staticmethod
+    def record_view(user, product_id):
+        """Remember that `user` opened a product page (most recent first, bounded)"""
+        if not user.is_authenticated:
+            return
+        key = PersonalizationService.cache_key(user.pk, 'viewed')
+        viewed = [pk for pk in cache.get(key) or [] if pk != product_id]
+        viewed.insert(0, product_id)
+        cache.set(
+            key, viewed[:PersonalizationService.RECENTLY_VIEWED_LIMIT], PersonalizationService.RECENTLY_VIEWED_TIMEOUT,
+        )
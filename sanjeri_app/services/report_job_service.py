@@ -0,0 +1,329 @@
+# sanjeri_app/services/report_job_service.py
+import hashlib
+import json
+import tempfile
+import traceback
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import Q
+from django.http import FileResponse, HttpResponse
+from django.utils import timezone
+from ..models import ReportJob
+from .ledger_service import LedgerService
+from .sales_rollup_service import SalesRollupService
+
+
+artifact_storage = FileSystemStorage(location=settings.REPORT_ARTIFACT_ROOT)
+
+
+class JobProgress:
+    """Maps rows done out of an expected total onto the job's 0-100 progress"""
+
+    START = 5
+    END = 95
+    STEP = 2  # Minimum change (percent) between progress writes
+
+    def __init__(self, job):
+        self.job = job
+        self.total = 0
+        self.reported = self.START
+
+    def set_total(self, total):
+        self.total = total
+
+    def update(self, done):
+        if not self.total:
+            return
+        percent = min(self.END, self.START + (self.END - self.START) * done // self.total)
+        if percent >= self.reported + self.STEP:
+            self.reported = percent
+            ReportJob.objects.filter(pk=self.job.pk).update(progress=percent)
+
+    def track(self, iterable):
+        """Yield from `iterable`, updating progress as items pass through"""
+        for done, item in enumerate(iterable, 1):
+            self.update(done)
+            yield item
+
+
+def build_sales_report(params, export_format, progress):
+    from ..views.sales_report_views import sales_report_export_data, export_report
+
+    data = sales_report_export_data(
+        ReportJobService.parse_date(params['start_date']),
+        ReportJobService.parse_date(params['end_date']),
+        params['date_label'],
+    )
+    progress.set_total(data['total_sales_count'])
+    response = export_report(None, data, export_format)
+    if export_format == 'csv':
+        # One streamed chunk per CSV row
+        response.streaming_content = progress.track(response.streaming_content)
+    return response
+
+
+def build_ledger_book(params, export_format, progress):
+    from ..views.admin_views import generate_csv_ledger, generate_excel_ledger
+
+    start_date = ReportJobService.parse_date(params['start_date'])
+    end_date = ReportJobService.parse_date(params['end_date'])
+    totals = LedgerService.totals(start_date, end_date)
+    progress.set_total(totals['orders_count'] + totals['wallet_count'])
+
+    opening_balance = LedgerService.opening_balance(start_date)
+    entries = progress.track(LedgerService.entries(start_date, end_date, opening_balance))
+    if export_format == 'csv':
+        return generate_csv_ledger(entries, start_date, end_date, opening_balance)
+    return generate_excel_ledger(entries, start_date, end_date, opening_balance)
+
+
+class ReportJobService:
+    """Queue, generate, cache and serve report exports (see ReportJob)"""
+
+    # report_type -> (builder, formats it supports)
+    BUILDERS = {
+        'sales_report': (build_sales_report, ['csv', 'excel', 'pdf']),
+        'ledger_book': (build_ledger_book, ['csv', 'excel']),
+    }
+
+    EXTENSIONS = {'csv': 'csv', 'excel': 'xlsx', 'pdf': 'pdf'}
+
+    # A running job not finished after this long is assumed to have lost its worker
+    STALE_AFTER = timedelta(hours=1)
+
+    @staticmethod
+    def parse_date(value):
+        return datetime.strptime(value, '%Y-%m-%d').date()
+
+    @staticmethod
+    def sales_report_params(start_date, end_date, date_label):
+        return {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'date_label': date_label,
+        }
+
+    @staticmethod
+    def ledger_book_params(start_date, end_date):
+        return {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+        }
+
+    @staticmethod
+    def data_version(report_type, params):
+        """
+        Identifies the state of the data a report is built from; a new value
+        means stored artifacts for the same params are out of date.
+        """
+        start_date = ReportJobService.parse_date(params['start_date'])
+        end_date = ReportJobService.parse_date(params['end_date'])
+        # Both kept in the database: a cache flush can't bring back an old version
+        if report_type == 'sales_report':
+            return f"rollup-{SalesRollupService.data_version(start_date, end_date)}"
+        return f"ledger-{LedgerService.data_version(end_date)}"
+
+    @staticmethod
+    def cache_key(report_type, params, export_format, data_version):
+        key = json.dumps([report_type, params, export_format, data_version], sort_keys=True)
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @staticmethod
+    def artifact_name(cache_key, export_format):
+        return f"{cache_key[:2]}/{cache_key}.{ReportJobService.EXTENSIONS[export_format]}"
+
+    @staticmethod
+    def validate(report_type, export_format):
+        if report_type not in ReportJobService.BUILDERS:
+            raise ValueError(f"Unknown report type '{report_type}'")
+        if export_format not in ReportJobService.BUILDERS[report_type][1]:
+            raise ValueError(f"{report_type} cannot be exported as '{export_format}'")
+
+    @staticmethod
+    def find_done(cache_key):
+        """Finished job for cache_key whose artifact is still on disk"""
+        job = ReportJob.objects.filter(cache_key=cache_key, status='done').order_by('-finished_at').first()
+        if job and artifact_storage.exists(job.artifact):
+            return job
+        return None
+
+    @staticmethod
+    def request(report_type, params, export_format, user=None):
+        """
+        Return (job, created). An identical report (same cache key) that is
+        already queued, running or done is returned instead of a new job.
+        """
+        ReportJobService.validate(report_type, export_format)
+        data_version = ReportJobService.data_version(report_type, params)
+        cache_key = ReportJobService.cache_key(report_type, params, export_format, data_version)
+
+        job = ReportJobService.find_done(cache_key)
+        if job is None:
+            job = ReportJob.objects.filter(
+                cache_key=cache_key,
+                status__in=['queued', 'running']
+            ).order_by('-created_at').first()
+        if job is not None:
+            return job, False
+
+        job = ReportJob.objects.create(
+            report_type=report_type,
+            format=export_format,
+            params=params,
+            data_version=data_version,
+            cache_key=cache_key,
+            requested_by=user,
+        )
+        return job, True
+
+    @staticmethod
+    def export_response(report_type, params, export_format, user=None):
+        """
+        For the direct export links: (download response, None) when this
+        exact report was already generated, else (None, job) with the job
+        that is queued or running for it. Never builds the report in the request.
+        """
+        job, _ = ReportJobService.request(report_type, params, export_format, user=user)
+        if job.status != 'done':
+            return None, job
+        # The export URL names a date range, not a data version: browsers must revalidate it
+        return ReportJobService.serve(job, cache_control='private, no-cache'), None
+
+    @staticmethod
+    def status_by_id(job_id):
+        """status() of the job a page was sent back with (?job=<id>), or None"""
+        job = ReportJob.objects.filter(pk=job_id).first() if str(job_id).isdigit() else None
+        return ReportJobService.status(job) if job else None
+
+    @staticmethod
+    def expire_artifacts(now=None):
+        """
+        Delete the files of reports finished more than
+        REPORT_ARTIFACT_MAX_AGE_DAYS ago and mark their jobs expired. A file
+        still used by a newer finished job of the same key is kept.
+        Returns the number of jobs expired.
+        """
+        cutoff = (now or timezone.now()) - timedelta(days=settings.REPORT_ARTIFACT_MAX_AGE_DAYS)
+        jobs = list(ReportJob.objects.filter(status='done', finished_at__lt=cutoff).values_list('pk', 'artifact'))
+        if not jobs:
+            return 0
+
+        in_use = set(
+            ReportJob.objects.filter(
+                status='done', finished_at__gte=cutoff, artifact__in={artifact for pk, artifact in jobs},
+            ).values_list('artifact', flat=True)
+        )
+        for artifact in {artifact for pk, artifact in jobs} - in_use:
+            if artifact and artifact_storage.exists(artifact):
+                artifact_storage.delete(artifact)
+
+        return ReportJob.objects.filter(pk__in=[pk for pk, artifact in jobs]).update(status='expired')
+
+    @staticmethod
+    def claim_next():
+        """Mark the oldest queued (or abandoned) job running and return it"""
+        stale = timezone.now() - ReportJobService.STALE_AFTER
+        with transaction.atomic():
+            job = ReportJob.objects.select_for_update(skip_locked=True).filter(
+                Q(status='queued') | Q(status='running', started_at__lt=stale)
+            ).order_by('created_at').first()
+            if job is None:
+                return None
+            job.status = 'running'
+            job.progress = JobProgress.START
+            job.started_at = timezone.now()
+            job.error = ''
+            job.save(update_fields=['status', 'progress', 'started_at', 'error'])
+        return job
+
+    @staticmethod
+    def run(job):
+        """Generate the job's file into the artifact store"""
+        builder = ReportJobService.BUILDERS[job.report_type][0]
+        artifact = ReportJobService.artifact_name(job.cache_key, job.format)
+
+        try:
+            if not artifact_storage.exists(artifact):
+                response = builder(job.params, job.format, JobProgress(job))
+                with tempfile.TemporaryFile() as spool:
+                    for chunk in response:
+                        spool.write(chunk)
+                    response.close()
+                    spool.seek(0)
+                    artifact = artifact_storage.save(artifact, File(spool))
+
+            job.artifact = artifact
+            job.filename = (
+                f"{job.report_type}_{job.params['start_date']}_to_{job.params['end_date']}"
+                f".{ReportJobService.EXTENSIONS[job.format]}"
+            )
+            job.content_type = ReportJobService.content_type(job.format)
+            job.size = artifact_storage.size(artifact)
+            job.status = 'done'
+            job.progress = 100
+        except Exception as e:
+            print(f"❌ Report job {job.id} failed: {e}")
+            traceback.print_exc()
+            job.status = 'failed'
+            job.error = str(e)
+
+        job.finished_at = timezone.now()
+        job.save()
+        return job
+
+    @staticmethod
+    def content_type(export_format):
+        return {
+            'csv': 'text/csv',
+            'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            'pdf': 'application/pdf',
+        }[export_format]
+
+    @staticmethod
+    def serve(job, cache_control='private, max-age=86400'):
+        """
+        Download response for a finished job. With REPORT_SENDFILE_HEADER set
+        (X-Accel-Redirect for nginx, X-Sendfile for Apache) the web server
+        sends the file; otherwise Django streams it.
+        """
+        sendfile_header = getattr(settings, 'REPORT_SENDFILE_HEADER', None)
+        if sendfile_header:
+            response = HttpResponse(content_type=job.content_type)
+            if sendfile_header == 'X-Accel-Redirect':
+                prefix = getattr(settings, 'REPORT_SENDFILE_PREFIX', '/protected/reports/')
+                response[sendfile_header] = prefix + job.artifact
+            else:
+                response[sendfile_header] = artifact_storage.path(job.artifact)
+            response['Content-Disposition'] = f'attachment; filename="{job.filename}"'
+        else:
+            response = FileResponse(
+                artifact_storage.open(job.artifact, 'rb'),
+                as_attachment=True,
+                filename=job.filename,
+                content_type=job.content_type
+            )
+            response['Content-Length'] = job.size
+
+        # The artifact never changes for a given key
+        response['ETag'] = f'"{job.cache_key}"'
+        response['Cache-Control'] = cache_control
+        return response
+
+    @staticmethod
+    def status(job):
+        return {
+            'id': job.id,
+            'report_type': job.report_type,
+            'format': job.format,
+            'status': job.status,
+            'progress': job.progress,
+            'error': job.error,
+            'filename': job.filename,
+            'size': job.size,
+            'created_at': job.created_at.isoformat(),
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+            'download_url': f"/admin/reports/jobs/{job.id}/download/" if job.status == 'done' else None,
+        }
@@ -0,0 +1,178 @@
+# sanjeri_app/services/sales_report_service.py
+from datetime import timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Sum
+from ..models import Coupon, SalesDailyRollup
+from .sales_rollup_service import SalesRollupService
+
+
+class SalesReport:
+    """
+    Sales report figures for a date range, computed from SalesDailyRollup
+    with a fixed number of queries and cached per (range, status groups,
+    rollup data version). The HTML report and every exporter share one
+    instance, so viewing a report and then exporting it aggregates once.
+    """
+    CACHE_TIMEOUT = 60 * 15
+
+    def __init__(self, start_date, end_date, status_groups=None):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.status_groups = sorted(status_groups or SalesDailyRollup.SALE_GROUPS)
+
+    @property
+    def cache_key(self):
+        return 'sales_report:{}:{}:{}:v{}'.format(
+            self.start_date,
+            self.end_date,
+            ','.join(self.status_groups),
+            SalesRollupService.data_version(self.start_date, self.end_date),
+        )
+
+    def get_data(self):
+        """All report figures as a plain dict (cached)"""
+        return cache.get_or_set(self.cache_key, self.compute, self.CACHE_TIMEOUT)
+
+    def order_rollups(self):
+        return SalesDailyRollup.objects.orders().between(
+            self.start_date, self.end_date
+        ).filter(status_group__in=self.status_groups)
+
+    def compute(self):
+        summary = self.summary()
+        payment_methods, coupon_stats = self.breakdowns()
+        return {
+            **summary,
+            'daily_sales': self.daily_series(),
+            'top_products': self.top_products(),
+            'payment_methods': payment_methods,
+            'coupon_stats': coupon_stats,
+        }
+
+    def summary(self):
+        """Every summary figure from a single aggregate()"""
+        totals = self.order_rollups().aggregate(
+            total_sales_count=Sum('order_count'),
+            total_order_amount=Sum('gross'),
+            total_discount=Sum('discount'),
+            total_coupon_discount=Sum('coupon_discount'),
+            total_tax=Sum('tax'),
+            total_shipping=Sum('shipping'),
+        )
+        summary = {
+            key: value if value is not None else (0 if key == 'total_sales_count' else Decimal('0'))
+            for key, value in totals.items()
+        }
+
+        # Net revenue (after discounts)
+        summary['net_revenue'] = (
+            summary['total_order_amount'] - summary['total_discount'] - summary['total_coupon_discount']
+        )
+        if summary['total_sales_count'] > 0:
+            summary['avg_order_value'] = summary['total_order_amount'] / summary['total_sales_count']
+        else:
+            summary['avg_order_value'] = Decimal('0')
+        return summary
+
+    def daily_series(self):
+        """[(date, total)] for every day in the range, from one GROUP BY day"""
+        totals = dict(
+            self.order_rollups().values('day').annotate(
+                total=Sum('gross')
+            ).values_list('day', 'total')
+        )
+        series = []
+        day = self.start_date
+        while day <= self.end_date:
+            series.append((day, totals.get(day) or Decimal('0')))
+            day += timedelta(days=1)
+        return series
+
+    def top_products(self, limit=10):
+        return list(
+            SalesDailyRollup.objects.items().between(
+                self.start_date, self.end_date
+            ).filter(
+                status_group__in=self.status_groups
+            ).values(
+                'variant__product__name',
+                'variant__volume_ml',
+                'variant__gender'
+            ).annotate(
+                total_quantity=Sum('units'),
+                total_revenue=Sum('gross')
+            ).order_by('-total_quantity')[:limit]
+        )
+
+    def breakdowns(self, coupon_limit=10):
+        """
+        Payment-method and coupon breakdowns. On PostgreSQL both come from one
+        GROUP BY GROUPING SETS query; other backends run the two GROUP BYs.
+        """
+        if connection.vendor == 'postgresql':
+            rows = self._grouping_sets_breakdown()
+            payment_methods = [row for row in rows if row['grouping'] == 'payment_method']
+            coupon_stats = [row for row in rows if row['grouping'] == 'coupon']
+        else:
+            rollups = self.order_rollups()
+            payment_methods = list(
+                rollups.values('payment_method').annotate(
+                    count=Sum('order_count'),
+                    total=Sum('gross')
+                )
+            )
+            coupon_stats = list(
+                rollups.filter(coupon__isnull=False).values('coupon__code').annotate(
+                    usage_count=Sum('order_count'),
+                    total_discount=Sum('coupon_discount')
+                )
+            )
+
+        payment_methods = [
+            {'payment_method': row['payment_method'], 'count': row['count'], 'total': row['total']}
+            for row in sorted(payment_methods, key=lambda row: row['total'] or 0, reverse=True)
+        ]
+        coupon_stats = [
+            {'coupon__code': row['coupon__code'], 'usage_count': row['usage_count'], 'total_discount': row['total_discount']}
+            for row in sorted(coupon_stats, key=lambda row: row['usage_count'], reverse=True)[:coupon_limit]
+        ]
+        return payment_methods, coupon_stats
+
+    def _grouping_sets_breakdown(self):
+        rollup_table = SalesDailyRollup._meta.db_table
+        coupon_table = Coupon._meta.db_table
+        sql = f"""
+            SELECT
+                CASE WHEN GROUPING(r.payment_method) = 0 THEN 'payment_method' ELSE 'coupon' END,
+                r.payment_method,
+                c.code,
+                SUM(r.order_count),
+                SUM(r.gross),
+                SUM(r.coupon_discount)
+            FROM {rollup_table} r
+            LEFT JOIN {coupon_table} c ON c.id = r.coupon_id
+            WHERE r.level = 'order'
+              AND r.day BETWEEN %s AND %s
+              AND r.status_group = ANY(%s)
+            GROUP BY GROUPING SETS ((r.payment_method), (c.code))
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [self.start_date, self.end_date, self.status_groups])
+            rows = cursor.fetchall()
+
+        breakdown = []
+        for grouping, payment_method, code, count, total, coupon_discount in rows:
+            if grouping == 'coupon' and code is None:
+                continue  # orders without a coupon
+            breakdown.append({
+                'grouping': grouping,
+                'payment_method': payment_method,
+                'coupon__code': code,
+                'count': count,
+                'usage_count': count,
+                'total': total,
+                'total_discount': coupon_discount,
+            })
+        return breakdown
@@ -0,0 +1,216 @@
+# sanjeri_app/services/sales_rollup_service.py
+import traceback
+from datetime import timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Case, When, Value, F, Sum, Count, CharField, BooleanField
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from ..models import Order, OrderItem, SalesDailyRollup, SalesRollupDay, SalesRollupPendingDay
+
+
+class SalesRollupService:
+    """
+    Build and maintain SalesDailyRollup rows from Order / OrderItem. Writes
+    only queue their day (schedule_rebuild); the `refresh_sales_rollup`
+    worker rebuilds queued days with rebuild_pending.
+    """
+
+    ORDER_KEY = ('day', 'payment_method', 'status_group', 'is_paid', 'coupon_id')
+
+    @staticmethod
+    def data_version(start_date=None, end_date=None):
+        """
+        Changes whenever a day in [start_date, end_date] (default: all days)
+        is rebuilt, for keying caches derived from the rollup. Read from the
+        database, so it survives cache restarts and agrees across processes.
+        """
+        days = SalesRollupDay.objects.all()
+        if start_date is not None:
+            days = days.filter(day__range=[start_date, end_date])
+        return days.aggregate(version=Sum('version'))['version'] or 0
+
+    @staticmethod
+    def _lock_days(start_date, end_date):
+        """Create the days' SalesRollupDay rows if needed and lock them (in day order, so rebuilds can't deadlock)"""
+        days = [start_date + timedelta(days=n) for n in range((end_date - start_date).days + 1)]
+        SalesRollupDay.objects.bulk_create([SalesRollupDay(day=day) for day in days], ignore_conflicts=True)
+        list(SalesRollupDay.objects.select_for_update().filter(day__range=[start_date, end_date]).order_by('day'))
+
+    @staticmethod
+    def status_group_expression(prefix=''):
+        groups = {}
+        for status, group in SalesDailyRollup.STATUS_GROUPS.items():
+            groups.setdefault(group, []).append(status)
+        return Case(
+            *[When(**{f'{prefix}status__in': statuses}, then=Value(group)) for group, statuses in groups.items()],
+            default=Value('other'),
+            output_field=CharField(),
+        )
+
+    @staticmethod
+    def is_paid_expression(prefix=''):
+        return Case(
+            When(**{f'{prefix}payment_status__in': SalesDailyRollup.PAID_PAYMENT_STATUSES}, then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        )
+
+    @staticmethod
+    def rebuild(start_date, end_date):
+        """
+        Replace the rollup rows for [start_date, end_date] (local dates) with
+        fresh aggregates: one grouped query over orders and one over items.
+        The days are locked first, so a concurrent rebuild of the same day
+        waits and then aggregates what this one committed.
+        """
+        with transaction.atomic():
+            SalesRollupService._lock_days(start_date, end_date)
+            rollups = SalesRollupService._aggregate(start_date, end_date)
+            SalesDailyRollup.objects.between(start_date, end_date).delete()
+            SalesDailyRollup.objects.bulk_create(rollups, batch_size=1000)
+            SalesRollupDay.objects.filter(day__range=[start_date, end_date]).update(
+                version=F('version') + 1, rebuilt_at=timezone.now(),
+            )
+
+        return len(rollups)
+
+    @staticmethod
+    def _aggregate(start_date, end_date):
+        orders = Order.objects.filter(created_at__date__range=[start_date, end_date])
+        items = OrderItem.objects.filter(order__created_at__date__range=[start_date, end_date])
+
+        order_rows = orders.order_by().values(
+            'payment_method', 'coupon_id',
+            day=TruncDate('created_at'),
+            status_group=SalesRollupService.status_group_expression(),
+            is_paid=SalesRollupService.is_paid_expression(),
+        ).annotate(
+            order_count=Count('id'),
+            gross=Sum('total_amount'),
+            discount=Sum('discount_amount'),
+            coupon_discount=Sum('coupon_discount'),
+            tax=Sum('tax_amount'),
+            shipping=Sum('shipping_charge'),
+        )
+
+        item_rows = items.order_by().values(
+            'variant_id',
+            day=TruncDate('order__created_at'),
+            payment_method=F('order__payment_method'),
+            coupon_id=F('order__coupon_id'),
+            status_group=SalesRollupService.status_group_expression('order__'),
+            is_paid=SalesRollupService.is_paid_expression('order__'),
+            product_id=F('variant__product_id'),
+            category_id=F('variant__product__category_id'),
+            brand=F('variant__product__brand'),
+        ).annotate(
+            order_count=Count('order_id', distinct=True),
+            gross=Sum('total_price'),
+            units=Sum('quantity'),
+        )
+
+        rollups = []
+        units_by_order_key = {}
+        for row in item_rows:
+            key = tuple(row[name] for name in SalesRollupService.ORDER_KEY)
+            units_by_order_key[key] = units_by_order_key.get(key, 0) + (row['units'] or 0)
+            rollups.append(SalesDailyRollup(
+                level='item',
+                **{name: row[name] for name in SalesRollupService.ORDER_KEY},
+                variant_id=row['variant_id'],
+                product_id=row['product_id'],
+                category_id=row['category_id'],
+                brand=row['brand'],
+                order_count=row['order_count'],
+                gross=row['gross'] or Decimal('0'),
+                units=row['units'] or 0,
+            ))
+
+        for row in order_rows:
+            key = tuple(row[name] for name in SalesRollupService.ORDER_KEY)
+            rollups.append(SalesDailyRollup(
+                level='order',
+                **{name: row[name] for name in SalesRollupService.ORDER_KEY},
+                order_count=row['order_count'],
+                gross=row['gross'] or Decimal('0'),
+                discount=row['discount'] or Decimal('0'),
+                coupon_discount=row['coupon_discount'] or Decimal('0'),
+                tax=row['tax'] or Decimal('0'),
+                shipping=row['shipping'] or Decimal('0'),
+                units=units_by_order_key.get(key, 0),
+            ))
+
+        return rollups
+
+    @staticmethod
+    def schedule_rebuild(day):
+        """
+        Queue `day` for the rollup worker once the current transaction
+        commits (immediately when not in one). Every day scheduled inside
+        one transaction is queued by the first callback to run, in one
+        INSERT; a failure to queue is logged and does not fail the already
+        committed change.
+        """
+        connection = transaction.get_connection()
+        pending = getattr(connection, '_sales_rollup_pending', None)
+        if pending is None:
+            pending = connection._sales_rollup_pending = set()
+        pending.add(day)
+
+        def queue_pending():
+            if not pending:
+                return
+            days = sorted(pending)
+            pending.clear()
+            SalesRollupPendingDay.objects.bulk_create([SalesRollupPendingDay(day=day) for day in days])
+
+        transaction.on_commit(queue_pending, robust=True)
+
+    @staticmethod
+    def rebuild_pending(limit=50):
+        """
+        Rebuild up to `limit` queued days, oldest day first, and return how
+        many were rebuilt. A day's queue rows are locked and deleted in the
+        transaction that rebuilds it, so a failed rebuild leaves them queued
+        and rows queued meanwhile trigger another rebuild.
+        """
+        days = list(
+            SalesRollupPendingDay.objects.order_by('day').values_list('day', flat=True).distinct()[:limit]
+        )
+        rebuilt = 0
+        for day in days:
+            try:
+                with transaction.atomic():
+                    queued = list(
+                        SalesRollupPendingDay.objects.select_for_update(skip_locked=True)
+                        .filter(day=day).values_list('pk', flat=True)
+                    )
+                    if not queued:
+                        continue  # Another worker has it
+                    SalesRollupService.rebuild(day, day)
+                    SalesRollupPendingDay.objects.filter(pk__in=queued).delete()
+            except Exception as e:
+                print(f"❌ Sales rollup rebuild failed for {day}: {e}")
+                traceback.print_exc()
+                continue
+            rebuilt += 1
+        return rebuilt
+
+    @staticmethod
+    def schedule_rebuild_for_orders(order_ids):
+        """Schedule the days of the given orders (for queryset.update() paths that skip signals)"""
+        created = Order.objects.filter(id__in=order_ids).values_list('created_at', flat=True)
+        for day in {timezone.localdate(created_at) for created_at in created}:
+            SalesRollupService.schedule_rebuild(day)
+
+    @staticmethod
+    def backfill(start_date, end_date, window_days=31):
+        """Rebuild a long range window by window to keep each rebuild bounded"""
+        total = 0
+        window_start = start_date
+        while window_start <= end_date:
+            window_end = min(window_start + timedelta(days=window_days - 1), end_date)
+            total += SalesRollupService.rebuild(window_start, window_end)
+            window_start = window_end + timedelta(days=1)
+        return total
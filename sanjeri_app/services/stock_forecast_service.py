@@ -0,0 +1,140 @@
+# sanjeri_app/services/stock_forecast_service.py
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from ..models import OrderItem, ProductVariant, StockForecast
+
+
+class StockForecastService:
+    """
+    Sales velocity per variant from one grouped query over order items
+    (units per variant per day), smoothed on a NumPy matrix, and the days of
+    cover / reorder point that follow from it, stored in StockForecast.
+    """
+
+    HISTORY_DAYS = 90
+    SMOOTHING_SPAN = 14  # days; alpha = 2 / (span + 1)
+    EXCLUDED_STATUSES = ['cancelled']
+    BATCH_SIZE = 1000
+
+    UPDATE_FIELDS = [
+        'units_7d', 'units_30d', 'daily_velocity', 'reorder_point',
+        'stock', 'days_of_cover', 'needs_reorder', 'computed_at',
+    ]
+
+    @staticmethod
+    def lead_time_days():
+        return getattr(settings, 'STOCK_LEAD_TIME_DAYS', 7)
+
+    @staticmethod
+    def safety_days():
+        return getattr(settings, 'STOCK_SAFETY_DAYS', 3)
+
+    @staticmethod
+    def daily_units(start, end):
+        """(variant_id, day, units) for items of orders placed in [start, end)"""
+        return OrderItem.objects.filter(
+            order__created_at__gte=start,
+            order__created_at__lt=end,
+            is_cancelled=False,
+        ).exclude(
+            order__status__in=StockForecastService.EXCLUDED_STATUSES
+        ).exclude(
+            order__payment_status='failed'
+        ).annotate(
+            day=TruncDate('order__created_at')
+        ).values('variant_id', 'day').annotate(
+            units=Sum('quantity')
+        ).order_by().values_list('variant_id', 'day', 'units')
+
+    @staticmethod
+    def smoothing_weights(days):
+        """
+        Weights that turn a row of daily sales (oldest first) into its
+        exponentially smoothed level on the last day, so smoothing every
+        variant is one matrix-vector product.
+        """
+        alpha = 2 / (StockForecastService.SMOOTHING_SPAN + 1)
+        weights = alpha * (1 - alpha) ** np.arange(days - 1, -1, -1, dtype=np.float64)
+        weights[0] = (1 - alpha) ** (days - 1)  # the series starts at its first value
+        return weights
+
+    @staticmethod
+    def compute(now=None):
+        """Recompute the forecast of every variant; returns the number that need reordering"""
+        now = now or timezone.now()
+        today = timezone.localdate(now)
+        days = StockForecastService.HISTORY_DAYS
+        first_day = today - timedelta(days=days)
+
+        # Completed days only, so today's partial sales don't drag velocity down
+        start = timezone.make_aware(datetime.combine(first_day, time.min))
+        end = timezone.make_aware(datetime.combine(today, time.min))
+
+        variants = list(ProductVariant.objects.order_by('id').values_list('id', 'stock'))
+        variant_ids = np.fromiter((row[0] for row in variants), np.int64, len(variants))
+        stock = np.fromiter((row[1] for row in variants), np.float64, len(variants))
+
+        rows = list(StockForecastService.daily_units(start, end))
+        sold_ids = np.fromiter((row[0] for row in rows), np.int64, len(rows))
+        day_index = np.fromiter(((row[1] - first_day).days for row in rows), np.int64, len(rows))
+        units = np.fromiter((row[2] for row in rows), np.float64, len(rows))
+
+        # variants x days matrix of units sold; sales of deleted variants are dropped
+        position = np.searchsorted(variant_ids, sold_ids)
+        known = position < len(variant_ids)
+        known[known] = variant_ids[position[known]] == sold_ids[known]
+        sales = np.zeros((len(variants), days), dtype=np.float64)
+        np.add.at(sales, (position[known], day_index[known]), units[known])
+
+        units_7d = sales[:, -7:].sum(axis=1)
+        units_30d = sales[:, -30:].sum(axis=1)
+        velocity = np.round(sales @ StockForecastService.smoothing_weights(days), 3)
+
+        horizon = StockForecastService.lead_time_days() + StockForecastService.safety_days()
+        reorder_point = np.ceil(np.round(velocity * horizon, 6))
+        selling = velocity > 0
+        days_of_cover = np.minimum(
+            np.divide(stock, velocity, out=np.full(len(variants), np.nan), where=selling),
+            StockForecast.MAX_DAYS_OF_COVER
+        )
+        needs_reorder = selling & (stock <= reorder_point)
+
+        existing = StockForecast.objects.in_bulk(field_name='variant_id')
+        to_update = []
+        to_create = []
+        for index, (variant_id, variant_stock) in enumerate(variants):
+            values = {
+                'units_7d': int(units_7d[index]),
+                'units_30d': int(units_30d[index]),
+                'daily_velocity': Decimal(f"{velocity[index]:.3f}"),
+                'reorder_point': int(reorder_point[index]),
+                'stock': variant_stock,
+                'days_of_cover': (
+                    Decimal(f"{days_of_cover[index]:.1f}") if selling[index] else None
+                ),
+                'needs_reorder': bool(needs_reorder[index]),
+                'computed_at': now,
+            }
+            forecast = existing.get(variant_id)
+            if forecast is None:
+                to_create.append(StockForecast(variant_id=variant_id, **values))
+            else:
+                for field, value in values.items():
+                    setattr(forecast, field, value)
+                to_update.append(forecast)
+
+        with transaction.atomic():
+            StockForecast.objects.bulk_update(
+                to_update, StockForecastService.UPDATE_FIELDS, batch_size=StockForecastService.BATCH_SIZE
+            )
+            StockForecast.objects.bulk_create(to_create, batch_size=StockForecastService.BATCH_SIZE)
+            # Variants deleted since the last run
+            StockForecast.objects.filter(computed_at__lt=now).delete()
+
+        return int(needs_reorder.sum())
@@ -0,0 +1,91 @@
+# sanjeri_app/services/stock_ledger_service.py
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from ..models import ProductVariant, StockMovement, StockSnapshot
+
+
+class StockLedgerService:
+    """
+    Point-in-time reads over the stock ledger. Stock at time T is the
+    nearest StockSnapshot at or before T plus the movements between the two
+    (both lookups use the (variant, time) indexes), so the sum never covers
+    more than one snapshot interval.
+    """
+
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def _movement_sum(**filters):
+        movements = StockMovement.objects.filter(variant_id=OuterRef('pk'), **filters).order_by()
+        return Coalesce(
+            Subquery(movements.values('variant_id').annotate(total=Sum('delta')).values('total')[:1]),
+            0,
+        )
+
+    @staticmethod
+    def stock_at(variant_ids, at):
+        """{variant_id: stock at `at`} in one query"""
+        snapshots = StockSnapshot.objects.filter(variant_id=OuterRef('pk'), taken_at__lte=at).order_by('-taken_at')
+        variants = ProductVariant.objects.with_deleted().filter(pk__in=variant_ids).annotate(
+            snapshot_at=Subquery(snapshots.values('taken_at')[:1]),
+            snapshot_stock=Subquery(snapshots.values('stock')[:1]),
+        ).annotate(
+            stock_at=Case(
+                When(snapshot_at__isnull=False, then=F('snapshot_stock') + StockLedgerService._movement_sum(
+                    created_at__gt=OuterRef('snapshot_at'), created_at__lte=at,
+                )),
+                # No snapshot that old yet: walk back from the current stock
+                default=F('stock') - StockLedgerService._movement_sum(created_at__gt=at),
+                output_field=IntegerField(),
+            ),
+        )
+        return dict(variants.values_list('pk', 'stock_at'))
+
+    @staticmethod
+    def movements_between(start, end, variant_ids=None):
+        """
+        Movements per variant in [start, end) from one grouped query:
+        {variant_id: {'net', 'received', 'removed', 'by_reason': {reason: net}}}
+        """
+        movements = StockMovement.objects.filter(created_at__gte=start, created_at__lt=end)
+        if variant_ids is not None:
+            movements = movements.filter(variant_id__in=variant_ids)
+        rows = movements.values('variant_id', 'reason').annotate(
+            net=Sum('delta'),
+            received=Coalesce(Sum('delta', filter=Q(delta__gt=0)), 0),
+            removed=Coalesce(Sum('delta', filter=Q(delta__lt=0)), 0),
+        ).order_by()
+
+        totals = {}
+        for row in rows:
+            entry = totals.setdefault(row['variant_id'], {'net': 0, 'received': 0, 'removed': 0, 'by_reason': {}})
+            entry['net'] += row['net']
+            entry['received'] += row['received']
+            entry['removed'] -= row['removed']
+            entry['by_reason'][row['reason']] = row['net']
+        return totals
+
+    @staticmethod
+    def snapshot():
+        """
+        Record every variant's current stock; returns the number of snapshots.
+        Each batch locks its variants first, so a movement is either already
+        in the snapshot or timestamped after it.
+        """
+        variant_ids = list(ProductVariant.objects.with_deleted().order_by('id').values_list('id', flat=True))
+        batch_size = StockLedgerService.BATCH_SIZE
+        for start in range(0, len(variant_ids), batch_size):
+            with transaction.atomic():
+                stock = list(
+                    ProductVariant.objects.with_deleted().select_for_update().filter(
+                        id__in=variant_ids[start:start + batch_size]
+                    ).order_by('id').values_list('id', 'stock')
+                )
+                taken_at = timezone.now()
+                StockSnapshot.objects.bulk_create([
+                    StockSnapshot(variant_id=variant_id, stock=units, taken_at=taken_at)
+                    for variant_id, units in stock
+                ])
+        return len(variant_ids)
@@ -3,7 +3,13 @@ from decimal import Decimal
 from django.utils import timezone
 from django.db import transaction
 from django.core.exceptions import ValidationError
-from ..models import Wallet, WalletTransaction, Order
+from django.db.models import Case, When, F, Q, Sum, Value, DecimalField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from ..models import Wallet, WalletTransaction, Order, CustomUser
+from .sales_rollup_service import SalesRollupService
+from .account_summary_service import AccountSummaryService
+from .customer_stats_service import CustomerStatsService
+from .ledger_service import LedgerService
 
 class WalletService:
     """Service class for wallet operations"""
@@ -164,6 +170,139 @@ class WalletService:
         except Exception as e:
             return False, str(e)
     
+    @staticmethod
+    def bulk_approve_refunds(refund_ids, approved_by, approve_returns=False):
+        """
+        Approve many pending refunds in one database transaction.
+
+        Wallets are locked in id order, each wallet gets one credit for the sum
+        of its refunds, the transactions are completed with a single UPDATE and
+        the related orders are updated in bulk. With `approve_returns`, the
+        orders' return is marked approved as Order.approve_return() would.
+        Queryset updates skip post_save, so the wallet signals cannot credit
+        the same refund a second time.
+
+        Returns a list of per-refund results:
+        {'id', 'order_number', 'amount', 'success', 'message'}
+        """
+        refund_ids = sorted({int(refund_id) for refund_id in refund_ids})
+        results = {
+            refund_id: {
+                'id': refund_id,
+                'order_number': None,
+                'amount': None,
+                'success': False,
+                'message': 'Refund not found',
+            }
+            for refund_id in refund_ids
+        }
+        if not refund_ids:
+            return []
+
+        now = timezone.now()
+
+        with transaction.atomic():
+            rows = list(
+                WalletTransaction.objects.filter(id__in=refund_ids).values(
+                    'id', 'wallet_id', 'wallet__user_id', 'amount',
+                    'transaction_type', 'status', 'order_id', 'order__order_number'
+                )
+            )
+
+            # Lock every affected wallet in id order so concurrent batches
+            # cannot deadlock, then lock the refunds and re-read their status
+            wallet_ids = sorted({row['wallet_id'] for row in rows})
+            list(Wallet.objects.select_for_update().filter(id__in=wallet_ids).order_by('id').values_list('id', flat=True))
+            locked_status = dict(
+                WalletTransaction.objects.select_for_update().filter(id__in=refund_ids)
+                .order_by('id').values_list('id', 'status')
+            )
+
+            approved = []
+            for row in rows:
+                result = results[row['id']]
+                result['order_number'] = row['order__order_number']
+                result['amount'] = row['amount']
+                if row['transaction_type'] != 'REFUND':
+                    result['message'] = "Transaction is not a refund"
+                elif locked_status.get(row['id']) != 'PENDING':
+                    result['message'] = "Transaction is not in pending state"
+                else:
+                    approved.append(row)
+
+            if not approved:
+                return [results[refund_id] for refund_id in refund_ids]
+
+            credit_by_wallet = {}
+            refund_by_order = {}
+            for row in approved:
+                credit_by_wallet[row['wallet_id']] = credit_by_wallet.get(row['wallet_id'], Decimal('0')) + row['amount']
+                if row['order_id']:
+                    refund_by_order[row['order_id']] = refund_by_order.get(row['order_id'], Decimal('0')) + row['amount']
+
+            money = DecimalField(max_digits=12, decimal_places=2)
+
+            # One UPDATE crediting every wallet with the sum of its refunds
+            Wallet.objects.filter(id__in=credit_by_wallet).update(
+                balance=F('balance') + Case(
+                    *[When(id=wallet_id, then=Value(credit)) for wallet_id, credit in credit_by_wallet.items()],
+                    output_field=money,
+                ),
+                updated_at=now,
+            )
+
+            # Mirror the new balances onto CustomUser.wallet_balance
+            CustomUser.objects.filter(wallet__id__in=credit_by_wallet).update(
+                wallet_balance=Subquery(
+                    Wallet.objects.filter(user_id=OuterRef('pk')).values('balance')[:1]
+                )
+            )
+
+            WalletTransaction.objects.filter(id__in=[row['id'] for row in approved]).update(
+                status='COMPLETED',
+                admin_approved=True,
+                approved_by=approved_by,
+                updated_at=now,
+            )
+
+            if refund_by_order:
+                order_updates = {
+                    'refund_amount': Case(
+                        *[When(id=order_id, then=Value(amount)) for order_id, amount in refund_by_order.items()],
+                        output_field=money,
+                    ),
+                    'refund_to_wallet': True,
+                    'refund_processed_at': now,
+                    'updated_at': now,
+                }
+                if approve_returns:
+                    order_updates.update({
+                        'return_status': 'approved',
+                        'return_approved_at': now,
+                        'return_approved_by': approved_by,
+                        'status': 'refunded',
+                        'payment_status': Case(
+                            When(payment_status__in=['completed', 'success', 'partially_paid'], then=Value('refunded')),
+                            default=F('payment_status'),
+                        ),
+                    })
+                Order.objects.filter(id__in=refund_by_order).update(**order_updates)
+                if approve_returns:
+                    SalesRollupService.schedule_rebuild_for_orders(refund_by_order)
+                    LedgerService.bump_for_orders(refund_by_order)
+
+            # The bulk UPDATEs above bypass the wallet and order signals
+            LedgerService.bump_for_transactions([row['id'] for row in approved])
+            CustomerStatsService.schedule_refresh(*{row['wallet__user_id'] for row in approved})
+            AccountSummaryService.bump(*{row['wallet__user_id'] for row in approved})
+
+            for row in approved:
+                result = results[row['id']]
+                result['success'] = True
+                result['message'] = f"Refund of ₹{row['amount']} approved and credited to wallet"
+
+        return [results[refund_id] for refund_id in refund_ids]
+
     @staticmethod
     def reject_return_refund(transaction, rejection_reason=""):
         """
@@ -183,6 +322,27 @@ class WalletService:
         except Exception as e:
             return False, str(e)
     
+    @staticmethod
+    def completed_balance_expression(prefix='transactions__'):
+        """
+        Aggregate expression for the balance implied by COMPLETED transactions:
+        credits minus withdrawals. `prefix` is the lookup path from the queried
+        model to WalletTransaction ('' when aggregating WalletTransaction itself).
+        """
+        amount = F(f'{prefix}amount')
+        completed = Q(**{f'{prefix}status': 'COMPLETED'})
+        signed_amount = Case(
+            When(completed & Q(**{f'{prefix}transaction_type__in': WalletTransaction.CREDIT_TYPES}), then=amount),
+            When(completed & Q(**{f'{prefix}transaction_type__in': WalletTransaction.DEBIT_TYPES}), then=-amount),
+            default=Value(Decimal('0')),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        )
+        return Coalesce(
+            Sum(signed_amount),
+            Value(Decimal('0')),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        )
+
     @staticmethod
     def get_user_wallet_balance(user):
         """Get user's wallet balance"""
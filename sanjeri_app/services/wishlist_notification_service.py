@@ -0,0 +1,261 @@
+# sanjeri_app/services/wishlist_notification_service.py
+import traceback
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Count, Q
+from django.urls import reverse
+from django.utils import timezone
+from ..models import (
+    CategoryOffer, CustomUser, Product, ProductOffer, ProductVariant, WishlistAlert, WishlistItem,
+    WishlistNotification,
+)
+
+
+class WishlistNotificationService:
+    """
+    Price-drop, back-in-stock and offer mails for wishlisted products.
+    Detection never looks at wishlists: wishlist_signals (prices, offers)
+    and StockMovement.apply (stock) only append WishlistAlert rows. The
+    `send_wishlist_notifications` worker claims due alerts in batches,
+    collapses repeats per product, finds every wishlister of the batch in
+    one query (WishlistItem's product index is the product -> users
+    index), skips users already told inside the dedup window or at their
+    daily cap, and queues WishlistNotification rows; `send` mails the
+    queue over one SMTP connection.
+    """
+
+    ALERT_BATCH_SIZE = 200
+    SEND_BATCH_SIZE = 100
+    KIND_ORDER = {'back_in_stock': 0, 'price_drop': 1, 'offer': 2}  # Which mail wins when the cap is near
+
+    @staticmethod
+    def record_price_change(variant):
+        """Queue a price-drop alert if `variant` (being saved) now sells for less"""
+        old = variant.previous_value('discount_price') or variant.previous_value('price')
+        new = variant.display_price
+        if old is not None and new is not None and new < old:
+            WishlistAlert.objects.create(
+                product_id=variant.product_id, variant=variant, kind='price_drop', old_price=old, new_price=new,
+            )
+
+    @staticmethod
+    def record_offer(offer, product_ids):
+        """Queue offer alerts for `product_ids`, due when the offer starts; nothing for disabled or ended offers"""
+        now = timezone.now()
+        product_ids = set(product_ids)
+        if not product_ids or not offer.is_active or offer.valid_to <= now:
+            return
+        due_at = max(offer.valid_from, now)
+        WishlistAlert.objects.bulk_create([
+            WishlistAlert(product_id=product_id, kind='offer', offer_name=offer.name[:200], due_at=due_at)
+            for product_id in product_ids
+        ])
+
+    @staticmethod
+    def _claim_alerts(limit, now):
+        alerts = list(
+            WishlistAlert.objects.select_for_update(skip_locked=True).filter(
+                processed_at__isnull=True, due_at__lte=now,
+            ).order_by('due_at')[:limit]
+        )
+        WishlistAlert.objects.filter(pk__in=[alert.pk for alert in alerts]).update(processed_at=now)
+        return alerts
+
+    @staticmethod
+    def _live_offer_products(product_ids, now):
+        live = Q(is_active=True, valid_from__lte=now, valid_to__gte=now)
+        products = set(
+            ProductOffer.objects.filter(live, products__in=product_ids).values_list('products', flat=True)
+        )
+        products |= set(
+            Product.objects.filter(
+                pk__in=product_ids, category__category_offers__in=CategoryOffer.objects.filter(live),
+            ).values_list('pk', flat=True)
+        )
+        return products
+
+    @staticmethod
+    def _changes(alerts, now):
+        """
+        {(product_id, kind): details} for the alerts that still hold: the
+        variant is still in stock, the price is still below the old one,
+        the offer is still running. Repeats for a product collapse into one.
+        """
+        variant_ids = {alert.variant_id for alert in alerts if alert.variant_id}
+        variants = {
+            variant.pk: variant
+            for variant in ProductVariant.objects.filter(pk__in=variant_ids, is_active=True).only(
+                'id', 'product_id', 'stock', 'price', 'discount_price', 'volume_ml',
+            )
+        }
+        products = dict(
+            Product.objects.filter(pk__in={alert.product_id for alert in alerts}, is_active=True)
+            .values_list('pk', 'name')
+        )
+        offer_products = WishlistNotificationService._live_offer_products(
+            {alert.product_id for alert in alerts if alert.kind == 'offer'}, now,
+        )
+
+        changes = {}
+        for alert in alerts:
+            if alert.product_id not in products:
+                continue
+            key = (alert.product_id, alert.kind)
+            if alert.kind == 'offer':
+                if alert.product_id in offer_products:
+                    changes[key] = {'offer_name': alert.offer_name}
+                continue
+
+            variant = variants.get(alert.variant_id)
+            if variant is None:
+                continue
+            if alert.kind == 'back_in_stock' and variant.stock > 0:
+                changes.setdefault(key, {'variant': variant})
+            elif alert.kind == 'price_drop' and variant.display_price < alert.old_price:
+                current = changes.get(key)
+                if current is None or alert.old_price - variant.display_price > current['old_price'] - current['new_price']:
+                    changes[key] = {'variant': variant, 'old_price': alert.old_price, 'new_price': variant.display_price}
+
+        for (product_id, kind), change in changes.items():
+            change['product_name'] = products[product_id]
+        return changes
+
+    @staticmethod
+    def _message(kind, change):
+        name = change['product_name']
+        if kind == 'back_in_stock':
+            subject = f"{name} is back in stock"
+            line = f"{name} ({change['variant'].volume_ml}ml) from your wishlist is back in stock."
+        elif kind == 'price_drop':
+            subject = f"Price drop on {name}"
+            line = (
+                f"{name} ({change['variant'].volume_ml}ml) from your wishlist is now "
+                f"₹{change['new_price']} (was ₹{change['old_price']})."
+            )
+        else:
+            subject = f"New offer on {name}"
+            line = f"{change['offer_name']} is now on for {name} from your wishlist."
+        return subject, line
+
+    @staticmethod
+    def fan_out(limit=None, now=None):
+        """
+        Turn up to `limit` due alerts into queued notifications. Returns
+        (alerts processed, notifications queued).
+        """
+        now = now or timezone.now()
+        dedup_window = timedelta(hours=settings.WISHLIST_NOTIFICATION_DEDUP_HOURS)
+        daily_cap = settings.WISHLIST_NOTIFICATION_DAILY_CAP
+
+        with transaction.atomic():
+            alerts = WishlistNotificationService._claim_alerts(
+                limit or WishlistNotificationService.ALERT_BATCH_SIZE, now,
+            )
+            if not alerts:
+                return 0, 0
+            changes = WishlistNotificationService._changes(alerts, now)
+            product_ids = {product_id for product_id, kind in changes}
+            if not product_ids:
+                return len(alerts), 0
+
+            wishlisters = (
+                WishlistItem.objects.filter(
+                    product_id__in=product_ids,
+                    wishlist__user__is_active=True,
+                    wishlist__user__status='active',
+                )
+                .exclude(wishlist__user__email='')
+                .values_list('product_id', 'wishlist__user_id', 'wishlist__user__email', 'wishlist__user__first_name')
+            )
+            recent = set(
+                WishlistNotification.objects.filter(product_id__in=product_ids, created_at__gte=now - dedup_window)
+                .values_list('user_id', 'product_id', 'kind')
+            )
+            # Counted through the wishlist join, so the users never travel as a parameter list
+            sent_today = Counter(dict(
+                CustomUser.objects.filter(
+                    wishlist__items__product_id__in=product_ids,
+                    wishlist_notifications__created_at__gte=now - timedelta(days=1),
+                ).annotate(
+                    count=Count('wishlist_notifications', distinct=True),
+                ).values_list('pk', 'count')
+            ))
+
+            by_product = {}
+            for product_id, user_id, email, first_name in wishlisters:
+                by_product.setdefault(product_id, []).append((user_id, email, first_name))
+
+            notifications = []
+            ordered = sorted(changes.items(), key=lambda item: WishlistNotificationService.KIND_ORDER[item[0][1]])
+            for (product_id, kind), change in ordered:
+                subject, line = WishlistNotificationService._message(kind, change)
+                url = settings.SITE_URL.rstrip('/') + reverse('product_detail', args=[product_id])
+                for user_id, email, first_name in by_product.get(product_id, []):
+                    if (user_id, product_id, kind) in recent or sent_today[user_id] >= daily_cap:
+                        continue
+                    notifications.append(WishlistNotification(
+                        user_id=user_id,
+                        product_id=product_id,
+                        kind=kind,
+                        email=email,
+                        subject=subject[:255],
+                        body=(
+                            f"Hi {first_name or 'there'},\n\n{line}\n\n"
+                            f"{url}\n\n"
+                            "You are receiving this because the product is in your Sanjeri wishlist."
+                        ),
+                    ))
+                    sent_today[user_id] += 1
+            WishlistNotification.objects.bulk_create(notifications, batch_size=1000)
+        return len(alerts), len(notifications)
+
+    @staticmethod
+    def claim(limit):
+        """Mark up to `limit` queued notifications sending and return them (safe with several workers)"""
+        with transaction.atomic():
+            notifications = list(
+                WishlistNotification.objects.select_for_update(skip_locked=True).filter(
+                    status='queued'
+                ).order_by('created_at')[:limit]
+            )
+            WishlistNotification.objects.filter(pk__in=[n.pk for n in notifications]).update(status='sending')
+        return notifications
+
+    @staticmethod
+    def send(notifications):
+        """Mail `notifications` over one SMTP connection; returns how many were sent"""
+        if not notifications:
+            return 0
+        sent_at = timezone.now()
+        connection = get_connection()
+        try:
+            connection.open()
+            for notification in notifications:
+                try:
+                    EmailMessage(
+                        notification.subject,
+                        notification.body,
+                        settings.DEFAULT_FROM_EMAIL,
+                        [notification.email],
+                        connection=connection,
+                    ).send()
+                    notification.status = 'sent'
+                    notification.sent_at = sent_at
+                except Exception as e:
+                    print(f"❌ Wishlist mail #{notification.pk} to {notification.email} failed: {e}")
+                    notification.status = 'failed'
+                    notification.error = traceback.format_exc()
+        except Exception:
+            error = traceback.format_exc()
+            print(f"❌ Could not open the mail connection:\n{error}")
+            for notification in notifications:
+                if notification.status == 'sending':
+                    notification.status = 'queued'  # Try again next round
+        finally:
+            connection.close()
+
+        WishlistNotification.objects.bulk_update(notifications, ['status', 'sent_at', 'error'])
+        return sum(1 for notification in notifications if notification.status == 'sent')
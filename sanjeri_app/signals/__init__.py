@@ -0,0 +1,11 @@
+from . import sales_signals
+from . import invoice_signals
+from . import inventory_signals
+from . import order_search_signals
+from . import customer_stats_signals
+from . import image_signals
+from . import media_signals
+from . import personalization_signals
+from . import account_summary_signals
+from . import wishlist_signals
+from . import ledger_signals
@@ -0,0 +1,43 @@
+# sanjeri_app/signals/account_summary_signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from ..models import CartItem, ProductVariant, Wallet, WalletTransaction, WishlistItem
+from ..models.tracking import watches
+from ..services.account_summary_service import AccountSummaryService
+
+
+@receiver(post_save, sender=CartItem)
+@receiver(post_delete, sender=CartItem)
+def bump_summary_for_cart(sender, instance, raw=False, **kwargs):
+    if not raw:
+        AccountSummaryService.bump(instance.cart.user_id)
+
+
+@receiver(post_save, sender=WishlistItem)
+@receiver(post_delete, sender=WishlistItem)
+def bump_summary_for_wishlist(sender, instance, raw=False, **kwargs):
+    if not raw:
+        AccountSummaryService.bump(instance.wishlist.user_id)
+
+
+@receiver(post_save, sender=Wallet)
+def bump_summary_for_wallet(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and watches(update_fields, 'balance'):
+        AccountSummaryService.bump(instance.user_id)
+
+
+@receiver(post_save, sender=WalletTransaction)
+@receiver(post_delete, sender=WalletTransaction)
+def bump_summary_for_wallet_transaction(sender, instance, raw=False, **kwargs):
+    # Pending withdrawals and refunds feed the available balance and the refund badge
+    if not raw:
+        AccountSummaryService.bump(instance.wallet.user_id)
+
+
+@receiver(post_save, sender=ProductVariant)
+def bump_summary_for_price(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """A new price changes the subtotal of every cart holding the variant"""
+    if raw or created or not watches(update_fields, 'price', 'discount_price'):
+        return
+    if instance.has_changed('price') or instance.has_changed('discount_price'):
+        AccountSummaryService.bump_catalog()
@@ -0,0 +1,48 @@
+# sanjeri_app/signals/customer_stats_signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from ..models import CustomUser, Order, Wallet
+from ..models.referral import ReferralCoupon
+from ..models.tracking import watches
+from ..services.customer_stats_service import CustomerStatsService
+
+# Order fields the stats depend on
+ORDER_STATS_FIELDS = ('status', 'payment_status', 'total_amount', 'user')
+
+
+@receiver(post_save, sender=CustomUser)
+def create_customer_stats(sender, instance, created, **kwargs):
+    if created:
+        CustomerStatsService.schedule_refresh(instance.pk)
+
+
+@receiver(post_save, sender=Order)
+def refresh_stats_for_order(sender, instance, created, update_fields=None, **kwargs):
+    if not created:
+        if not watches(update_fields, *ORDER_STATS_FIELDS):
+            return
+        if not any(instance.has_changed(name) for name in ORDER_STATS_FIELDS):
+            return
+    CustomerStatsService.schedule_refresh(instance.user_id, instance.previous_value('user'))
+
+
+@receiver(post_delete, sender=Order)
+def refresh_stats_for_deleted_order(sender, instance, **kwargs):
+    CustomerStatsService.schedule_refresh(instance.user_id)
+
+
+@receiver(post_save, sender=Wallet)
+def refresh_stats_for_wallet(sender, instance, created, update_fields=None, **kwargs):
+    if created or watches(update_fields, 'balance'):
+        CustomerStatsService.schedule_refresh(instance.user_id)
+
+
+@receiver(post_save, sender=ReferralCoupon)
+def refresh_stats_for_referral(sender, instance, created, **kwargs):
+    if created:
+        CustomerStatsService.schedule_refresh(instance.referrer_id)
+
+
+@receiver(post_delete, sender=ReferralCoupon)
+def refresh_stats_for_deleted_referral(sender, instance, **kwargs):
+    CustomerStatsService.schedule_refresh(instance.referrer_id)
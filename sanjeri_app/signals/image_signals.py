@@ -0,0 +1,27 @@
+# sanjeri_app/signals/image_signals.py
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from ..models import Product, ProductImage, ProductVariant
+from ..models.tracking import watches
+from ..services.image_rendition_service import ImageRenditionService
+
+
+@receiver(post_save, sender=Product)
+def queue_main_image_renditions(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not watches(update_fields, 'main_image') or not instance.has_changed('main_image'):
+        return
+    ImageRenditionService.enqueue(instance.main_image.name)
+
+
+@receiver(post_save, sender=ProductVariant)
+def queue_variant_image_renditions(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not watches(update_fields, 'variant_image') or not instance.has_changed('variant_image'):
+        return
+    ImageRenditionService.enqueue(instance.variant_image.name)
+
+
+@receiver(post_save, sender=ProductImage)
+def queue_gallery_image_renditions(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    ImageRenditionService.enqueue(instance.image.name)
@@ -0,0 +1,32 @@
+# sanjeri_app/signals/inventory_signals.py
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from ..models import ProductVariant, StockForecast, StockMovement
+from ..models.tracking import watches
+
+
+@receiver(post_save, sender=ProductVariant)
+def sync_stock_forecast(sender, instance, created, update_fields=None, **kwargs):
+    """Keep days of cover current between forecast runs as stock moves"""
+    if created or not watches(update_fields, 'stock') or not instance.has_changed('stock'):
+        return
+    StockForecast.sync_stock([instance.pk])
+
+
+@receiver(post_save, sender=ProductVariant)
+def record_stock_edit(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    """
+    Stock set through save() (product forms, Django admin) is written to the
+    ledger here; order and bulk paths record their own movements through
+    StockMovement.apply.
+    """
+    if raw or not watches(update_fields, 'stock'):
+        return
+    previous = 0 if created else instance.previous_value('stock')
+    if previous is None or instance.stock == previous:
+        return
+    StockMovement.objects.create(
+        variant=instance,
+        delta=instance.stock - previous,
+        reason='opening' if created else 'manual',
+    )
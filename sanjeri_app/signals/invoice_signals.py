@@ -0,0 +1,48 @@
+# sanjeri_app/signals/invoice_signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from ..models import Order, OrderItem, OrderInvoice
+from ..models.tracking import watches
+from ..services.invoice_service import InvoiceService, invoice_storage
+
+# Fields printed on the invoice. Confirmation and cancelled / returned
+# items render a new revision right away; other changes only mark the
+# stored invoice stale, and the next download renders it
+ORDER_INVOICE_FIELDS = (
+    'status', 'payment_status', 'payment_method',
+    'total_amount', 'discount_amount', 'tax_amount', 'shipping_charge',
+)
+ITEM_RENDER_FIELDS = ('is_cancelled', 'return_status')
+ITEM_INVOICE_FIELDS = ('quantity', 'total_price') + ITEM_RENDER_FIELDS
+
+
+@receiver(post_save, sender=Order)
+def render_invoice_for_order(sender, instance, created, update_fields=None, **kwargs):
+    """Render the invoice when the order is confirmed; later changes mark it stale"""
+    if not InvoiceService.is_invoiced(instance):
+        return
+    if created or instance.previous_value('status') in InvoiceService.UNINVOICED_STATUSES:
+        InvoiceService.schedule_generate(instance.pk)
+        return
+    if not watches(update_fields, *ORDER_INVOICE_FIELDS):
+        return
+    if any(instance.has_changed(name) for name in ORDER_INVOICE_FIELDS):
+        InvoiceService.mark_stale(instance.pk)
+
+
+@receiver(post_save, sender=OrderItem)
+def render_invoice_for_item(sender, instance, created, update_fields=None, **kwargs):
+    """Cancelled or returned items re-render the order's invoice"""
+    if created or not watches(update_fields, *ITEM_INVOICE_FIELDS):
+        return
+    if any(instance.has_changed(name) for name in ITEM_RENDER_FIELDS):
+        if InvoiceService.is_invoiced(instance.order):
+            InvoiceService.schedule_generate(instance.order_id)
+    elif any(instance.has_changed(name) for name in ITEM_INVOICE_FIELDS):
+        InvoiceService.mark_stale(instance.order_id)
+
+
+@receiver(post_delete, sender=OrderInvoice)
+def delete_invoice_file(sender, instance, **kwargs):
+    if instance.file:
+        invoice_storage.delete(instance.file)
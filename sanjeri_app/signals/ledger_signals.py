@@ -0,0 +1,59 @@
+# sanjeri_app/signals/ledger_signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from ..models import CustomUser, LedgerMonthlyClosing, Order, WalletTransaction
+from ..models.tracking import watches
+from ..services.ledger_service import LedgerService
+
+# Order fields shown on (or deciding) its ledger entry
+ORDER_LEDGER_FIELDS = ('payment_status', 'payment_method', 'total_amount', 'user')
+USER_LEDGER_FIELDS = ('email', 'first_name', 'last_name', 'username')
+
+
+def _paid(payment_status):
+    return payment_status in LedgerService.PAID_PAYMENT_STATUSES
+
+
+@receiver(post_save, sender=Order)
+def bump_ledger_for_order(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Orders enter the ledger once paid; unpaid orders changing are not ledger changes"""
+    if raw:
+        return
+    if created:
+        changed = _paid(instance.payment_status)
+    else:
+        changed = (
+            watches(update_fields, *ORDER_LEDGER_FIELDS)
+            and any(instance.has_changed(name) for name in ORDER_LEDGER_FIELDS)
+            and (_paid(instance.payment_status) or _paid(instance.previous_value('payment_status')))
+        )
+    if changed:
+        LedgerService.bump([timezone.localdate(instance.created_at)])
+
+
+@receiver(post_delete, sender=Order)
+def bump_ledger_for_deleted_order(sender, instance, **kwargs):
+    if _paid(instance.payment_status):
+        LedgerService.bump([timezone.localdate(instance.created_at)])
+
+
+@receiver(post_save, sender=WalletTransaction)
+@receiver(post_delete, sender=WalletTransaction)
+def bump_ledger_for_wallet_transaction(sender, instance, raw=False, **kwargs):
+    if not raw and instance.transaction_type in LedgerService.CREDIT_TYPES + LedgerService.DEBIT_TYPES:
+        LedgerService.bump([timezone.localdate(instance.created_at)])
+
+
+@receiver(post_save, sender=CustomUser)
+def bump_ledger_for_user(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if not raw and not created and watches(update_fields, *USER_LEDGER_FIELDS):
+        LedgerService.bump_for_user(instance.pk)
+
+
+@receiver(post_save, sender=LedgerMonthlyClosing)
+@receiver(post_delete, sender=LedgerMonthlyClosing)
+def bump_ledger_for_closing(sender, instance, raw=False, **kwargs):
+    # Opening balances from the next month on are carried from this closing
+    if not raw:
+        LedgerService.bump([LedgerService.next_month(instance.month)])
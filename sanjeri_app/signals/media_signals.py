@@ -0,0 +1,44 @@
+# sanjeri_app/signals/media_signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from ..models import MediaBlob, OrderItem, Product, ProductImage, ProductVariant
+from ..models.tracking import watches
+
+# Image fields whose files are shared and reference counted (see MediaBlob)
+IMAGE_FIELDS = {
+    Product: 'main_image',
+    ProductVariant: 'variant_image',
+    ProductImage: 'image',
+    OrderItem: 'product_image',
+}
+
+
+def _name(value):
+    return getattr(value, 'name', value) or ''
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_save, sender=OrderItem)
+def count_image_reference(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Move the file reference when an image is set, replaced or cleared"""
+    field = IMAGE_FIELDS[sender]
+    if raw or not watches(update_fields, field) or not instance.has_changed(field):
+        return
+    new = _name(getattr(instance, field))
+    old = '' if created else _name(instance.previous_value(field))
+    if new != old:
+        MediaBlob.adjust({new: 1, old: -1})
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=ProductVariant)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_delete, sender=OrderItem)
+def drop_image_reference(sender, instance, **kwargs):
+    """Deleted rows (including cascades) release their file; the file itself is removed by MediaBlobService.release"""
+    name = _name(getattr(instance, IMAGE_FIELDS[sender]))
+    if name:
+        MediaBlob.adjust({name: -1})
+
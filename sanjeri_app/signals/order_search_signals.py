@@ -0,0 +1,21 @@
+# sanjeri_app/signals/order_search_signals.py
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from ..models import Address, CustomUser, Order
+from ..models.tracking import watches
+from ..services.order_search_service import OrderSearchService
+
+
+@receiver(post_save, sender=CustomUser)
+def refresh_order_search_for_user(sender, instance, created, update_fields=None, **kwargs):
+    """Renamed customers or changed emails stay searchable on their orders"""
+    if created or not watches(update_fields, 'email', 'first_name', 'last_name'):
+        return
+    OrderSearchService.refresh(Order.objects.filter(user=instance))
+
+
+@receiver(post_save, sender=Address)
+def refresh_order_search_for_address(sender, instance, created, update_fields=None, **kwargs):
+    if created or not watches(update_fields, 'full_name', 'phone'):
+        return
+    OrderSearchService.refresh(Order.objects.filter(shipping_address=instance))
@@ -0,0 +1,23 @@
+# sanjeri_app/signals/personalization_signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from ..models import CartItem, WishlistItem
+from ..services.personalization_service import PersonalizationService
+
+
+@receiver(post_save, sender=WishlistItem)
+@receiver(post_delete, sender=WishlistItem)
+def refresh_wishlist_set(sender, instance, created=True, raw=False, **kwargs):
+    """An item added or removed changes the cached wishlist product ids"""
+    if raw or not created:
+        return
+    PersonalizationService.invalidate(instance.wishlist.user_id, 'wishlist')
+
+
+@receiver(post_save, sender=CartItem)
+@receiver(post_delete, sender=CartItem)
+def refresh_cart_set(sender, instance, created=True, raw=False, **kwargs):
+    """Same for cart variant ids; quantity changes don't affect membership"""
+    if raw or not created:
+        return
+    PersonalizationService.invalidate(instance.cart.user_id, 'cart')
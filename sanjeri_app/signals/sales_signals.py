@@ -0,0 +1,48 @@
+# sanjeri_app/signals/sales_signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from ..models import Order, OrderItem
+from ..models.tracking import watches
+from ..services.sales_rollup_service import SalesRollupService
+
+# Fields that feed SalesDailyRollup dimensions or measures
+ORDER_ROLLUP_FIELDS = (
+    'status', 'payment_status', 'payment_method', 'coupon',
+    'total_amount', 'discount_amount', 'coupon_discount', 'tax_amount', 'shipping_charge',
+)
+ITEM_ROLLUP_FIELDS = ('variant', 'quantity', 'total_price')
+
+
+@receiver(post_save, sender=Order)
+def update_sales_rollup_for_order(sender, instance, created, update_fields=None, **kwargs):
+    """Queue the order's rollup day when a rolled-up field changes"""
+    if not created:
+        if not watches(update_fields, *ORDER_ROLLUP_FIELDS):
+            return
+        if not any(instance.has_changed(name) for name in ORDER_ROLLUP_FIELDS):
+            return
+    SalesRollupService.schedule_rebuild(timezone.localdate(instance.created_at))
+
+
+@receiver(post_save, sender=OrderItem)
+def update_sales_rollup_for_item(sender, instance, created, update_fields=None, **kwargs):
+    if not created:
+        if not watches(update_fields, *ITEM_ROLLUP_FIELDS):
+            return
+        if not any(instance.has_changed(name) for name in ITEM_ROLLUP_FIELDS):
+            return
+    SalesRollupService.schedule_rebuild(timezone.localdate(instance.order.created_at))
+
+
+@receiver(post_delete, sender=Order)
+def remove_order_from_sales_rollup(sender, instance, **kwargs):
+    SalesRollupService.schedule_rebuild(timezone.localdate(instance.created_at))
+
+
+@receiver(post_delete, sender=OrderItem)
+def remove_item_from_sales_rollup(sender, instance, **kwargs):
+    # When the whole order is being deleted its own receiver covers the day
+    created_at = Order.objects.filter(pk=instance.order_id).values_list('created_at', flat=True).first()
+    if created_at is not None:
+        SalesRollupService.schedule_rebuild(timezone.localdate(created_at))
@@ -0,0 +1,57 @@
+# sanjeri_app/signals/wishlist_signals.py
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+from ..models import CategoryOffer, Product, ProductOffer, ProductVariant, WishlistAlert
+from ..models.tracking import watches
+from ..services.wishlist_notification_service import WishlistNotificationService
+
+OFFER_FIELDS = ('is_active', 'valid_from', 'valid_to', 'discount_percentage', 'discount_fixed')
+
+
+@receiver(post_save, sender=ProductVariant)
+def detect_variant_change(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """
+    Price drops, and stock coming back through save() (product forms, the
+    admin). Order and bulk stock changes are caught in StockMovement.apply.
+    """
+    if raw or created:
+        return
+    if watches(update_fields, 'price', 'discount_price') and (
+        instance.has_changed('price') or instance.has_changed('discount_price')
+    ):
+        WishlistNotificationService.record_price_change(instance)
+    if watches(update_fields, 'stock') and instance.previous_value('stock') == 0 and instance.stock > 0:
+        WishlistAlert.record_restocks([(instance.pk, instance.product_id)])
+
+
+def _offer_changed(offer, created, update_fields):
+    return created or (
+        watches(update_fields, *OFFER_FIELDS) and any(offer.has_changed(name) for name in OFFER_FIELDS)
+    )
+
+
+@receiver(post_save, sender=ProductOffer)
+def detect_product_offer(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # A new offer has no products yet; they arrive through m2m_changed below
+    if not raw and not created and _offer_changed(instance, created, update_fields):
+        WishlistNotificationService.record_offer(instance, instance.products.values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=ProductOffer.products.through)
+def detect_product_offer_products(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        # product.product_offers.add(offer, ...)
+        for offer in ProductOffer.objects.filter(pk__in=pk_set):
+            WishlistNotificationService.record_offer(offer, [instance.pk])
+    else:
+        WishlistNotificationService.record_offer(instance, pk_set)
+
+
+@receiver(post_save, sender=CategoryOffer)
+def detect_category_offer(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if not raw and _offer_changed(instance, created, update_fields):
+        WishlistNotificationService.record_offer(
+            instance, Product.objects.filter(category_id=instance.category_id).values_list('pk', flat=True),
+        )
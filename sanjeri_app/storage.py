@@ -0,0 +1,77 @@
+# sanjeri_app/storage.py
+import hashlib
+import os
+import tempfile
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Filesystem storage that names every file by the SHA-256 of its content:
+
+        blobs/ab/cd/abcd…ef.jpg
+
+    The digest is computed while the upload is streamed (chunk by chunk)
+    into a temporary file, which is then hard-linked into place. If a blob
+    with the same content already exists the link fails and the existing
+    name is returned, so identical uploads share one file. The upload_to
+    path is ignored apart from its extension.
+
+    Files are never overwritten or renamed; deleting one is only safe once
+    nothing references it (see MediaBlob / MediaBlobService).
+    """
+
+    ROOT = 'blobs'
+    TMP_DIR = 'blobs/tmp'
+
+    @classmethod
+    def blob_name(cls, digest, extension=''):
+        return f"{cls.ROOT}/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+    @classmethod
+    def is_blob(cls, name):
+        return bool(name) and name.startswith(cls.ROOT + '/') and not name.startswith(cls.TMP_DIR + '/')
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content in _save, and is never taken by anything else
+        return name
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        if extension == '.jpeg':
+            extension = '.jpg'
+
+        tmp_dir = self.path(self.TMP_DIR)
+        os.makedirs(tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False) as tmp:
+            for chunk in content.chunks():
+                digest.update(chunk)
+                tmp.write(chunk)
+
+        blob = self.blob_name(digest.hexdigest(), extension)
+        path = self.path(blob)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True, mode=self.directory_permissions_mode or 0o777)
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp.name, self.file_permissions_mode)
+            # link() refuses to replace an existing file, so racing uploads of the same
+            # content are both fine: one publishes the blob, the other reuses it
+            os.link(tmp.name, path)
+        except FileExistsError:
+            pass
+        except OSError:
+            # No hard links on this filesystem; identical content makes a replace harmless
+            os.replace(tmp.name, path)
+        finally:
+            if os.path.exists(tmp.name):
+                os.unlink(tmp.name)
+        return blob
+
+
+def product_media_storage():
+    """Storage for product and order item images (a callable so migrations don't depend on settings)"""
+    return _product_media_storage
+
+
+_product_media_storage = ContentAddressedStorage()
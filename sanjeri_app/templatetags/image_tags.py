@@ -0,0 +1,54 @@
+# sanjeri_app/templatetags/image_tags.py
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+from ..services.image_rendition_service import ImageRenditionService
+
+register = template.Library()
+
+# Default `sizes` attribute per rendition: how wide the image is laid out
+LAYOUT_SIZES = {
+    'thumb': '150px',
+    'card': '(max-width: 576px) 50vw, 400px',
+    'detail': '(max-width: 768px) 100vw, 800px',
+    'zoom': '100vw',
+}
+
+
+@register.simple_tag
+def srcset_img(image, size='card', sizes=None, **attrs):
+    """
+    Responsive <img> for an uploaded image: a <picture> offering the WebP and
+    JPEG renditions, or a plain <img> of the original until they are ready.
+
+        {% srcset_img product.main_image 'card' class="product-img" alt=product.name %}
+    """
+    if not image:
+        return ''
+
+    attrs.setdefault('loading', 'lazy')
+    srcsets = ImageRenditionService.srcsets(image.name)
+    if srcsets is None:
+        return format_html('<img src="{}"{}>', image.url, flatatt(attrs))
+
+    sizes = sizes or LAYOUT_SIZES.get(size, LAYOUT_SIZES['card'])
+    return format_html(
+        '<picture style="display: contents">'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}"{}>'
+        '</picture>',
+        srcsets['webp'],
+        sizes,
+        ImageRenditionService.url(image.name, size) or image.url,
+        srcsets['jpeg'],
+        sizes,
+        flatatt(attrs),
+    )
+
+
+@register.simple_tag
+def rendition_url(image, size='card'):
+    """URL of an uploaded image's `size` JPEG rendition, or of the original until it is ready"""
+    if not image:
+        return ''
+    return ImageRenditionService.url(image.name, size) or image.url
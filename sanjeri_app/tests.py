@@ -1,3 +1,705 @@
+from decimal import Decimal
+from io import BytesIO, StringIO
+from datetime import date, datetime, timedelta
+from django.utils import timezone
+from openpyxl import load_workbook
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from sanjeri_app.models import (
+    Address, CatalogImport, Category, CustomUser, ImageRendition, Order, OrderItem, Product, ProductVariant, ReportJob, SalesDailyRollup,
+    SalesRollupDay, SalesRollupPendingDay, StockMovement, Wallet, WalletTransaction, WishlistAlert,
+)
+from sanjeri_app.services.catalog_service import CatalogService, catalog_import_storage
+from sanjeri_app.services.image_rendition_service import ImageRenditionService
+from sanjeri_app.services.inventory_service import InventoryService
+from sanjeri_app.services.ledger_service import LedgerService
+from sanjeri_app.services.order_search_service import OrderSearchService
+from sanjeri_app.services.report_job_service import ReportJobService, artifact_storage
+from sanjeri_app.services.sales_rollup_service import SalesRollupService
+from sanjeri_app.services.wallet_service import WalletService
+from sanjeri_app.views.admin_views import generate_excel_ledger
 
-# Create your tests here.
+
+def make_user(username, balance=Decimal('0')):
+    user = CustomUser.objects.create_user(username=username, email=f'{username}@example.com', password='x')
+    wallet, _ = Wallet.objects.get_or_create(user=user)
+    Wallet.objects.filter(pk=wallet.pk).update(balance=balance)
+    CustomUser.objects.filter(pk=user.pk).update(wallet_balance=balance)
+    wallet.refresh_from_db()
+    return user, wallet
+
+
+def make_variants(*stocks):
+    category = Category.objects.create(name='Attar')
+    product = Product.objects.create(category=category, name='Oud', sku='OUD', description='Oud attar')
+    return [
+        ProductVariant.objects.create(
+            product=product, volume_ml=10 * (n + 1), gender='Unisex', sku=f'OUD-{n}', price=Decimal('500'), stock=stock,
+        )
+        for n, stock in enumerate(stocks)
+    ]
+
+
+def make_refund(wallet, amount, status='PENDING', order=None):
+    return WalletTransaction.objects.create(
+        wallet=wallet,
+        amount=Decimal(amount),
+        transaction_type='REFUND',
+        status=status,
+        order=order,
+    )
+
+
+class BulkApproveRefundsTests(TestCase):
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(username='admin', email='admin@example.com', password='x', is_staff=True)
+        self.user, self.wallet = make_user('alice', Decimal('100'))
+        self.other_user, self.other_wallet = make_user('bob')
+
+    def test_one_credit_per_wallet(self):
+        refunds = [
+            make_refund(self.wallet, '10'),
+            make_refund(self.wallet, '15.50'),
+            make_refund(self.other_wallet, '20'),
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            results = WalletService.bulk_approve_refunds([refund.pk for refund in refunds], self.admin)
+
+        self.assertTrue(all(result['success'] for result in results))
+        wallet_updates = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith(f'UPDATE "{Wallet._meta.db_table}"')
+        ]
+        self.assertEqual(len(wallet_updates), 1)
+
+        self.wallet.refresh_from_db()
+        self.other_wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('125.50'))
+        self.assertEqual(self.other_wallet.balance, Decimal('20'))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.wallet_balance, Decimal('125.50'))
+        self.assertEqual(
+            set(WalletTransaction.objects.filter(pk__in=[refund.pk for refund in refunds]).values_list('status', flat=True)),
+            {'COMPLETED'},
+        )
+
+    def test_non_pending_refund_is_rejected(self):
+        pending = make_refund(self.wallet, '10')
+        completed = make_refund(self.wallet, '40', status='COMPLETED')
+
+        results = {result['id']: result for result in WalletService.bulk_approve_refunds([pending.pk, completed.pk], self.admin)}
+
+        self.assertTrue(results[pending.pk]['success'])
+        self.assertFalse(results[completed.pk]['success'])
+        self.assertEqual(results[completed.pk]['message'], "Transaction is not in pending state")
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('110'))
+
+    def test_approve_returns_updates_orders(self):
+        order = Order.objects.create(
+            user=self.user,
+            total_amount=Decimal('250'),
+            subtotal=Decimal('250'),
+            status='return_requested',
+            return_status='requested',
+            payment_status='completed',
+        )
+        refund = make_refund(self.wallet, '250', order=order)
+
+        results = WalletService.bulk_approve_refunds([refund.pk], self.admin, approve_returns=True)
+
+        self.assertTrue(results[0]['success'])
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'refunded')
+        self.assertEqual(order.return_status, 'approved')
+        self.assertEqual(order.payment_status, 'refunded')
+        self.assertEqual(order.refund_amount, Decimal('250'))
+        self.assertTrue(order.refund_to_wallet)
+        self.assertEqual(order.return_approved_by, self.admin)
+
+
+class ReconcileWalletsTests(TestCase):
+
+    def setUp(self):
+        self.user, self.wallet = make_user('carol', Decimal('50'))
+        for amount, kind in (('100', 'DEPOSIT'), ('30', 'WITHDRAWAL'), ('5', 'REFUND')):
+            WalletTransaction.objects.create(wallet=self.wallet, amount=Decimal(amount), transaction_type=kind, status='COMPLETED')
+        make_refund(self.wallet, '999')  # Pending: not part of the balance
+        self.clean_user, self.clean_wallet = make_user('dave', Decimal('12'))
+        WalletTransaction.objects.create(wallet=self.clean_wallet, amount=Decimal('12'), transaction_type='DEPOSIT', status='COMPLETED')
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('reconcile_wallets', *args, stdout=out)
+        return out.getvalue()
+
+    def test_reports_drift_without_fixing(self):
+        output = self.run_command()
+
+        self.assertIn('1 wallet balances and 1 user balances drifted', output)
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('50'))
+
+    def test_fix_writes_expected_balance(self):
+        self.run_command('--fix')
+
+        self.wallet.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('75'))
+        self.assertEqual(self.user.wallet_balance, Decimal('75'))
+        self.clean_wallet.refresh_from_db()
+        self.assertEqual(self.clean_wallet.balance, Decimal('12'))
+        self.assertIn('All wallets reconciled', self.run_command())
+
+
+class InventoryServiceApplyTests(TestCase):
+
+    def setUp(self):
+        self.first, self.second = make_variants(5, 8)
+
+    def stock(self, variant):
+        variant.refresh_from_db()
+        return variant.stock
+
+    def test_set_and_adjust(self):
+        result = InventoryService.apply([
+            {'sku': 'OUD-0', 'quantity': '12'},
+            {'sku': 'OUD-1', 'quantity': '-3', 'mode': 'adjust'},
+        ])
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['applied'], 2)
+        self.assertEqual(self.stock(self.first), 12)
+        self.assertEqual(self.stock(self.second), 5)
+        self.assertEqual(
+            sorted(StockMovement.objects.filter(reason='bulk_upload').values_list('variant__sku', 'delta')),
+            [('OUD-0', 7), ('OUD-1', -3)],
+        )
+
+    def test_invalid_row_applies_nothing(self):
+        result = InventoryService.apply([
+            {'sku': 'OUD-0', 'quantity': '12'},
+            {'sku': 'OUD-1', 'quantity': '-9', 'mode': 'adjust'},
+            {'sku': 'NOPE', 'quantity': '1'},
+        ])
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['errors'], 2)
+        self.assertEqual([row['status'] for row in result['rows']], ['ok', 'error', 'error'])
+        self.assertEqual(self.stock(self.first), 5)
+        self.assertEqual(self.stock(self.second), 8)
+
+    def test_dry_run(self):
+        result = InventoryService.apply([{'sku': 'OUD-0', 'quantity': '1'}], dry_run=True)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['applied'], 0)
+        self.assertEqual(result['rows'][0]['new_stock'], 1)
+        self.assertEqual(self.stock(self.first), 5)
+
+
+class StockMovementApplyTests(TestCase):
+
+    def setUp(self):
+        self.first, self.second, self.empty = make_variants(5, 8, 0)
+
+    def test_nets_deltas_in_one_update(self):
+        movements = [
+            StockMovement(variant=self.first, delta=4, reason='manual'),
+            StockMovement(variant=self.first, delta=-1, reason='manual'),
+            StockMovement(variant=self.second, delta=-8, reason='sale'),
+            StockMovement(variant=self.second, delta=0, reason='manual'),
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            changed = StockMovement.apply(movements)
+
+        self.assertEqual(changed, 2)
+        variant_updates = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith(f'UPDATE "{ProductVariant._meta.db_table}"')
+        ]
+        self.assertEqual(len(variant_updates), 1)
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual(self.first.stock, 8)
+        self.assertEqual(self.second.stock, 0)
+        self.assertEqual(StockMovement.objects.exclude(reason='opening').count(), 3)  # The zero delta is dropped
+        self.assertFalse(WishlistAlert.objects.exists())
+
+    def test_restock_from_zero_queues_alert(self):
+        StockMovement.apply([
+            StockMovement(variant=self.empty, delta=3, reason='return'),
+            StockMovement(variant=self.first, delta=3, reason='return'),
+        ])
+
+        self.empty.refresh_from_db()
+        self.assertEqual(self.empty.stock, 3)
+        self.assertEqual(
+            list(WishlistAlert.objects.values_list('variant_id', 'product_id', 'kind')),
+            [(self.empty.pk, self.empty.product_id, 'back_in_stock')],
+        )
+
+
+class LedgerExcelTests(TestCase):
+
+    def test_wallet_sheet_lists_wallet_transactions_only(self):
+        user, wallet = make_user('erin')
+        order = Order.objects.create(
+            user=user,
+            total_amount=Decimal('300'),
+            subtotal=Decimal('300'),
+            status='delivered',
+            payment_method='wallet',
+            payment_status='completed',
+        )
+        refund = make_refund(wallet, '120', status='COMPLETED', order=order)
+        today = timezone.localdate()
+
+        response = generate_excel_ledger(LedgerService.entries(today, today), today, today)
+        workbook = load_workbook(BytesIO(b''.join(response.streaming_content)))
+
+        ledger_ids = [row[1] for row in workbook['Ledger Book'].iter_rows(min_row=4, values_only=True)]
+        wallet_ids = [row[1] for row in workbook['Wallet'].iter_rows(min_row=2, values_only=True)]
+        self.assertEqual(ledger_ids, [f'ORD-{order.order_number}', f'WLT-{refund.pk}'])
+        self.assertEqual(wallet_ids, [f'WLT-{refund.pk}'])
+
+
+class LedgerVersionTests(TestCase):
+
+    def setUp(self):
+        self.user, self.wallet = make_user('frank')
+
+    def version(self):
+        return LedgerService.data_version(timezone.localdate())
+
+    def test_wallet_transaction_bumps_version(self):
+        before = self.version()
+        with self.captureOnCommitCallbacks(execute=True):
+            WalletTransaction.objects.create(wallet=self.wallet, amount=Decimal('40'), transaction_type='DEPOSIT', status='COMPLETED')
+
+        self.assertGreater(self.version(), before)
+
+    def test_only_paid_orders_bump_version(self):
+        before = self.version()
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(user=self.user, total_amount=Decimal('90'), subtotal=Decimal('90'))
+            order.total_amount = Decimal('95')
+            order.save()
+        self.assertEqual(self.version(), before)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.payment_status = 'completed'
+            order.save()
+        self.assertGreater(self.version(), before)
+
+    def test_rename_bumps_days_with_entries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            WalletTransaction.objects.create(wallet=self.wallet, amount=Decimal('40'), transaction_type='DEPOSIT', status='COMPLETED')
+        before = self.version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Francis'
+            self.user.save()
+
+        self.assertGreater(self.version(), before)
+
+
+def legacy_ledger_entries(start_date, end_date, opening_balance=0):
+    """The Python ledger the SQL one replaced, kept to compare against"""
+    orders = Order.objects.filter(
+        created_at__date__gte=start_date,
+        created_at__date__lte=end_date,
+        payment_status__in=['completed', 'success'],
+    ).select_related('user').order_by('created_at')
+    transactions = WalletTransaction.objects.filter(
+        created_at__date__gte=start_date,
+        created_at__date__lte=end_date,
+        status='COMPLETED',
+    ).select_related('wallet__user', 'order').order_by('created_at')
+
+    entries = []
+    for order in orders:
+        entries.append({
+            'date': order.created_at,
+            'transaction_id': f"ORD-{order.order_number}",
+            'description': f"Order #{order.order_number} - {order.user.get_full_name() or order.user.username}",
+            'debit': float(order.total_amount),
+            'credit': 0,
+            'user': order.user.email,
+            'type': 'Sale',
+        })
+    for wallet_transaction in transactions:
+        if wallet_transaction.transaction_type in ['REFUND', 'WITHDRAWAL']:
+            description = f"Wallet {wallet_transaction.get_transaction_type_display()}"
+            if wallet_transaction.order:
+                description += f" - Order #{wallet_transaction.order.order_number}"
+            if wallet_transaction.reason:
+                description += f" ({wallet_transaction.reason})"
+            debit, credit = 0, float(wallet_transaction.amount)
+            entry_type = wallet_transaction.get_transaction_type_display()
+        elif wallet_transaction.transaction_type == 'DEPOSIT':
+            description = f"Wallet Deposit - {wallet_transaction.reason or 'Manual top-up'}"
+            debit, credit = float(wallet_transaction.amount), 0
+            entry_type = 'Deposit'
+        else:
+            continue
+        entries.append({
+            'date': wallet_transaction.created_at,
+            'transaction_id': f"WLT-{wallet_transaction.pk}",
+            'description': description,
+            'debit': debit,
+            'credit': credit,
+            'user': wallet_transaction.wallet.user.email,
+            'type': entry_type,
+        })
+
+    entries.sort(key=lambda entry: entry['date'])
+    balance = float(opening_balance)
+    for entry in entries:
+        balance += entry['debit'] - entry['credit']
+        entry['balance'] = balance
+    return entries
+
+
+class LedgerEntriesTests(TestCase):
+    """The SQL ledger against the Python one, across the January/February boundary"""
+
+    KEYS = ('date', 'transaction_id', 'description', 'debit', 'credit', 'user', 'type', 'balance')
+
+    def setUp(self):
+        self.user, self.wallet = make_user('hana')
+        self.user.first_name, self.user.last_name = 'Hana', 'Iyer'
+        self.user.save()
+        self.other_user, self.other_wallet = make_user('ivan')
+
+        first = self.order(self.user, '1200', 'completed', datetime(2025, 1, 30, 10, 0))
+        self.order(self.other_user, '450', 'success', datetime(2025, 1, 31, 23, 30))
+        self.order(self.user, '999', 'pending', datetime(2025, 1, 31, 12, 0))
+        self.order(self.other_user, '300', 'completed', datetime(2025, 2, 1, 0, 15))
+        self.order(self.user, '75.50', 'completed', datetime(2025, 2, 3, 9, 0))
+
+        self.transaction(self.wallet, 'REFUND', '200', datetime(2025, 1, 31, 8, 0), order=first, reason='Damaged bottle')
+        self.transaction(self.other_wallet, 'DEPOSIT', '500', datetime(2025, 1, 31, 23, 45))
+        self.transaction(self.other_wallet, 'WITHDRAWAL', '120', datetime(2025, 2, 1, 9, 0), reason='Bank transfer')
+        self.transaction(self.wallet, 'REFUND', '60', datetime(2025, 2, 2, 11, 0), status='PENDING')
+        self.transaction(self.wallet, 'CASHBACK', '25', datetime(2025, 2, 2, 12, 0))
+        self.transaction(self.wallet, 'DEPOSIT', '40', datetime(2025, 2, 3, 18, 0), reason='Gift')
+
+    def order(self, user, amount, payment_status, created_at):
+        order = Order.objects.create(
+            user=user, total_amount=Decimal(amount), subtotal=Decimal(amount),
+            payment_method='razorpay', payment_status=payment_status,
+        )
+        Order.objects.filter(pk=order.pk).update(created_at=timezone.make_aware(created_at))
+        return order
+
+    def transaction(self, wallet, transaction_type, amount, created_at, status='COMPLETED', order=None, reason=''):
+        wallet_transaction = WalletTransaction.objects.create(
+            wallet=wallet, amount=Decimal(amount), transaction_type=transaction_type,
+            status=status, order=order, reason=reason,
+        )
+        WalletTransaction.objects.filter(pk=wallet_transaction.pk).update(created_at=timezone.make_aware(created_at))
+
+    def sql_entries(self, start_date, end_date):
+        entries = LedgerService.entries(start_date, end_date, LedgerService.opening_balance(start_date))
+        return [{key: entry[key] for key in self.KEYS} for entry in entries]
+
+    def test_entries_match_python_ledger(self):
+        start, end = date(2025, 1, 1), date(2025, 2, 28)
+        expected = legacy_ledger_entries(start, end)
+
+        self.assertEqual(len(expected), 8)
+        self.assertEqual(self.sql_entries(start, end), expected)
+        self.assertEqual(expected[-1]['balance'], 1200 + 450 + 300 + 75.5 - 200 + 500 - 120 + 40)
+
+    def test_local_day_boundary(self):
+        # 23:30 local on 31 January is still January, whatever the UTC date
+        january = self.sql_entries(date(2025, 1, 31), date(2025, 1, 31))
+        self.assertEqual(
+            [entry['date'] for entry in january],
+            [entry['date'] for entry in legacy_ledger_entries(date(2025, 1, 31), date(2025, 1, 31))],
+        )
+        self.assertEqual(len(january), 3)
+
+    def test_opening_balance_carried_from_monthly_closing(self):
+        closing = LedgerService.close_month(date(2025, 1, 1))
+        january = legacy_ledger_entries(date(2025, 1, 1), date(2025, 1, 31))
+        self.assertEqual(float(closing.closing_balance), january[-1]['balance'])
+        self.assertEqual(closing.entry_count, len(january))
+
+        full = legacy_ledger_entries(date(2025, 1, 1), date(2025, 2, 28))
+        self.assertEqual(self.sql_entries(date(2025, 2, 1), date(2025, 2, 28)), full[len(january):])
+
+        # Mid-month start: the closing plus the days of February before it
+        february_tail = [entry for entry in full if timezone.localdate(entry['date']) >= date(2025, 2, 3)]
+        self.assertEqual(self.sql_entries(date(2025, 2, 3), date(2025, 2, 28)), february_tail)
+
+    def test_totals_match_entries(self):
+        start, end = date(2025, 1, 1), date(2025, 2, 28)
+        expected = legacy_ledger_entries(start, end)
+        totals = LedgerService.totals(start, end)
+
+        self.assertEqual(totals['orders_count'], 4)
+        self.assertEqual(totals['wallet_count'], 4)
+        self.assertEqual(float(totals['total_debit']), sum(entry['debit'] for entry in expected))
+        self.assertEqual(float(totals['total_credit']), sum(entry['credit'] for entry in expected))
+
+
+class ReportExportTests(TestCase):
+
+    def setUp(self):
+        today = timezone.localdate()
+        self.params = ReportJobService.ledger_book_params(today, today)
+        self.user, self.wallet = make_user('gina')
+        with self.captureOnCommitCallbacks(execute=True):
+            WalletTransaction.objects.create(wallet=self.wallet, amount=Decimal('40'), transaction_type='DEPOSIT', status='COMPLETED')
+
+    def export(self):
+        response, job = ReportJobService.export_response('ledger_book', self.params, 'csv')
+        if response is not None:
+            response.close()
+        return response, job
+
+    def generate(self):
+        return ReportJobService.run(ReportJobService.claim_next())
+
+    def test_miss_queues_instead_of_building(self):
+        response, job = self.export()
+        self.assertIsNone(response)
+        self.assertEqual(job.status, 'queued')
+        self.assertFalse(job.artifact)
+
+        self.generate()
+        response, job = self.export()
+        self.assertIsNone(job)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        # A new entry in the range means a new version: the stored file is not served
+        with self.captureOnCommitCallbacks(execute=True):
+            WalletTransaction.objects.create(wallet=self.wallet, amount=Decimal('5'), transaction_type='REFUND', status='COMPLETED')
+        response, job = self.export()
+        self.assertIsNone(response)
+        self.assertEqual(job.status, 'queued')
+
+    def test_expire_artifacts(self):
+        self.export()
+        job = self.generate()
+        self.assertTrue(artifact_storage.exists(job.artifact))
+        ReportJob.objects.filter(pk=job.pk).update(finished_at=timezone.now() - timedelta(days=30))
+
+        self.assertEqual(ReportJobService.expire_artifacts(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'expired')
+        self.assertFalse(artifact_storage.exists(job.artifact))
+        response, new_job = self.export()
+        self.assertIsNone(response)
+        self.assertNotEqual(new_job.pk, job.pk)
+
+
+class ImageRenditionClaimTests(TestCase):
+
+    def test_reclaims_rows_abandoned_while_running(self):
+        now = timezone.now()
+        queued = ImageRendition.objects.create(source='products/a.jpg')
+        abandoned = ImageRendition.objects.create(
+            source='products/b.jpg', status='running', started_at=now - ImageRenditionService.STALE_AFTER * 2,
+        )
+        ImageRendition.objects.create(source='products/c.jpg', status='running', started_at=now)
+        ImageRendition.objects.create(source='products/d.jpg', status='done')
+
+        claimed = ImageRenditionService.claim(10)
+
+        self.assertEqual({job.pk for job in claimed}, {queued.pk, abandoned.pk})
+        abandoned.refresh_from_db()
+        self.assertEqual(abandoned.status, 'running')
+        self.assertGreaterEqual(abandoned.started_at, now)
+        self.assertEqual(ImageRenditionService.claim(10), [])
+
+
+class SalesRollupTests(TestCase):
+
+    def setUp(self):
+        self.user, _ = make_user('hana')
+        self.variant, = make_variants(50)
+        self.today = timezone.localdate()
+
+    def order(self, status, total, quantity, payment_status='completed'):
+        order = Order.objects.create(
+            user=self.user,
+            total_amount=Decimal(total),
+            subtotal=Decimal(total),
+            status=status,
+            payment_status=payment_status,
+            payment_method='online',
+        )
+        OrderItem.objects.create(
+            order=order,
+            variant=self.variant,
+            product_name='Oud',
+            variant_details='10ml',
+            quantity=quantity,
+            unit_price=Decimal(total) / quantity,
+            total_price=Decimal(total),
+        )
+        return order
+
+    def groups(self, level='order'):
+        rows = SalesDailyRollup.objects.between(self.today, self.today).filter(level=level)
+        return {
+            row.status_group: (row.order_count, row.gross, row.units)
+            for row in rows
+        }
+
+    def test_rebuild_groups_orders_by_status(self):
+        self.order('confirmed', '100', 1)
+        self.order('shipped', '200', 2)
+        self.order('out_for_delivery', '50', 1)
+        self.order('cancelled', '300', 3)
+        self.order('refunded', '400', 4)
+
+        SalesRollupService.rebuild(self.today, self.today)
+
+        self.assertEqual(self.groups(), {
+            'confirmed': (1, Decimal('100'), 1),
+            'in_transit': (2, Decimal('250'), 3),
+            'cancelled': (1, Decimal('300'), 3),
+            'returned': (1, Decimal('400'), 4),
+        })
+        self.assertEqual(self.groups('item')['in_transit'], (2, Decimal('250'), 3))
+        self.assertEqual(SalesRollupDay.objects.get(day=self.today).version, 1)
+
+    def test_rebuild_moves_cancelled_and_returned_orders(self):
+        cancelled = self.order('confirmed', '100', 1)
+        returned = self.order('delivered', '200', 2)
+        SalesRollupService.rebuild(self.today, self.today)
+
+        Order.objects.filter(pk=cancelled.pk).update(status='cancelled')
+        Order.objects.filter(pk=returned.pk).update(status='return_requested')
+        SalesRollupService.rebuild(self.today, self.today)
+
+        self.assertEqual(self.groups(), {
+            'cancelled': (1, Decimal('100'), 1),
+            'returned': (1, Decimal('200'), 2),
+        })
+        self.assertEqual(SalesRollupService.data_version(self.today, self.today), 2)
+
+    def test_changes_queue_one_day_per_transaction(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = self.order('pending', '100', 1, payment_status='pending')
+            order.total_amount = Decimal('120')
+            order.save()
+            SalesRollupService.schedule_rebuild(self.today)
+
+        self.assertEqual(list(SalesRollupPendingDay.objects.values_list('day', flat=True)), [self.today])
+        self.assertFalse(SalesDailyRollup.objects.exists())  # Nothing rebuilt in the request
+
+        self.assertEqual(SalesRollupService.rebuild_pending(), 1)
+        self.assertFalse(SalesRollupPendingDay.objects.exists())
+        self.assertEqual(self.groups(), {'placed': (1, Decimal('120'), 1)})
+        self.assertEqual(SalesRollupService.rebuild_pending(), 0)
+
+
+class CatalogImportQueueTests(TestCase):
+
+    def setUp(self):
+        Category.objects.create(name='Attar')
+
+    def upload(self, *rows):
+        lines = ['product_sku,name,category,volume_ml,gender,price,sku,stock', *rows]
+        return SimpleUploadedFile('catalog.csv', '\n'.join(lines).encode(), content_type='text/csv')
+
+    def test_upload_is_validated_and_imported_by_the_worker(self):
+        report, catalog_import = CatalogService.queue_import(self.upload(
+            'OUD,Oud Royale,Attar,10,Unisex,900,OUD-10,4',
+            'OUD,Oud Royale,Attar,20,Unisex,1500,OUD-20,2',
+            'ROSE,Rose,Nowhere,10,Female,500,ROSE-10,1',
+        ), 'csv')
+
+        self.assertEqual((report['products'], report['variants'], len(report['errors'])), (1, 2, 1))
+        self.assertEqual(catalog_import.status, 'queued')
+        self.assertFalse(Product.objects.exists())  # Nothing created in the request
+
+        catalog_import = CatalogService.run_import(CatalogService.claim_import(), workers=1)
+
+        self.assertEqual(catalog_import.status, 'done')
+        self.assertEqual(catalog_import.report['products'], 1)
+        self.assertEqual(
+            sorted(ProductVariant.objects.values_list('sku', 'stock')), [('OUD-10', 4), ('OUD-20', 2)],
+        )
+        self.assertFalse(catalog_import_storage.exists(catalog_import.file))
+        self.assertIsNone(CatalogService.claim_import())
+
+    def test_nothing_valid_is_not_queued(self):
+        report, catalog_import = CatalogService.queue_import(self.upload('ROSE,Rose,Nowhere,10,Female,500,ROSE-10,1'), 'csv')
+
+        self.assertIsNone(catalog_import)
+        self.assertEqual(len(report['errors']), 1)
+        self.assertFalse(CatalogImport.objects.exists())
+
+
+class OrderSearchTests(TestCase):
+
+    def setUp(self):
+        self.user, _ = make_user('jaya')
+        self.user.first_name, self.user.last_name = 'Jaya', 'Menon'
+        self.user.save()
+        self.address = Address.objects.create(
+            user=self.user, full_name='Jaya Menon', phone='+91 98470 12345',
+            address_line1='12 MG Road', city='Kochi', state='Kerala', postal_code='682011',
+        )
+        self.order = Order.objects.create(
+            user=self.user, shipping_address=self.address,
+            total_amount=Decimal('800'), subtotal=Decimal('800'),
+        )
+        other_user, _ = make_user('karan')
+        self.other_order = Order.objects.create(user=other_user, total_amount=Decimal('50'), subtotal=Decimal('50'))
+
+    def search(self, query):
+        return list(OrderSearchService.search(Order.objects.all(), query))
+
+    def test_substring_matches_any_field(self):
+        for query in ('menon', 'JAYA@example', '  jaya   menon ', self.order.order_number[3:9]):
+            self.assertIn(self.order, self.search(query), query)
+        self.assertEqual(self.search('menon'), [self.order])
+        self.assertEqual(self.search('nobody'), [])
+
+    def test_full_order_number(self):
+        self.assertEqual(self.search(self.order.order_number.lower()), [self.order])
+
+    def test_ten_digit_phone(self):
+        for query in ('9847012345', '+91 98470-12345', '(98470) 12345'):
+            self.assertEqual(self.search(query), [self.order], query)
+        # Partial numbers fall back to a substring match
+        self.assertEqual(self.search('470123'), [self.order])
+
+    def test_user_rename_refreshes_search_text(self):
+        self.user.last_name = 'Pillai'
+        self.user.save()
+
+        self.assertEqual(self.search('pillai'), [self.order])
+        self.assertEqual(self.search('menon'), [self.order])  # still on the address
+        self.user.email = 'jaya.p@example.com'
+        self.user.save(update_fields=['email'])
+        self.assertEqual(self.search('jaya.p@'), [self.order])
+        self.assertEqual(self.search('jaya@example'), [])
+
+    def test_address_edit_refreshes_search_text(self):
+        self.address.full_name = 'Jaya Nair'
+        self.address.phone = '9000011111'
+        self.address.save()
+
+        self.assertEqual(self.search('nair'), [self.order])
+        self.assertEqual(self.search('9000011111'), [self.order])
+        self.assertEqual(self.search('9847012345'), [])
+
+    def test_unrelated_save_leaves_search_text(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.user.save(update_fields=['last_login'])
+        self.assertFalse(any('search_text' in query['sql'] for query in queries.captured_queries))
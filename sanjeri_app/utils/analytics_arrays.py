@@ -0,0 +1,195 @@
+# sanjeri_app/utils/analytics_arrays.py
+"""
+Columnar analytics snapshots: one .npy file per column, written through
+memory maps and read back with np.load(mmap_mode='r').
+
+Layout of a snapshot directory:
+
+    manifest.json            exported_at, and per table its row count and columns
+    <table>/<column>.npy     one array per column
+    <table>/strings.json     dictionary of each 'category' column (code -> value)
+
+Column kinds and their missing-value markers:
+
+    int       int64           -1
+    float     float64         NaN
+    bool      bool            False
+    datetime  datetime64[us]  NaT  (UTC)
+    category  int32 codes     -1   (index into the column's dictionary)
+
+This module depends only on NumPy, so snapshots can be analysed away from
+the Django project:
+
+    from sanjeri_app.utils.analytics_arrays import load_analytics
+
+    data = load_analytics('/data/analytics/2026-10-19')
+    items = data['order_items']
+    kept = ~items['is_cancelled']
+    revenue_by_product = np.bincount(items['product_id'][kept], weights=items['total_price'][kept])
+"""
+import json
+import os
+from datetime import timezone
+
+import numpy as np
+
+MANIFEST = 'manifest.json'
+STRINGS = 'strings.json'
+
+DTYPES = {
+    'int': np.dtype('<i8'),
+    'float': np.dtype('<f8'),
+    'bool': np.dtype('|b1'),
+    'datetime': np.dtype('<M8[us]'),
+    'category': np.dtype('<i4'),
+}
+
+
+class ColumnarWriter:
+    """
+    Writes one table of a snapshot. The row count must be known up front:
+    every column is preallocated as a memory-mapped .npy file and filled
+    chunk by chunk, so memory use is bounded by the chunk size.
+    """
+
+    def __init__(self, directory, rows, columns):
+        self.directory = directory
+        self.rows = rows
+        self.columns = columns  # [(name, kind), ...]
+        self.written = 0
+        self.dictionaries = {name: {} for name, kind in columns if kind == 'category'}
+
+        os.makedirs(directory, exist_ok=True)
+        self.arrays = {
+            name: np.lib.format.open_memmap(
+                os.path.join(directory, f'{name}.npy'),
+                mode='w+',
+                dtype=DTYPES[kind],
+                shape=(rows,)
+            )
+            for name, kind in columns
+        }
+
+    def write(self, chunk):
+        """Append a list of row tuples (values in `columns` order)"""
+        if not chunk:
+            return
+        end = self.written + len(chunk)
+        if end > self.rows:
+            raise ValueError(f'{self.directory}: more rows than the {self.rows} allocated')
+
+        for index, (name, kind) in enumerate(self.columns):
+            values = [row[index] for row in chunk]
+            self.arrays[name][self.written:end] = self._encode(name, kind, values)
+        self.written = end
+
+    def _encode(self, name, kind, values):
+        count = len(values)
+        if kind == 'int':
+            return np.fromiter((-1 if v is None else v for v in values), DTYPES[kind], count)
+        if kind == 'float':
+            return np.fromiter((np.nan if v is None else float(v) for v in values), DTYPES[kind], count)
+        if kind == 'bool':
+            return np.fromiter((bool(v) for v in values), DTYPES[kind], count)
+        if kind == 'datetime':
+            return np.array([
+                None if v is None else (v.astimezone(timezone.utc).replace(tzinfo=None) if v.tzinfo else v)
+                for v in values
+            ], dtype=DTYPES[kind])
+        # category: dictionary-encode
+        dictionary = self.dictionaries[name]
+        return np.fromiter(
+            (-1 if v is None else dictionary.setdefault(v, len(dictionary)) for v in values),
+            DTYPES[kind], count
+        )
+
+    def close(self):
+        """Flush the columns and write the string dictionaries; returns the table's manifest entry"""
+        if self.written != self.rows:
+            raise ValueError(f'{self.directory}: wrote {self.written} of {self.rows} rows')
+
+        for array in self.arrays.values():
+            array.flush()
+        self.arrays = {}
+
+        with open(os.path.join(self.directory, STRINGS), 'w') as f:
+            json.dump({name: list(dictionary) for name, dictionary in self.dictionaries.items()}, f)
+
+        return {
+            'rows': self.rows,
+            'columns': {name: kind for name, kind in self.columns},
+        }
+
+
+def write_manifest(directory, tables, exported_at):
+    with open(os.path.join(directory, MANIFEST), 'w') as f:
+        json.dump({'exported_at': exported_at, 'tables': tables}, f, indent=2)
+
+
+class AnalyticsTable:
+    """One table of a snapshot; columns are loaded as read-only memory maps on first use"""
+
+    def __init__(self, directory, name, rows, columns):
+        self.directory = directory
+        self.name = name
+        self.rows = rows
+        self.columns = columns  # {name: kind}
+        self._arrays = {}
+        self._strings = None
+
+    def __len__(self):
+        return self.rows
+
+    def __repr__(self):
+        return f'<AnalyticsTable {self.name}: {self.rows} rows, {len(self.columns)} columns>'
+
+    def __getitem__(self, column):
+        if column not in self.columns:
+            raise KeyError(f"{self.name} has no column '{column}'")
+        if column not in self._arrays:
+            self._arrays[column] = np.load(os.path.join(self.directory, f'{column}.npy'), mmap_mode='r')
+        return self._arrays[column]
+
+    def strings(self, column):
+        """Dictionary of a category column: the value of each code"""
+        if self._strings is None:
+            with open(os.path.join(self.directory, STRINGS)) as f:
+                self._strings = json.load(f)
+        return self._strings[column]
+
+    def code(self, column, value):
+        """Code of `value` in a category column (-1 if it never occurs), for vectorised filters"""
+        try:
+            return self.strings(column).index(value)
+        except ValueError:
+            return -1
+
+    def decode(self, column, rows=slice(None)):
+        """Category codes of `rows` turned back into values (None where missing)"""
+        table = np.array(self.strings(column) + [None], dtype=object)
+        # Missing values (-1) pick the trailing None
+        return table[self[column][rows]]
+
+
+class AnalyticsDataset:
+    """A snapshot written by the `export_analytics` command"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+        self.exported_at = manifest['exported_at']
+        self.tables = {
+            name: AnalyticsTable(os.path.join(directory, name), name, table['rows'], table['columns'])
+            for name, table in manifest['tables'].items()
+        }
+
+    def __getitem__(self, table):
+        return self.tables[table]
+
+    def __repr__(self):
+        return f'<AnalyticsDataset {self.directory} ({self.exported_at}): {", ".join(self.tables)}>'
+
+
+def load_analytics(directory):
+    return AnalyticsDataset(directory)
@@ -0,0 +1,174 @@
+# sanjeri_app/utils/export_utils.py
+import csv
+import tempfile
+import zipfile
+from copy import copy
+from django.http import StreamingHttpResponse, FileResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.utils import get_column_letter
+
+# Rows fetched per round trip when streaming exports from a server-side cursor
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() just hands the line back to csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def streaming_csv_response(filename, rows):
+    """
+    Stream `rows` (any iterable of lists) as a CSV download. Rows are encoded
+    as they are produced, so the download starts immediately and memory use
+    does not grow with the number of rows.
+    """
+    writer = csv.writer(Echo())
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in rows),
+        content_type='text/csv'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+class ZipStream:
+    """
+    Write-only file object for zipfile: keeps what the archive writes until
+    drain() hands it to the response. It has no tell()/seek(), so zipfile
+    writes entries with data descriptors and never goes back.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+
+def streaming_zip_response(filename, files):
+    """
+    Stream a ZIP of `files` (iterable of (archive name, path)) as a download.
+    Entries are stored uncompressed and sent as each one is added, so
+    memory use stays at one file whatever the size of the archive.
+    """
+    def archive_chunks():
+        stream = ZipStream()
+        with zipfile.ZipFile(stream, 'w', zipfile.ZIP_STORED) as archive:
+            for arcname, path in files:
+                archive.write(path, arcname)
+                yield from stream.drain()
+        yield from stream.drain()
+
+    response = StreamingHttpResponse(archive_chunks(), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+_thin = Side(style='thin')
+_border = Border(left=_thin, right=_thin, top=_thin, bottom=_thin)
+
+# Named cell styles shared by the exports. The style objects are created once
+# and reused for every cell, so openpyxl registers each only once per workbook
+XLSX_STYLES = {
+    'title': {'font': Font(size=16, bold=True)},
+    'header': {
+        'font': Font(bold=True, color="FFFFFF"),
+        'fill': PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+        'alignment': Alignment(horizontal='center'),
+        'border': _border,
+    },
+    'bold': {'font': Font(bold=True)},
+    'cell': {'border': _border},
+    'number': {'number_format': '#,##0.00'},
+    'money': {
+        'number_format': '#,##0.00',
+        'border': _border,
+    },
+    'debit': {
+        'font': Font(color="FF0000"),  # Red for debits
+        'number_format': '#,##0.00',
+        'border': _border,
+    },
+    'credit': {
+        'font': Font(color="008000"),  # Green for credits
+        'number_format': '#,##0.00',
+        'border': _border,
+    },
+}
+
+
+class XlsxExport:
+    """
+    Write-only XLSX workbook. Rows go straight to per-sheet temp files as
+    they are appended (openpyxl keeps only the shared-string table and the
+    style table in memory), so several sheets can be filled in one pass over
+    streaming querysets and the row count is not capped like .xls.
+
+    Write-only sheets cannot merge cells or measure columns afterwards, so
+    column widths are given up front.
+    """
+
+    def __init__(self):
+        self.workbook = Workbook(write_only=True)
+        self.sheets = {}
+        self._style_arrays = {}
+
+    def add_sheet(self, title, column_widths=()):
+        sheet = self.workbook.create_sheet(title)
+        for index, width in enumerate(column_widths, 1):
+            sheet.column_dimensions[get_column_letter(index)].width = width
+        self.sheets[title] = sheet
+        return sheet
+
+    def append(self, title, values, style=None):
+        """
+        Append a row to sheet `title`. `style` is a XLSX_STYLES name applied
+        to every cell, or a list with one name (or None) per cell.
+        """
+        sheet = self.sheets[title]
+        if style is None:
+            sheet.append(values)
+            return
+        styles = style if isinstance(style, (list, tuple)) else [style] * len(values)
+        sheet.append([self.cell(sheet, value, name) for value, name in zip(values, styles)])
+
+    def cell(self, sheet, value, style=None):
+        if style is None:
+            return value
+        cell = WriteOnlyCell(sheet, value=value)
+        style_array = self._style_arrays.get(style)
+        if style_array is None:
+            # Resolve the named style against the workbook once, then copy
+            # the resulting style ids onto every later cell
+            for attr, style_value in XLSX_STYLES[style].items():
+                setattr(cell, attr, style_value)
+            self._style_arrays[style] = copy(cell._style)
+        else:
+            cell._style = copy(style_array)
+        return cell
+
+    def response(self, filename):
+        """Save to a temporary file and stream it back as a download"""
+        spool = tempfile.TemporaryFile()
+        self.workbook.save(spool)
+        spool.seek(0)
+        return FileResponse(
+            spool,
+            as_attachment=True,
+            filename=filename,
+            content_type=XLSX_CONTENT_TYPE
+        )
@@ -0,0 +1,122 @@
+# sanjeri_app/utils/image_utils.py
+"""
+Product image fetching, resizing and renditions. Nothing here imports
+Django, so the functions can run in worker processes (ProcessPoolExecutor)
+whatever the start method, without setting up the project.
+"""
+import os
+import urllib.request
+from io import BytesIO
+from PIL import Image, ImageOps
+
+# Imported originals are capped at the largest rendition
+PRODUCT_IMAGE_SIZE = (1600, 1600)
+PRODUCT_IMAGE_QUALITY = 85
+FETCH_TIMEOUT = 20  # seconds
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+
+
+def load_image_bytes(source, base_dir=None):
+    """
+    Raw bytes of an image given as an http(s) URL or a path relative to
+    `base_dir`. Local paths must stay inside `base_dir`; without one only
+    URLs are accepted.
+    """
+    if source.startswith(('http://', 'https://')):
+        with urllib.request.urlopen(source, timeout=FETCH_TIMEOUT) as response:
+            data = response.read(MAX_SOURCE_BYTES + 1)
+    else:
+        if not base_dir:
+            raise ValueError("Only http(s) image URLs are accepted here")
+        root = os.path.realpath(base_dir)
+        path = os.path.realpath(os.path.join(root, source))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError("Image path is outside the images directory")
+        with open(path, 'rb') as f:
+            data = f.read(MAX_SOURCE_BYTES + 1)
+
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ValueError("Image is larger than 20 MB")
+    return data
+
+
+# Longest edge of each rendition
+RENDITION_SIZES = {
+    'thumb': 150,
+    'card': 400,
+    'detail': 800,
+    'zoom': 1600,
+}
+RENDITION_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def _flatten_to_rgb(image):
+    """RGB copy of `image`; transparency goes onto a white background"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        return background
+    return image.convert('RGB') if image.mode != 'RGB' else image
+
+
+def build_renditions(data, sizes=RENDITION_SIZES):
+    """
+    {name: {'width', 'height', 'webp': bytes, 'jpeg': bytes}} for each size
+    up to the first one that covers the whole image (never upscaled). JPEG
+    sources are decoded once at a reduced scale with draft(), and each size
+    is shrunk from the previous, larger one.
+    """
+    image = Image.open(BytesIO(data))
+    longest = max(image.size)
+    wanted = []
+    for name, edge in sorted(sizes.items(), key=lambda item: item[1]):
+        wanted.append((name, edge))
+        if edge >= longest:
+            break  # This one is already the full image; larger ones would repeat it
+
+    largest = wanted[-1][1]
+    image.draft('RGB', (largest, largest))
+    current = _flatten_to_rgb(ImageOps.exif_transpose(image))
+
+    renditions = {}
+    for name, edge in reversed(wanted):
+        current.thumbnail((edge, edge), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        rendition = {'width': current.width, 'height': current.height}
+        for fmt, (pil_format, options) in RENDITION_FORMATS.items():
+            buffer = BytesIO()
+            current.save(buffer, format=pil_format, **options)
+            rendition[fmt] = buffer.getvalue()
+        renditions[name] = rendition
+    return renditions
+
+
+def render_image(data):
+    """(renditions or None, error or None); never raises, for executor.map"""
+    try:
+        return build_renditions(data), None
+    except Exception as e:
+        return None, str(e)
+
+
+def resize_to_jpeg(data, size=PRODUCT_IMAGE_SIZE, quality=PRODUCT_IMAGE_QUALITY):
+    """Fit the image within `size` and re-encode it as an optimized JPEG"""
+    image = Image.open(BytesIO(data))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    image.thumbnail(size, Image.Resampling.LANCZOS)
+
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def fetch_product_image(source, base_dir=None):
+    """(source, jpeg bytes or None, error or None); never raises, for executor.map"""
+    try:
+        return source, resize_to_jpeg(load_image_bytes(source, base_dir)), None
+    except Exception as e:
+        return source, None, str(e)
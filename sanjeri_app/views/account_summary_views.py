@@ -0,0 +1,45 @@
+# sanjeri_app/views/account_summary_views.py
+from django.contrib.auth import SESSION_KEY
+from django.http import JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+
+from ..services.account_summary_service import AccountSummaryService
+
+EMPTY_SUMMARY = {
+    'cart_count': 0,
+    'cart_subtotal': 0,
+    'wishlist_count': 0,
+    'wallet_balance': 0,
+    'wallet_available_balance': 0,
+    'pending_refunds': 0,
+    'pending_refund_amount': 0,
+}
+
+
+def _summary_etag(request):
+    # The user id straight from the session: loading request.user would cost a query
+    user_id = request.session.get(SESSION_KEY)
+    if user_id is None:
+        return '"anonymous"'
+    return AccountSummaryService.etag(user_id)
+
+
+@require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_summary_etag)
+def me_summary(request):
+    """
+    Header counters in one call (GET /api/me/summary/). Send the ETag back
+    in If-None-Match: while nothing changed the answer is a 304 served
+    from the cache without touching the database.
+    """
+    if not request.user.is_authenticated:
+        response = JsonResponse({'success': True, 'authenticated': False, **EMPTY_SUMMARY})
+        response['ETag'] = '"anonymous"'  # The session may still name a user it no longer authenticates
+        return response
+    return JsonResponse({
+        'success': True,
+        'authenticated': True,
+        **AccountSummaryService.summary(request.user.pk),
+    })
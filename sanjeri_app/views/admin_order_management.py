@@ -2,12 +2,20 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.http import JsonResponse
-from django.db.models import Q, Count, Sum
+from django.http import JsonResponse, StreamingHttpResponse
+from django.db import transaction
+from django.db.models import F, Q, Count, Sum
 from django.core.paginator import Paginator
 from django.utils import timezone
 from decimal import Decimal
-from ..models import Order, OrderItem, ProductVariant, CustomUser
+from datetime import datetime
+import json
+from ..models import Order, OrderItem, ProductVariant, CustomUser, StockMovement, CatalogImport
+from ..services.invoice_service import InvoiceService
+from ..services.order_search_service import OrderSearchService, EstimatedCountPaginator
+from ..services.inventory_service import InventoryService
+from ..services.catalog_service import CatalogService
+from ..utils.export_utils import EXPORT_CHUNK_SIZE, streaming_zip_response
 
 def admin_required(view_func):
     """Decorator to ensure user is admin/staff"""
@@ -27,16 +35,10 @@ def admin_order_list(request):
         'user', 'shipping_address'
     ).prefetch_related('items').order_by('-created_at')
     
-    # Search functionality
+    # Search functionality (indexed search_text column, see OrderSearchService)
     search_query = request.GET.get('search', '')
     if search_query:
-        orders = orders.filter(
-            Q(order_number__icontains=search_query) |
-            Q(user__email__icontains=search_query) |
-            Q(user__first_name__icontains=search_query) |
-            Q(user__last_name__icontains=search_query) |
-            Q(shipping_address__phone__icontains=search_query)
-        )
+        orders = OrderSearchService.search(orders, search_query)
     
     # Status filter
     status_filter = request.GET.get('status', '')
@@ -56,15 +58,16 @@ def admin_order_list(request):
     if sort_by in ['created_at', '-created_at', 'total_amount', '-total_amount']:
         orders = orders.order_by(sort_by)
     
-    # Pagination
-    paginator = Paginator(orders, 20)  # 20 orders per page
+    # Pagination (large result sets are counted from the planner's estimate)
+    paginator = EstimatedCountPaginator(orders, 20)  # 20 orders per page
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     # Order statistics for dashboard
-    total_orders = orders.count()
-    pending_orders = orders.filter(status='pending').count()
-    delivered_orders = orders.filter(status='delivered').count()
+    total_orders = paginator.count
+    pending_orders, pending_estimated = OrderSearchService.count(orders.filter(status='pending'))
+    delivered_orders, delivered_estimated = OrderSearchService.count(orders.filter(status='delivered'))
+    counts_estimated = paginator.count_is_estimate or pending_estimated or delivered_estimated
     
     context = {
         'page_obj': page_obj,
@@ -77,10 +80,40 @@ def admin_order_list(request):
         'total_orders': total_orders,
         'pending_orders': pending_orders,
         'delivered_orders': delivered_orders,
+        'counts_estimated': counts_estimated,
         'title': 'Order Management - Admin'
     }
     return render(request, 'admin/orders/order_list.html', context)
 
+@login_required
+@admin_required
+def admin_download_invoices(request):
+    """Download the stored invoices of orders placed in a date range as one ZIP"""
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    try:
+        start_date = datetime.strptime(date_from, '%Y-%m-%d').date()
+        end_date = datetime.strptime(date_to, '%Y-%m-%d').date()
+    except ValueError:
+        messages.error(request, "Select a From and To date to download invoices.")
+        return redirect('admin_order_list')
+
+    if start_date > end_date:
+        messages.error(request, "From date must be before To date.")
+        return redirect('admin_order_list')
+
+    orders = Order.objects.filter(
+        created_at__date__gte=start_date,
+        created_at__date__lte=end_date
+    ).exclude(
+        status__in=InvoiceService.UNINVOICED_STATUSES
+    ).select_related('invoice').order_by('created_at')
+
+    return streaming_zip_response(
+        f"invoices_{start_date}_to_{end_date}.zip",
+        InvoiceService.iter_files(orders.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+    )
+
 @login_required
 @admin_required
 def admin_order_detail(request, order_id):
@@ -204,7 +237,7 @@ def update_order_status(request, order_id):
 def admin_inventory_management(request):
     """Inventory/Stock management view"""
     # Get all product variants with stock information
-    variants = ProductVariant.objects.select_related('product').order_by('product__name', 'volume_ml')
+    variants = ProductVariant.objects.select_related('product', 'forecast').order_by('product__name', 'volume_ml')
     
     # Search and filter
     search_query = request.GET.get('search', '')
@@ -225,6 +258,18 @@ def admin_inventory_management(request):
     if out_of_stock_filter:
         variants = variants.filter(stock=0)
     
+    # At or below the reorder point from the sales forecast (StockForecast)
+    reorder_filter = request.GET.get('reorder', '')
+    if reorder_filter:
+        variants = variants.filter(forecast__needs_reorder=True)
+    
+    # Sorting by the stored forecast columns
+    sort_by = request.GET.get('sort', '')
+    if sort_by == 'cover':
+        variants = variants.order_by(F('forecast__days_of_cover').asc(nulls_last=True), 'product__name')
+    elif sort_by == 'velocity':
+        variants = variants.order_by(F('forecast__daily_velocity').desc(nulls_last=True), 'product__name')
+    
     # Pagination
     paginator = Paginator(variants, 25)  # 25 items per page
     page_number = request.GET.get('page')
@@ -234,6 +279,7 @@ def admin_inventory_management(request):
     total_variants = variants.count()
     low_stock_count = variants.filter(stock__lte=10, stock__gt=0).count()
     out_of_stock_count = variants.filter(stock=0).count()
+    reorder_count = variants.filter(forecast__needs_reorder=True).count()
     
     context = {
         'page_obj': page_obj,
@@ -241,9 +287,12 @@ def admin_inventory_management(request):
         'search_query': search_query,
         'low_stock_filter': low_stock_filter,
         'out_of_stock_filter': out_of_stock_filter,
+        'reorder_filter': reorder_filter,
+        'sort_by': sort_by,
         'total_variants': total_variants,
         'low_stock_count': low_stock_count,
         'out_of_stock_count': out_of_stock_count,
+        'reorder_count': reorder_count,
         'title': 'Inventory Management - Admin'
     }
     return render(request, 'admin/inventory/inventory_management.html', context)
@@ -253,18 +302,22 @@ def admin_inventory_management(request):
 def update_stock(request, variant_id):
     """Update product variant stock (AJAX)"""
     if request.method == 'POST' and request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        variant = get_object_or_404(ProductVariant, id=variant_id)
-        
         try:
             new_stock = int(request.POST.get('stock', 0))
             if new_stock >= 0:
-                variant.stock = new_stock
-                variant.save()
+                with transaction.atomic():
+                    variant = get_object_or_404(ProductVariant.objects.select_for_update(), id=variant_id)
+                    StockMovement.apply([StockMovement(
+                        variant=variant,
+                        delta=new_stock - variant.stock,
+                        reason='manual',
+                        actor=request.user,
+                    )])
                 
                 return JsonResponse({
                     'success': True,
                     'message': f'Stock updated to {new_stock}',
-                    'new_stock': variant.stock,
+                    'new_stock': new_stock,
                     'variant_name': str(variant)
                 })
             else:
@@ -284,6 +337,146 @@ def update_stock(request, variant_id):
         'message': 'Invalid request'
     }, status=400)
 
+
+@login_required
+@admin_required
+def bulk_update_stock(request):
+    """
+    Bulk stock update keyed by SKU (JSON API).
+    Body: {"mode": "set"|"adjust", "dry_run": false, "items": [{"sku": ..., "quantity": ..., "mode": ...}]}
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request'}, status=400)
+
+    try:
+        data = json.loads(request.body)
+        if not isinstance(data, dict):
+            raise ValueError("Request body must be a JSON object")
+        items = data.get('items')
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ValueError("'items' must be a list of objects")
+        result = InventoryService.apply(
+            items,
+            actor=request.user,
+            default_mode=data.get('mode', 'set'),
+            dry_run=bool(data.get('dry_run')),
+            note=str(data.get('note', ''))[:255],
+        )
+    except ValueError as e:
+        # Includes json.JSONDecodeError
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+    if result['success']:
+        result['message'] = f"Updated stock of {result['applied']} variant(s)"
+    else:
+        result['message'] = f"{result['errors']} row(s) have errors; nothing was updated"
+    return JsonResponse(result, status=200 if result['success'] else 400)
+
+
+@login_required
+@admin_required
+def inventory_upload(request):
+    """Upload a CSV of sku,quantity[,mode] rows and show the per-row report"""
+    context = {
+        'title': 'Bulk Inventory Update - Admin',
+        'modes': InventoryService.MODES,
+        'mode': request.POST.get('mode', 'set'),
+    }
+
+    if request.method == 'POST':
+        uploaded = request.FILES.get('file')
+        if not uploaded:
+            messages.error(request, "Choose a CSV file to upload.")
+            return render(request, 'admin/inventory/inventory_upload.html', context)
+
+        try:
+            rows = InventoryService.parse_csv(uploaded)
+            result = InventoryService.apply(
+                rows,
+                actor=request.user,
+                default_mode=context['mode'],
+                dry_run=bool(request.POST.get('dry_run')),
+                note=f"CSV upload {uploaded.name}"[:255],
+            )
+        except ValueError as e:
+            messages.error(request, str(e))
+            return render(request, 'admin/inventory/inventory_upload.html', context)
+
+        if not result['success']:
+            messages.error(request, f"{result['errors']} row(s) have errors; nothing was updated.")
+        elif request.POST.get('dry_run'):
+            messages.info(request, "Dry run: file is valid, nothing was updated.")
+        else:
+            messages.success(request, f"Updated stock of {result['applied']} variant(s).")
+        context['result'] = result
+
+    return render(request, 'admin/inventory/inventory_upload.html', context)
+
+
+@login_required
+@admin_required
+def catalog_import(request):
+    """
+    Upload a catalog CSV / JSON Lines file to create products in bulk. The
+    file is validated here; the import, which fetches every image, is
+    queued for the process_catalog_imports worker.
+    """
+    context = {
+        'title': 'Catalog Import - Admin',
+        'columns': CatalogService.COLUMNS,
+        'imports': CatalogImport.objects.select_related('requested_by')[:10],
+    }
+
+    selected = request.GET.get('import')
+    if selected and selected.isdigit():
+        catalog_import = CatalogImport.objects.filter(pk=selected, status='done').first()
+        if catalog_import:
+            context['report'] = catalog_import.report
+
+    if request.method == 'POST':
+        uploaded = request.FILES.get('file')
+        if not uploaded:
+            messages.error(request, "Choose a catalog file to upload.")
+            return render(request, 'admin/inventory/catalog_import.html', context)
+
+        fmt = CatalogService.detect_format(uploaded.name)
+        try:
+            if request.POST.get('dry_run'):
+                report, catalog_import = CatalogService.import_catalog(uploaded, fmt, dry_run=True), None
+            else:
+                report, catalog_import = CatalogService.queue_import(uploaded, fmt, user=request.user)
+        except ValueError as e:
+            messages.error(request, str(e))
+            return render(request, 'admin/inventory/catalog_import.html', context)
+
+        summary = f"Validated {report['products']} product(s) with {report['variants']} variant(s)."
+        if catalog_import:
+            summary += f" Import #{catalog_import.id} is queued; images are fetched in the background."
+        elif not report['products']:
+            summary += " Nothing to import."
+        if report['errors']:
+            messages.warning(request, f"{summary} {len(report['errors'])} row(s) will be skipped.")
+        else:
+            messages.success(request, summary)
+        context['report'] = report
+
+    return render(request, 'admin/inventory/catalog_import.html', context)
+
+
+@login_required
+@admin_required
+def catalog_export(request):
+    """Download the catalog in the import format (?format=csv|jsonl)"""
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in CatalogService.FORMATS:
+        fmt = 'csv'
+
+    content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = StreamingHttpResponse(CatalogService.export_lines(fmt), content_type=content_type)
+    filename = f"catalog_{timezone.localtime().strftime('%Y%m%d_%H%M')}.{fmt}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
@@ -2,28 +2,25 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.http import JsonResponse
-import csv
-from django.http import HttpResponse
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
 from django.core.paginator import Paginator
-from django.db.models import Q, Sum, Count, Case, When, Value, Max
+from django.db.models import Q, F, Sum, Case, When, Value, Max
 from django.db.models.functions import Coalesce
 from django.contrib import messages
 from django.db import models
 from ..models import CustomUser  # Import your CustomUser model
 from ..forms import UserSearchForm, UserFilterForm
-from django.db.models import Count, Sum
-from ..models import Coupon, Order,Product,ProductVariant
-from decimal import Decimal
+from ..models import Order
 from django.utils import timezone
+from django.urls import reverse
 from django.contrib.admin.views.decorators import staff_member_required
-from ..models import WalletTransaction, OrderItem
+from ..models import WalletTransaction, SalesDailyRollup, CustomerSegment, CustomerStats
 from ..services.wallet_service import WalletService
-from django.db.models.functions import TruncMonth, TruncYear, TruncDay
+from ..services.ledger_service import LedgerService
+from ..services.report_job_service import ReportJobService
+from ..services.dashboard_service import DashboardService
 from datetime import datetime, timedelta
 import json
+from ..utils.export_utils import streaming_csv_response, XlsxExport
 
 def admin_required(function):
     """
@@ -119,8 +116,8 @@ def user_list(request):
     #     total_amount_spent=Value(0, output_field=DecimalField()),  # Specify output_field
     #     last_order_date=Value(None, output_field=DateTimeField())  # Specify output_field
     # ).order_by('-date_joined')
-      # Get all non-staff users without annotations
-    users = CustomUser.objects.filter(is_staff=False).order_by('-date_joined')
+      # Get all non-staff users with their live totals (CustomerStats) and RFM segment
+    users = CustomUser.objects.filter(is_staff=False).select_related('stats', 'segment').order_by('-date_joined')
 
    # Initialize forms
     search_form = UserSearchForm(request.GET or None)
@@ -148,6 +145,8 @@ def user_list(request):
         registration_date_to = filter_form.cleaned_data.get('registration_date_to')
         total_orders = filter_form.cleaned_data.get('total_orders')
         total_spent = filter_form.cleaned_data.get('total_spent')
+        segment = filter_form.cleaned_data.get('segment')
+        sort = filter_form.cleaned_data.get('sort')
         
     # Apply filters
         if status:
@@ -158,24 +157,36 @@ def user_list(request):
         
         if registration_date_to:
             users = users.filter(date_joined__lte=registration_date_to)
-    
-    # if total_orders:
-    #     if total_orders == '10+':
-    #         users = users.filter(total_orders__gte=10)
-    #     elif total_orders == '5-10':
-    #         users = users.filter(total_orders__range=(5, 10))
-    #     elif total_orders == '1-5':
-    #         users = users.filter(total_orders__range=(1, 5))
-    #     elif total_orders == '0':
-    #         users = users.filter(total_orders=0)
-    
-    # if total_spent:
-    #     if total_spent == '5000+':
-    #         users = users.filter(total_amount_spent__gte=5000)
-    #     elif total_spent == '1000-5000':
-    #         users = users.filter(total_amount_spent__range=(1000, 5000))
-    #     elif total_spent == '0-1000':
-    #         users = users.filter(total_amount_spent__range=(0, 1000))
+
+        if segment == 'none':
+            users = users.filter(segment__isnull=True)
+        elif segment:
+            users = users.filter(segment__segment=segment)
+    
+        if total_orders == '10+':
+            users = users.filter(stats__order_count__gte=10)
+        elif total_orders == '5-10':
+            users = users.filter(stats__order_count__range=(5, 10))
+        elif total_orders == '1-5':
+            users = users.filter(stats__order_count__range=(1, 5))
+        elif total_orders == '0':
+            users = users.filter(Q(stats__isnull=True) | Q(stats__order_count=0))
+    
+        if total_spent == '5000+':
+            users = users.filter(stats__lifetime_spend__gte=5000)
+        elif total_spent == '1000-5000':
+            users = users.filter(stats__lifetime_spend__range=(1000, 5000))
+        elif total_spent == '0-1000':
+            users = users.filter(Q(stats__isnull=True) | Q(stats__lifetime_spend__lt=1000))
+
+        if sort == 'segment':
+            users = users.order_by(F('segment__segment').asc(nulls_last=True), F('segment__monetary').desc())
+        elif sort == '-spend':
+            users = users.order_by(F('stats__lifetime_spend').desc(nulls_last=True), '-date_joined')
+        elif sort == '-orders':
+            users = users.order_by(F('stats__order_count').desc(nulls_last=True), '-date_joined')
+        elif sort == '-last_order':
+            users = users.order_by(F('stats__last_order_at').desc(nulls_last=True), '-date_joined')
 
 # Get total count before pagination
     total_users_count = users.count()
@@ -190,6 +201,8 @@ def user_list(request):
         'users': page_obj,
         'search_query': search_query,
         'total_users': users.count(),
+        'segment_choices': UserFilterForm.SEGMENT_CHOICES,
+        'sort_choices': UserFilterForm.SORT_CHOICES,
     }
     
     return render(request, 'user_list.html', context)
@@ -214,19 +227,14 @@ def user_detail(request, user_id):
         wallet = None
         transactions = []
     
-    # Calculate user statistics
-    total_orders = 0
-    total_amount_spent = 0
-    last_order = None
-
-    # Get last order
-    # last_order = user_orders.first()
+    # Purchase statistics kept current by CustomerStatsService
+    stats = CustomerStats.objects.filter(user=user).first()
+    total_orders = stats.order_count if stats else 0
+    total_amount_spent = stats.lifetime_spend if stats else 0
+    avg_order_amount = stats.avg_order_value if stats else 0
     
-    # Calculate average order amount
-    if total_orders > 0:
-        avg_order_amount = total_amount_spent / total_orders
-    else:
-        avg_order_amount = 0
+    # RFM segment from the nightly compute_customer_segments run
+    segment = CustomerSegment.objects.filter(user=user).first()
         
     context = {
         'page_title': f'User Details - {user.get_full_name()}',
@@ -236,7 +244,9 @@ def user_detail(request, user_id):
         'total_orders': total_orders,
         'total_amount_spent': total_amount_spent,
         'avg_order_amount': avg_order_amount,
-        'last_order': None,
+        'last_order': stats.last_order_at if stats else None,
+        'referral_count': stats.referral_count if stats else 0,
+        'segment': segment,
     }
     
     return render(request, 'user_detail.html', context)
@@ -292,144 +302,41 @@ def delete_user(request, user_id):
 @login_required
 @admin_required
 def admin_dashboard(request):
-    # Your existing code
-    total_users = CustomUser.objects.count()
-    total_products = Product.objects.filter(is_deleted=False).count()
-    total_orders = Order.objects.count()
-    total_variants = ProductVariant.objects.filter(is_deleted=False).count()
-    total_coupons = Coupon.objects.filter(active=True).count()
-    
-    # Calculate total revenue from delivered/completed orders
-    total_revenue = Order.objects.filter(
-        status__in=['delivered', 'completed', 'confirmed']
-    ).aggregate(total=Sum('total_amount'))['total'] or 0
-    
-    # ===== FIXED: Chart data based on filter =====
     chart_period = request.GET.get('period', 'monthly')
-    
-    if chart_period == 'yearly':
-        orders_chart = Order.objects.filter(
-            status__in=['delivered', 'completed', 'confirmed']
-        ).annotate(
-            period=TruncYear('created_at')
-        ).values('period').annotate(
-            total=Sum('total_amount'),
-            count=Count('id')
-        ).order_by('period')
-    elif chart_period == 'daily':
-        # Last 30 days
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        orders_chart = Order.objects.filter(
-            status__in=['delivered', 'completed', 'confirmed'],
-            created_at__gte=thirty_days_ago
-        ).annotate(
-            period=TruncDay('created_at')
-        ).values('period').annotate(
-            total=Sum('total_amount'),
-            count=Count('id')
-        ).order_by('period')
-    else:  # monthly (default)
-        # Last 12 months
-        twelve_months_ago = timezone.now() - timedelta(days=365)
-        orders_chart = Order.objects.filter(
-            status__in=['delivered', 'completed', 'confirmed'],
-            created_at__gte=twelve_months_ago
-        ).annotate(
-            period=TruncMonth('created_at')
-        ).values('period').annotate(
-            total=Sum('total_amount'),
-            count=Count('id')
-        ).order_by('period')[:12]
-    
-    # Prepare chart data for JSON
-    chart_labels = []
-    chart_revenue = []
-    chart_orders = []
-    
-    for item in orders_chart:
-        if chart_period == 'yearly':
-            chart_labels.append(item['period'].strftime('%Y'))
-        elif chart_period == 'daily':
-            chart_labels.append(item['period'].strftime('%d %b'))
-        else:
-            chart_labels.append(item['period'].strftime('%b %Y'))
-        
-        chart_revenue.append(float(item['total']))
-        chart_orders.append(item['count'])
-    
-    # ===== FIXED: Best selling products (top 10) =====
-    # Using correct field names: unit_price instead of price_at_time
-    best_products = OrderItem.objects.filter(
-        order__status__in=['delivered', 'completed', 'confirmed']
-    ).values(
-        'variant__product__id', 
-        'variant__product__name',
-        'variant__product__slug'
-    ).annotate(
-        total_quantity=Sum('quantity'),
-        total_revenue=Sum('total_price')  # Using total_price instead of price_at_time
-    ).order_by('-total_quantity')[:10]
-    
-    # ===== FIXED: Best selling categories (top 10) =====
-    best_categories = OrderItem.objects.filter(
-        order__status__in=['delivered', 'completed', 'confirmed']
-    ).values(
-        'variant__product__category__id',
-        'variant__product__category__name'
-    ).annotate(
-        total_quantity=Sum('quantity'),
-        total_revenue=Sum('total_price')  # Using total_price
-    ).order_by('-total_quantity')[:10]
-    
-    # ===== FIXED: Best selling brands (top 10) =====
-    best_brands = OrderItem.objects.filter(
-        order__status__in=['delivered', 'completed', 'confirmed']
-    ).values(
-        'variant__product__brand'
-    ).annotate(
-        total_quantity=Sum('quantity'),
-        total_revenue=Sum('total_price')  # Using total_price
-    ).order_by('-total_quantity')[:10]
-    
-    # Recent orders for quick view
+    if chart_period not in DashboardService.CHART_PERIODS:
+        chart_period = 'monthly'
+
+    # Precomputed widgets (see DashboardService), read in one cache round trip
+    widgets = DashboardService.get_widgets(['totals', 'best_sellers', 'stock_alerts', f'chart_{chart_period}'])
+    totals = widgets['totals']['data']
+    best_sellers = widgets['best_sellers']['data']
+    stock_alerts = widgets['stock_alerts']['data']
+    chart = widgets[f'chart_{chart_period}']['data']
+    
+    # Recent orders for quick view (always live)
     recent_orders = Order.objects.select_related('user').order_by('-created_at')[:5]
     
-    # Low stock alerts (products with stock < 5)
-    low_stock_variants = ProductVariant.objects.filter(
-        stock__lt=5, 
-        stock__gt=0,
-        is_deleted=False
-    ).select_related('product')[:5]
-    
-    out_of_stock = ProductVariant.objects.filter(
-        stock=0,
-        is_deleted=False
-    ).select_related('product').count()
-    
     context = {
-        # Your existing context variables
-        'total_users': total_users,
-        'total_products': total_products,
-        'total_orders': total_orders,
-        'total_variants': total_variants,
-        'total_coupons': total_coupons,
-        'total_revenue': total_revenue,
+        **totals,
         
         # Chart data
-        'chart_labels': json.dumps(chart_labels),
-        'chart_revenue': json.dumps(chart_revenue),
-        'chart_orders': json.dumps(chart_orders),
+        'chart_labels': json.dumps(chart['chart_labels']),
+        'chart_revenue': json.dumps(chart['chart_revenue']),
+        'chart_orders': json.dumps(chart['chart_orders']),
         'chart_period': chart_period,
         
-        # Best selling data - using corrected field names
-        'best_products': best_products,
-        'best_categories': best_categories,
-        'best_brands': best_brands,
+        # Best selling data
+        **best_sellers,
         
         # Additional data
         'recent_orders': recent_orders,
-        'low_stock_variants': low_stock_variants,
-        'out_of_stock_count': out_of_stock,
+        **stock_alerts,
+
+        # When each widget was computed, for the "updated" labels
+        'totals_computed_at': widgets['totals']['computed_at'],
+        'best_sellers_computed_at': widgets['best_sellers']['computed_at'],
+        'stock_alerts_computed_at': widgets['stock_alerts']['computed_at'],
+        'chart_computed_at': widgets[f'chart_{chart_period}']['computed_at'],
         
         # Date ranges
         'today': timezone.now(),
@@ -440,64 +347,41 @@ def admin_dashboard(request):
     return render(request, 'admin_dashboard.html', context)
 
 
+@login_required
+@admin_required
+def refresh_dashboard_widget(request, widget):
+    """Recompute one dashboard widget now ("refresh" button on its card)"""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request method'}, status=405)
+
+    try:
+        payload = DashboardService.refresh(widget)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=404)
+
+    return JsonResponse({
+        'success': True,
+        'message': 'Widget refreshed',
+        'computed_at': payload['computed_at'].isoformat(),
+    })
+
+
 # Add this AJAX endpoint for dynamic chart updates
 @login_required
 @admin_required
 def dashboard_chart_data(request):
     """AJAX endpoint to get chart data based on period"""
     period = request.GET.get('period', 'monthly')
+    if period not in DashboardService.CHART_PERIODS:
+        period = 'monthly'
     
-    if period == 'yearly':
-        orders_chart = Order.objects.filter(
-            status__in=['delivered', 'completed']
-        ).annotate(
-            period=TruncYear('created_at')
-        ).values('period').annotate(
-            total=Sum('total_amount'),
-            count=Count('id')
-        ).order_by('period')
-    elif period == 'daily':
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        orders_chart = Order.objects.filter(
-            status__in=['delivered', 'completed'],
-            created_at__gte=thirty_days_ago
-        ).annotate(
-            period=TruncDay('created_at')
-        ).values('period').annotate(
-            total=Sum('total_amount'),
-            count=Count('id')
-        ).order_by('period')
-    else:
-        twelve_months_ago = timezone.now() - timedelta(days=365)
-        orders_chart = Order.objects.filter(
-            status__in=['delivered', 'completed'],
-            created_at__gte=twelve_months_ago
-        ).annotate(
-            period=TruncMonth('created_at')
-        ).values('period').annotate(
-            total=Sum('total_amount'),
-            count=Count('id')
-        ).order_by('period')[:12]
-    
-    chart_labels = []
-    chart_revenue = []
-    chart_orders = []
-    
-    for item in orders_chart:
-        if period == 'yearly':
-            chart_labels.append(item['period'].strftime('%Y'))
-        elif period == 'daily':
-            chart_labels.append(item['period'].strftime('%d %b'))
-        else:
-            chart_labels.append(item['period'].strftime('%b %Y'))
-        
-        chart_revenue.append(float(item['total']))
-        chart_orders.append(item['count'])
+    widget = DashboardService.get_widgets([f'chart_{period}'])[f'chart_{period}']
     
     return JsonResponse({
-        'labels': chart_labels,
-        'revenue': chart_revenue,
-        'orders': chart_orders
+        'labels': widget['data']['chart_labels'],
+        'revenue': widget['data']['chart_revenue'],
+        'orders': widget['data']['chart_orders'],
+        'computed_at': widget['computed_at'].isoformat(),
     })
 
 @login_required
@@ -510,10 +394,9 @@ def ledger_book_view(request):
     thirty_days_ago = today - timedelta(days=30)
     
     # Get summary stats for the default period
-    orders_count = Order.objects.filter(
-        created_at__date__gte=thirty_days_ago,
-        created_at__date__lte=today
-    ).count()
+    orders_count = SalesDailyRollup.objects.orders().between(
+        thirty_days_ago, today
+    ).aggregate(total=Sum('order_count'))['total'] or 0
     
     wallet_count = WalletTransaction.objects.filter(
         created_at__date__gte=thirty_days_ago,
@@ -528,7 +411,9 @@ def ledger_book_view(request):
         'total_transactions': total_transactions,
         'orders_count': orders_count,
         'wallet_count': wallet_count,
-        'title': 'Ledger Book - Financial Report'
+        'title': 'Ledger Book - Financial Report',
+        # Download queued by generate_ledger_book, followed until it downloads
+        'report_job': ReportJobService.status_by_id(request.GET.get('job')),
     }
     return render(request, 'admin/ledger_book.html', context)
 
@@ -537,7 +422,8 @@ def ledger_book_view(request):
 @admin_required
 def generate_ledger_book(request):
     """
-    Generate ledger book (financial transactions log) as Excel/CSV
+    Download the ledger book (financial transactions log) as Excel/CSV.
+    The file itself is built by the run_report_jobs worker.
     """
     # Get date range from request (default to last 30 days)
     end_date = request.GET.get('end_date', timezone.now().date())
@@ -554,106 +440,33 @@ def generate_ledger_book(request):
         start_date = (timezone.now() - timedelta(days=30)).date()
         end_date = timezone.now().date()
     
-    # Get all financial transactions (orders and wallet transactions)
-    orders = Order.objects.filter(
-        created_at__date__gte=start_date,
-        created_at__date__lte=end_date,
-        payment_status__in=['completed', 'success']  # Only paid orders
-    ).select_related('user').order_by('created_at')
-    
-    wallet_transactions = WalletTransaction.objects.filter(
-        created_at__date__gte=start_date,
-        created_at__date__lte=end_date,
-        status='COMPLETED'  # Only completed transactions
-    ).select_related('wallet__user', 'order').order_by('created_at')
-    
-    # Prepare ledger entries
-    ledger_entries = []
-    
-    # Add order transactions (as DEBIT - money out from customer)
-    for order in orders:
-        ledger_entries.append({
-            'date': order.created_at,
-            'transaction_id': f"ORD-{order.order_number}",
-            'description': f"Order #{order.order_number} - {order.user.get_full_name() or order.user.username}",
-            'debit': float(order.total_amount),  # Money coming in (debit for company)
-            'credit': 0,
-            'balance': 0,
-            'user': order.user.email,
-            'type': 'Sale',
-            'payment_method': order.payment_method,
-            'order_id': order.id
-        })
-    
-    # Add wallet transactions
-    for wt in wallet_transactions:
-        if wt.transaction_type in ['REFUND', 'WITHDRAWAL']:
-            # Refunds and withdrawals are CREDITS (money going out)
-            description = f"Wallet {wt.get_transaction_type_display()}"
-            if wt.order:
-                description += f" - Order #{wt.order.order_number}"
-            if wt.reason:
-                description += f" ({wt.reason})"
-            
-            ledger_entries.append({
-                'date': wt.created_at,
-                'transaction_id': f"WLT-{wt.id}",
-                'description': description,
-                'debit': 0,
-                'credit': float(wt.amount),  # Money going out
-                'balance': 0,
-                'user': wt.wallet.user.email,
-                'type': wt.get_transaction_type_display(),
-                'payment_method': 'wallet',
-                'order_id': wt.order.id if wt.order else None
-            })
-        elif wt.transaction_type == 'DEPOSIT':
-            # Deposits are DEBITS (money coming in)
-            ledger_entries.append({
-                'date': wt.created_at,
-                'transaction_id': f"WLT-{wt.id}",
-                'description': f"Wallet Deposit - {wt.reason or 'Manual top-up'}",
-                'debit': float(wt.amount),  # Money coming in
-                'credit': 0,
-                'balance': 0,
-                'user': wt.wallet.user.email,
-                'type': 'Deposit',
-                'payment_method': 'wallet',
-                'order_id': None
-            })
-    
-    # Sort by date
-    ledger_entries.sort(key=lambda x: x['date'])
-    
-    # Calculate running balance
-    running_balance = 0
-    for entry in ledger_entries:
-        running_balance += entry['debit'] - entry['credit']
-        entry['balance'] = running_balance
+    if format_type not in ['csv', 'excel']:
+        format_type = 'excel'
     
-    # Generate file based on format
-    if format_type == 'csv':
-        return generate_csv_ledger(ledger_entries, start_date, end_date)
-    else:
-        return generate_excel_ledger(ledger_entries, start_date, end_date)
+    # Serve the stored file when this exact ledger was already generated;
+    # otherwise queue it and go back to the ledger page, which downloads it when ready
+    params = ReportJobService.ledger_book_params(start_date, end_date)
+    response, job = ReportJobService.export_response('ledger_book', params, format_type, user=request.user)
+    if response is not None:
+        return response
+    return redirect(f"{reverse('ledger_book')}?job={job.id}")
 
 
-def generate_csv_ledger(ledger_entries, start_date, end_date):
-    """Generate CSV format ledger"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="ledger_book_{start_date}_to_{end_date}.csv"'
-    
-    writer = csv.writer(response)
-    
-    # Write header
-    writer.writerow(['LEDGER BOOK - {} to {}'.format(start_date, end_date)])
-    writer.writerow([])
-    writer.writerow(['Date', 'Transaction ID', 'Description', 'User', 'Type', 
-                     'Payment Method', 'Debit (₹)', 'Credit (₹)', 'Balance (₹)'])
-    
-    # Write data
+def ledger_csv_rows(ledger_entries, start_date, end_date, opening_balance=0):
+    """CSV rows for the ledger; the summary is totalled while the entries stream"""
+    yield ['LEDGER BOOK - {} to {}'.format(start_date, end_date)]
+    yield []
+    yield ['Date', 'Transaction ID', 'Description', 'User', 'Type', 
+           'Payment Method', 'Debit (₹)', 'Credit (₹)', 'Balance (₹)']
+    
+    total_debit = 0
+    total_credit = 0
+    final_balance = float(opening_balance)
     for entry in ledger_entries:
-        writer.writerow([
+        total_debit += entry['debit']
+        total_credit += entry['credit']
+        final_balance = entry['balance']
+        yield [
             entry['date'].strftime('%Y-%m-%d %H:%M'),
             entry['transaction_id'],
             entry['description'],
@@ -663,151 +476,103 @@ def generate_csv_ledger(ledger_entries, start_date, end_date):
             f"{entry['debit']:.2f}",
             f"{entry['credit']:.2f}",
             f"{entry['balance']:.2f}"
-        ])
-    
-    # Write summary
-    writer.writerow([])
-    writer.writerow(['SUMMARY'])
-    total_debit = sum(e['debit'] for e in ledger_entries)
-    total_credit = sum(e['credit'] for e in ledger_entries)
-    final_balance = ledger_entries[-1]['balance'] if ledger_entries else 0
-    
-    writer.writerow(['Total Debit:', f"₹{total_debit:.2f}"])
-    writer.writerow(['Total Credit:', f"₹{total_credit:.2f}"])
-    writer.writerow(['Net Flow:', f"₹{total_debit - total_credit:.2f}"])
-    writer.writerow(['Final Balance:', f"₹{final_balance:.2f}"])
-    
-    return response
+        ]
+    
+    # Summary
+    yield []
+    yield ['SUMMARY']
+    yield ['Opening Balance:', f"₹{opening_balance:.2f}"]
+    yield ['Total Debit:', f"₹{total_debit:.2f}"]
+    yield ['Total Credit:', f"₹{total_credit:.2f}"]
+    yield ['Net Flow:', f"₹{total_debit - total_credit:.2f}"]
+    yield ['Final Balance:', f"₹{final_balance:.2f}"]
 
 
-def generate_excel_ledger(ledger_entries, start_date, end_date):
-    """Generate Excel format ledger with formatting"""
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = f'attachment; filename="ledger_book_{start_date}_to_{end_date}.xlsx"'
-    
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Ledger Book"
-    
-    # Define styles
-    title_font = Font(size=16, bold=True)
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    debit_font = Font(color="FF0000")  # Red for debits
-    credit_font = Font(color="008000")  # Green for credits
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
+def generate_csv_ledger(ledger_entries, start_date, end_date, opening_balance=0):
+    """Generate CSV format ledger (streamed)"""
+    return streaming_csv_response(
+        f'ledger_book_{start_date}_to_{end_date}.csv',
+        ledger_csv_rows(ledger_entries, start_date, end_date, opening_balance)
     )
+
+
+def generate_excel_ledger(ledger_entries, start_date, end_date, opening_balance=0):
+    """
+    Generate Excel format ledger with formatting. Written in one pass over
+    the streamed entries into a write-only workbook: the Ledger sheet gets
+    every entry, the Wallet sheet the wallet ones, and the Summary sheet
+    (first tab) the totals once the stream ends.
+    """
+    workbook = XlsxExport()
+    workbook.add_sheet('Summary', column_widths=[20, 18])
+    workbook.add_sheet('Ledger Book', column_widths=[18, 22, 50, 32, 14, 16, 14, 14, 16])
+    workbook.add_sheet('Wallet', column_widths=[18, 22, 50, 32, 14, 14, 14])
     
-    # Title
-    ws.merge_cells('A1:I1')
-    title_cell = ws['A1']
-    title_cell.value = f"LEDGER BOOK - {start_date} to {end_date}"
-    title_cell.font = title_font
-    title_cell.alignment = Alignment(horizontal='center')
+    title = f"LEDGER BOOK - {start_date} to {end_date}"
     
     # Headers
-    headers = ['Date', 'Transaction ID', 'Description', 'User', 'Type', 
-               'Payment Method', 'Debit (₹)', 'Credit (₹)', 'Balance (₹)']
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=3, column=col)
-        cell.value = header
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = border
+    workbook.append('Ledger Book', [title], 'title')
+    workbook.append('Ledger Book', [])
+    workbook.append('Ledger Book', ['Date', 'Transaction ID', 'Description', 'User', 'Type', 
+                                    'Payment Method', 'Debit (₹)', 'Credit (₹)', 'Balance (₹)'], 'header')
+    workbook.append('Wallet', ['Date', 'Transaction ID', 'Description', 'User', 'Type',
+                               'Debit (₹)', 'Credit (₹)'], 'header')
     
     # Data
-    for row, entry in enumerate(ledger_entries, 4):
-        # Date
-        ws.cell(row=row, column=1, value=entry['date'].strftime('%Y-%m-%d %H:%M'))
-        
-        # Transaction ID
-        ws.cell(row=row, column=2, value=entry['transaction_id'])
-        
-        # Description
-        ws.cell(row=row, column=3, value=entry['description'])
-        
-        # User
-        ws.cell(row=row, column=4, value=entry['user'])
-        
-        # Type
-        ws.cell(row=row, column=5, value=entry['type'])
-        
-        # Payment Method
-        ws.cell(row=row, column=6, value=entry.get('payment_method', ''))
-        
-        # Debit
-        debit_cell = ws.cell(row=row, column=7, value=entry['debit'] if entry['debit'] > 0 else '')
-        if entry['debit'] > 0:
-            debit_cell.font = debit_font
-            debit_cell.number_format = '#,##0.00'
+    total_debit = 0
+    total_credit = 0
+    final_balance = float(opening_balance)
+    for entry in ledger_entries:
+        total_debit += entry['debit']
+        total_credit += entry['credit']
+        final_balance = entry['balance']
         
-        # Credit
-        credit_cell = ws.cell(row=row, column=8, value=entry['credit'] if entry['credit'] > 0 else '')
-        if entry['credit'] > 0:
-            credit_cell.font = credit_font
-            credit_cell.number_format = '#,##0.00'
+        date = entry['date'].strftime('%Y-%m-%d %H:%M')
+        debit = entry['debit'] if entry['debit'] > 0 else ''
+        credit = entry['credit'] if entry['credit'] > 0 else ''
         
-        # Balance
-        balance_cell = ws.cell(row=row, column=9, value=entry['balance'])
-        balance_cell.number_format = '#,##0.00'
-        if entry['balance'] < 0:
-            balance_cell.font = debit_font
+        workbook.append('Ledger Book', [
+            date,
+            entry['transaction_id'],
+            entry['description'],
+            entry['user'],
+            entry['type'],
+            entry.get('payment_method', ''),
+            debit,
+            credit,
+            entry['balance']
+        ], ['cell'] * 6 + [
+            'debit' if debit else 'cell',
+            'credit' if credit else 'cell',
+            'debit' if entry['balance'] < 0 else 'money'
+        ])
         
-        # Apply border to all cells in this row
-        for col in range(1, 10):
-            cell = ws.cell(row=row, column=col)
-            cell.border = border
+        # Wallet transactions only; orders paid from the wallet are Sales
+        if entry['source'] == 'wallet':
+            workbook.append('Wallet', [
+                date,
+                entry['transaction_id'],
+                entry['description'],
+                entry['user'],
+                entry['type'],
+                debit,
+                credit
+            ], ['cell'] * 5 + [
+                'debit' if debit else 'cell',
+                'credit' if credit else 'cell'
+            ])
     
     # Summary section
-    summary_row = len(ledger_entries) + 5
-    ws.cell(row=summary_row, column=5, value="SUMMARY:")
-    ws.cell(row=summary_row, column=5).font = Font(bold=True)
-    
-    total_debit = sum(e['debit'] for e in ledger_entries)
-    total_credit = sum(e['credit'] for e in ledger_entries)
-    final_balance = ledger_entries[-1]['balance'] if ledger_entries else 0
-    
-    ws.cell(row=summary_row + 1, column=5, value="Total Debit:")
-    debit_total_cell = ws.cell(row=summary_row + 1, column=6, value=total_debit)
-    debit_total_cell.font = debit_font
-    debit_total_cell.number_format = '#,##0.00'
-    
-    ws.cell(row=summary_row + 2, column=5, value="Total Credit:")
-    credit_total_cell = ws.cell(row=summary_row + 2, column=6, value=total_credit)
-    credit_total_cell.font = credit_font
-    credit_total_cell.number_format = '#,##0.00'
-    
-    ws.cell(row=summary_row + 3, column=5, value="Net Flow:")
-    net_flow_cell = ws.cell(row=summary_row + 3, column=6, value=total_debit - total_credit)
-    net_flow_cell.number_format = '#,##0.00'
-    
-    ws.cell(row=summary_row + 4, column=5, value="Final Balance:")
-    final_balance_cell = ws.cell(row=summary_row + 4, column=6, value=final_balance)
-    final_balance_cell.font = Font(bold=True)
-    final_balance_cell.number_format = '#,##0.00'
-    
-    # Auto-adjust column widths
-    for column in ws.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    wb.save(response)
-    return response
+    workbook.append('Summary', [title], 'title')
+    workbook.append('Summary', [])
+    workbook.append('Summary', ['SUMMARY:'], 'bold')
+    workbook.append('Summary', ['Opening Balance:', float(opening_balance)], [None, 'money'])
+    workbook.append('Summary', ['Total Debit:', total_debit], [None, 'debit'])
+    workbook.append('Summary', ['Total Credit:', total_credit], [None, 'credit'])
+    workbook.append('Summary', ['Net Flow:', total_debit - total_credit], [None, 'money'])
+    workbook.append('Summary', ['Final Balance:', final_balance], [None, 'money'])
+    
+    return workbook.response(f'ledger_book_{start_date}_to_{end_date}.xlsx')
 
 
 @login_required
@@ -826,32 +591,12 @@ def ledger_book_preview(request):
         start_date = (timezone.now() - timedelta(days=30)).date()
         end_date = timezone.now().date()
     
-    # Get counts
-    orders_count = Order.objects.filter(
-        created_at__date__gte=start_date,
-        created_at__date__lte=end_date,
-        payment_status__in=['completed', 'success']
-    ).count()
-    
-    wallet_count = WalletTransaction.objects.filter(
-        created_at__date__gte=start_date,
-        created_at__date__lte=end_date,
-        status='COMPLETED'
-    ).count()
-    
-    # Get revenue
-    total_revenue = Order.objects.filter(
-        created_at__date__gte=start_date,
-        created_at__date__lte=end_date,
-        payment_status__in=['completed', 'success']
-    ).aggregate(total=Sum('total_amount'))['total'] or 0
-    
-    total_refunds = WalletTransaction.objects.filter(
-        created_at__date__gte=start_date,
-        created_at__date__lte=end_date,
-        transaction_type='REFUND',
-        status='COMPLETED'
-    ).aggregate(total=Sum('amount'))['total'] or 0
+    # Same ledger query as the export, aggregated in one pass
+    totals = LedgerService.totals(start_date, end_date)
+    orders_count = totals['orders_count']
+    wallet_count = totals['wallet_count']
+    total_revenue = totals['total_revenue']
+    total_refunds = totals['total_refunds']
     
     return JsonResponse({
         'success': True,
@@ -198,6 +198,38 @@ def admin_approve_refund(request, refund_id):
         return JsonResponse({'success': False, 'message': str(e)})
 
 
+@staff_member_required
+def admin_bulk_approve_refunds(request):
+    """Approve several pending refunds at once (refund_ids[] in POST)"""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid method'})
+    
+    try:
+        refund_ids = request.POST.getlist('refund_ids')
+        if not refund_ids:
+            return JsonResponse({'success': False, 'message': 'No refunds selected'})
+        
+        results = WalletService.bulk_approve_refunds(
+            refund_ids,
+            approved_by=request.user
+        )
+        approved = [result for result in results if result['success']]
+        
+        return JsonResponse({
+            'success': bool(approved),
+            'message': f"{len(approved)} of {len(results)} refund(s) approved",
+            'results': [
+                {**result, 'amount': str(result['amount']) if result['amount'] is not None else None}
+                for result in results
+            ],
+        })
+            
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'message': 'Invalid refund id'})
+    except Exception as e:
+        return JsonResponse({'success': False, 'message': str(e)})
+
+
 @staff_member_required
 def admin_reject_refund(request, refund_id):
     """Reject pending refund"""
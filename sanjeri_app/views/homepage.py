@@ -2,7 +2,8 @@
 from django.shortcuts import render
 from django.core.paginator import Paginator
 from django.db.models import Q
-from ..models import Product, ProductVariant,Cart,CartItem,Wishlist
+from ..models import Product, ProductVariant,Cart,CartItem
+from ..services.personalization_service import PersonalizationService
 
 
 def homepage(request):
@@ -13,20 +14,14 @@ def homepage(request):
     all_products = Product.objects.filter(is_active=True, is_deleted=False)
     cart_item_count = 0
     
-    # Get wishlist product IDs for authenticated user
-    wishlist_product_ids = []
+    # Wishlist / cart membership comes from the cached per-user sets
+    personalization = PersonalizationService.for_request(request)
     if request.user.is_authenticated:
         try:
             cart = Cart.objects.get(user=request.user)
             cart_item_count = cart.total_items
         except Cart.DoesNotExist:
             pass
-        
-        try:
-            wishlist = Wishlist.objects.get(user=request.user)
-            wishlist_product_ids = list(wishlist.products.values_list('id', flat=True))
-        except Wishlist.DoesNotExist:
-            pass
     
     # Apply search filter if query exists
     if query:
@@ -65,18 +60,9 @@ def homepage(request):
         variants__is_active=True
     ).distinct()[:4]
 
-    # Add is_in_wishlist attribute to each product
-    for product in featured_products:
-        product.is_in_wishlist = product.id in wishlist_product_ids
-    
-    for product in mens_products:
-        product.is_in_wishlist = product.id in wishlist_product_ids
-    
-    for product in womens_products:
-        product.is_in_wishlist = product.id in wishlist_product_ids
-    
-    for product in unisex_products:
-        product.is_in_wishlist = product.id in wishlist_product_ids
+    # Flag wishlist membership on the (already sliced) sections only
+    for products in (featured_products, mens_products, womens_products, unisex_products):
+        personalization.apply(products)
 
     context = {
         'title': 'Home - Sanjeri',
@@ -90,7 +76,7 @@ def homepage(request):
         'search_results_count': search_results_count,
         'search_products': search_products,
         'cart_item_count': cart_item_count,
-        'wishlist_product_ids': wishlist_product_ids, 
+        'wishlist_product_ids': personalization.wishlist_product_ids,
         # 'wishlist_product_ids': list(wishlist_items),
     }
     return render(request, 'homepage.html', context)
@@ -2,20 +2,15 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.db.models import Q
 from django.template.loader import render_to_string
-from io import BytesIO
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
 from decimal import Decimal
 from django.utils import timezone
 from ..models import Order, OrderItem
 from ..models import Wallet, WalletTransaction
+from ..services.invoice_service import InvoiceService
 
 @login_required
 def order_list(request):
@@ -284,169 +279,9 @@ def use_wallet_payment(request):
 
 @login_required
 def download_invoice(request, order_id):
-    """Generate and download PDF invoice using ReportLab"""
+    """Download the order's stored PDF invoice (rendered once per revision)"""
     order = get_object_or_404(Order, id=order_id, user=request.user)
-    
-    # Check if wallet was used for this order
-    wallet_payment = WalletTransaction.objects.filter(
-        order=order,
-        transaction_type='WITHDRAWAL'
-    ).first()
-    
-    # Check if refund was made to wallet
-    wallet_refund = WalletTransaction.objects.filter(
-        order=order,
-        transaction_type='REFUND',
-        status='COMPLETED'
-    ).first()
-    
-    # Create a file-like buffer to receive PDF data
-    buffer = BytesIO()
-    
-    # Create the PDF object, using the buffer as its "file"
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Add title
-    title_style = styles['Heading1']
-    title_style.alignment = 1  # Center alignment
-    title = Paragraph("SANJERI PERFUMES", title_style)
-    elements.append(title)
-    
-    elements.append(Spacer(1, 12))
-    
-    # Add invoice title
-    invoice_title = Paragraph(f"INVOICE - #{order.order_number}", styles['Heading2'])
-    elements.append(invoice_title)
-    elements.append(Spacer(1, 12))
-    
-    # Order details
-    order_details = [
-        [f"Order Date: {order.created_at.strftime('%B %d, %Y')}", f"Status: {order.get_status_display()}"],
-        [f"Payment Method: {order.get_payment_method_display()}", f"Payment Status: {order.get_payment_status_display()}"],
-    ]
-    
-    order_table = Table(order_details, colWidths=[250, 250])
-    order_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
-    elements.append(order_table)
-    elements.append(Spacer(1, 20))
-    
-    # Billing information
-    billing_info = [
-        ['BILL TO:', 'SHIP TO:'],
-        [order.shipping_address.full_name, order.shipping_address.full_name],
-        [order.shipping_address.phone, order.shipping_address.phone],
-        [order.shipping_address.address_line1, order.shipping_address.address_line1],
-        [order.shipping_address.city, order.shipping_address.city],
-        [f"{order.shipping_address.state} - {order.shipping_address.postal_code}", 
-         f"{order.shipping_address.state} - {order.shipping_address.postal_code}"],
-    ]
-    
-    billing_table = Table(billing_info, colWidths=[250, 250])
-    billing_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-    ]))
-    elements.append(billing_table)
-    elements.append(Spacer(1, 20))
-    
-    # Order items header
-    items_header = [['Product', 'Variant', 'Quantity', 'Unit Price', 'Total']]
-    
-    # Order items data
-    items_data = []
-    for item in order.items.all():
-        items_data.append([
-            item.product_name,
-            item.variant_details,
-            str(item.quantity),
-            f"Rs.{item.unit_price}",  # Changed from ₹ to Rs.
-            f"Rs.{item.total_price}"   # Changed from ₹ to Rs.
-        ])
-    
-    # Combine header and data
-    items_table_data = items_header + items_data
-    
-    items_table = Table(items_table_data, colWidths=[180, 120, 60, 80, 80])
-    items_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
-    elements.append(items_table)
-    elements.append(Spacer(1, 20))
-    
-    # Order summary
-    summary_data = [
-        ['Subtotal:', f"Rs.{order.subtotal}"],  # Changed from ₹ to Rs.
-        ['Shipping:', f"Rs.{order.shipping_charge}" if order.shipping_charge > 0 else 'FREE'],
-        ['Tax (18%):', f"Rs.{order.tax_amount:.2f}"],  # Changed from ₹ to Rs.
-    ]
-    
-    if order.discount_amount > 0:
-        summary_data.append(['Discount:', f"-Rs.{order.discount_amount}"])  # Changed from ₹ to Rs.
-    
-    # Add wallet payment if used
-    if hasattr(order, 'wallet_amount_used') and order.wallet_amount_used > 0:
-        summary_data.append(['Wallet Payment:', f"-Rs.{order.wallet_amount_used:.2f}"])  # Changed from ₹ to Rs.
-    
-    summary_data.append(['TOTAL:', f"Rs.{order.total_amount:.2f}"])  # Changed from ₹ to Rs.
-    
-    summary_table = Table(summary_data, colWidths=[400, 120])
-    summary_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -2), 'Helvetica'),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
-    elements.append(summary_table)
-    elements.append(Spacer(1, 30))
-    
-    # Add refund information if applicable
-    if order.status in ['cancelled', 'returned'] and wallet_refund:
-        refund_info = Paragraph(
-            f"<b>REFUND INFORMATION:</b><br/>"
-            f"Refund Amount: Rs.{wallet_refund.amount}<br/>"  # Changed from ₹ to Rs.
-            f"Refund Method: Wallet<br/>"
-            f"Refund Date: {wallet_refund.created_at.strftime('%B %d, %Y')}<br/>"
-            f"Status: Refunded to customer's wallet",
-            styles['Normal']
-        )
-        elements.append(refund_info)
-        elements.append(Spacer(1, 20))
-    
-    # Footer
-    footer = Paragraph(
-        "Thank you for your business!<br/>"
-        "Sanjeri Perfumes - A Scent Beyond the Soul<br/>"
-        "For any queries, please contact our customer support",
-        styles['Normal']
-    )
-    elements.append(footer)
-    
-    # Build PDF
-    doc.build(elements)
-    
-    # File response
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="invoice_{order.order_number}.pdf"'
-    
-    return response
+    return InvoiceService.serve(request, order)
 
 @login_required
 def order_detail(request, order_id):
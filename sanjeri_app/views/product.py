@@ -7,9 +7,10 @@ from ..forms.product import ProductForm, ProductVariantFormSet, ProductVariantFo
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.db.models import Q
 from PIL import Image
-from io import BytesIO
-from django.core.files.base import ContentFile
 from django.http import Http404
+from django.db import transaction
+from ..services.media_blob_service import MediaBlobService
+from ..services.personalization_service import PersonalizationService
 
 
 def product_list(request):
@@ -174,24 +175,12 @@ def product_add(request):
                 
                 for i, img in enumerate(images[:10]):  # Limit to 10 images
                     try:
-                        # Process each additional image
-                        image = Image.open(img)
-                        if image.mode != 'RGB':
-                            image = image.convert('RGB')
+                        # Only check it is an image; renditions are generated by the worker
+                        Image.open(img).verify()
+                        img.seek(0)
                         
-                        # Resize to optimal size
-                        image.thumbnail((600, 600), Image.Resampling.LANCZOS)
-                        
-                        # Optimize and save
-                        buffer = BytesIO()
-                        image.save(buffer, format="JPEG", quality=85, optimize=True)
-                        buffer.seek(0)
-                        
-                        # Create ProductImage instance
-                        product_image = ProductImage(
-                            product=product,
-                            image=ContentFile(buffer.read(), f"optimized_{img.name}")
-                        )
+                        # Store the original
+                        product_image = ProductImage(product=product, image=img)
                         # Set first image as default
                         if i == 0:
                             product_image.is_default = True
@@ -254,17 +243,10 @@ def product_edit(request, pk):
                 images = request.FILES.getlist('images')
                 for img in images:
                     try:
-                        image = Image.open(img)
-                        image = image.convert("RGB")
-                        image = image.resize((600, 600))
-                        buffer = BytesIO()
-                        image.save(buffer, format="JPEG", quality=85)
-                        buffer.seek(0)
+                        Image.open(img).verify()
+                        img.seek(0)
                         
-                        product_image = ProductImage(
-                            product=product,
-                            image=ContentFile(buffer.read(), img.name)
-                        )
+                        product_image = ProductImage(product=product, image=img)
                         if not product.images.exists():
                             product_image.is_default = True
                         product_image.save()
@@ -335,7 +317,12 @@ def product_permanent_delete(request, pk):
     
     if request.method == 'POST':
         product_name = product.name
-        product.delete()
+        with transaction.atomic():
+            files = MediaBlobService.product_files(product)
+            product.delete()
+        # Image files may be shared with other products and past orders; only
+        # the ones nothing references any more are removed
+        MediaBlobService.release(files)
         messages.success(request, f"Product '{product_name}' has been permanently deleted.")
         return redirect('product_trash')
     
@@ -373,6 +360,7 @@ def product_detail(request, product_id):
             is_active=True, 
             is_deleted=False
         )
+        PersonalizationService.record_view(request.user, product.id)
         
         variants = product.variants.filter(is_active=True)
         product_images = product.images.all()
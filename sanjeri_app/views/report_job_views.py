@@ -0,0 +1,94 @@
+# sanjeri_app/views/report_job_views.py
+from datetime import datetime, timedelta
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse, HttpResponseNotModified
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+from ..models import ReportJob
+from ..services.report_job_service import ReportJobService
+from .sales_report_views import report_date_range
+
+
+def report_job_params(report_type, data):
+    """Concrete params for a report request; relative periods are resolved now"""
+    if report_type == 'sales_report':
+        start_date, end_date, date_label = report_date_range(
+            data.get('period', 'daily'),
+            data.get('custom_start'),
+            data.get('custom_end')
+        )
+        return ReportJobService.sales_report_params(start_date, end_date, date_label)
+
+    today = timezone.now().date()
+    try:
+        start_date = datetime.strptime(data.get('start_date', ''), '%Y-%m-%d').date()
+        end_date = datetime.strptime(data.get('end_date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        start_date = today - timedelta(days=30)
+        end_date = today
+    return ReportJobService.ledger_book_params(start_date, end_date)
+
+
+@staff_member_required
+@require_POST
+def request_report_job(request):
+    """
+    Queue a report export. POST report_type (sales_report / ledger_book),
+    format, and either period/custom_start/custom_end (sales report) or
+    start_date/end_date (ledger). An identical report already generated or
+    in progress is returned instead of queueing another.
+    """
+    report_type = request.POST.get('report_type')
+    export_format = request.POST.get('format', 'excel')
+
+    try:
+        ReportJobService.validate(report_type, export_format)
+        params = report_job_params(report_type, request.POST)
+        job, created = ReportJobService.request(report_type, params, export_format, user=request.user)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+    if created:
+        message = 'Report queued. It will be ready to download shortly.'
+    elif job.status == 'done':
+        message = 'This report is already available.'
+    else:
+        message = 'This report is already being generated.'
+
+    return JsonResponse({
+        'success': True,
+        'created': created,
+        'message': message,
+        'job': ReportJobService.status(job),
+    })
+
+
+@staff_member_required
+def report_job_status(request, job_id):
+    """Progress of a report job (polled by the admin pages)"""
+    job = get_object_or_404(ReportJob, id=job_id)
+    return JsonResponse({'success': True, 'job': ReportJobService.status(job)})
+
+
+@staff_member_required
+def download_report_job(request, job_id):
+    """Download the generated file of a finished report job"""
+    job = get_object_or_404(ReportJob, id=job_id)
+    if job.status == 'expired' or (job.status == 'done' and ReportJobService.find_done(job.cache_key) is None):
+        return JsonResponse({
+            'success': False,
+            'message': 'The report file has expired. Please request it again.',
+        }, status=410)
+
+    if job.status != 'done':
+        return JsonResponse({
+            'success': False,
+            'message': f'Report is not ready (status: {job.get_status_display()})',
+            'job': ReportJobService.status(job),
+        }, status=409)
+
+    if request.headers.get('If-None-Match') == f'"{job.cache_key}"':
+        return HttpResponseNotModified()
+
+    return ReportJobService.serve(job)
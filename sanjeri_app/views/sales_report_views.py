@@ -1,14 +1,11 @@
 # sales_report_views.py
-from django.shortcuts import render
+from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.http import HttpResponse, JsonResponse
-from django.db.models import Sum, Count, Avg, F, Q
+from django.db.models import Avg, F, Q
 from django.utils import timezone
 from datetime import timedelta, datetime
 import json
-from decimal import Decimal
-import csv
-import xlwt
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
@@ -17,24 +14,15 @@ from reportlab.lib import colors
 from io import BytesIO
 
 from ..models import Order, OrderItem, Coupon, ProductVariant
+from ..services.sales_report_service import SalesReport
+from ..services.report_job_service import ReportJobService
+from ..utils.export_utils import streaming_csv_response, XlsxExport, EXPORT_CHUNK_SIZE
 
 def is_admin(user):
     return user.is_authenticated and user.is_staff
 
-@login_required
-@user_passes_test(is_admin)
-def sales_report(request):
-    """Main sales report view"""
-    
-    # Get filter parameters
-    report_type = request.GET.get('report_type', 'daily')
-    custom_start = request.GET.get('custom_start')
-    custom_end = request.GET.get('custom_end')
-    
-    # Export format if specified
-    export_format = request.GET.get('export')
-    
-    # Set date range based on report type
+def report_date_range(report_type, custom_start=None, custom_end=None):
+    """(start_date, end_date, date_label) for a sales report period"""
     today = timezone.now().date()
     
     if report_type == 'daily':
@@ -73,88 +61,67 @@ def sales_report(request):
         end_date = today
         date_label = f"Daily Report - {today.strftime('%d %b %Y')}"
     
-    # Filter orders (only completed/delivered orders)
-    orders = Order.objects.filter(
+    return start_date, end_date, date_label
+
+
+def sales_report_orders(start_date, end_date):
+    """Orders listed and exported by the sales report (only completed/delivered orders)"""
+    return Order.objects.filter(
         created_at__date__range=[start_date, end_date],
         status__in=['confirmed', 'shipped', 'delivered', 'out_for_delivery']
     ).order_by('-created_at')
+
+
+def sales_report_export_data(start_date, end_date, date_label):
+    """Everything export_report needs; figures come from the cached SalesReport"""
+    return {
+        **SalesReport(start_date, end_date).get_data(),
+        'orders': sales_report_orders(start_date, end_date),
+        'start_date': start_date,
+        'end_date': end_date,
+        'date_label': date_label,
+    }
+
+
+@login_required
+@user_passes_test(is_admin)
+def sales_report(request):
+    """Main sales report view"""
     
-    # Calculate totals
-    total_sales_count = orders.count()
-    total_order_amount = orders.aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
-    total_discount = orders.aggregate(total=Sum('discount_amount'))['total'] or Decimal('0')
-    total_coupon_discount = orders.aggregate(total=Sum('coupon_discount'))['total'] or Decimal('0')
-    total_tax = orders.aggregate(total=Sum('tax_amount'))['total'] or Decimal('0')
-    total_shipping = orders.aggregate(total=Sum('shipping_charge'))['total'] or Decimal('0')
-    
-    # Net revenue (after discounts)
-    net_revenue = total_order_amount - total_discount - total_coupon_discount
+    # Get filter parameters
+    report_type = request.GET.get('report_type', 'daily')
+    custom_start = request.GET.get('custom_start')
+    custom_end = request.GET.get('custom_end')
     
-    # Calculate average order value
-    if total_sales_count > 0:
-        avg_order_value = total_order_amount / total_sales_count
-    else:
-        avg_order_value = Decimal('0')
+    # Export format if specified
+    export_format = request.GET.get('export')
     
-    # Get top selling products
-    top_products = OrderItem.objects.filter(
-        order__in=orders
-    ).values(
-        'variant__product__name',
-        'variant__volume_ml',
-        'variant__gender'
-    ).annotate(
-        total_quantity=Sum('quantity'),
-        total_revenue=Sum('total_price')
-    ).order_by('-total_quantity')[:10]
+    today = timezone.now().date()
+    start_date, end_date, date_label = report_date_range(report_type, custom_start, custom_end)
     
-    # Get coupon usage statistics
-    coupon_stats = orders.filter(coupon__isnull=False).values(
-        'coupon__code'
-    ).annotate(
-        usage_count=Count('id'),
-        total_discount=Sum('coupon_discount')
-    ).order_by('-usage_count')[:10]
+    # Handle export if requested
+    if export_format in ['csv', 'excel', 'pdf']:
+        # Serve the stored file when this exact report was already generated;
+        # otherwise queue it and come back to the page, which downloads it when ready
+        params = ReportJobService.sales_report_params(start_date, end_date, date_label)
+        response, job = ReportJobService.export_response('sales_report', params, export_format, user=request.user)
+        if response is not None:
+            return response
+        query = request.GET.copy()
+        del query['export']
+        query['job'] = job.id
+        return redirect(f"{request.path}?{query.urlencode()}")
     
-    # Get daily sales for chart (last 7 days)
-    last_7_days = []
-    daily_sales_data = []
-    for i in range(6, -1, -1):
-        date = today - timedelta(days=i)
-        daily_orders = Order.objects.filter(
-            created_at__date=date,
-            status__in=['confirmed', 'shipped', 'delivered', 'out_for_delivery']
-        )
-        daily_total = daily_orders.aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
-        
-        last_7_days.append(date.strftime('%b %d'))
-        daily_sales_data.append(float(daily_total))
+    orders = sales_report_orders(start_date, end_date)
     
-    # Payment method breakdown
-    payment_methods = orders.values('payment_method').annotate(
-        count=Count('id'),
-        total=Sum('total_amount')
-    ).order_by('-total')
+    # Every figure comes from the shared (cached) SalesReport, so viewing the
+    # report and exporting it run the aggregates once
+    report = SalesReport(start_date, end_date).get_data()
     
-    # Handle export if requested
-    if export_format in ['csv', 'excel', 'pdf']:
-        return export_report(request, {
-            'orders': orders,
-            'start_date': start_date,
-            'end_date': end_date,
-            'date_label': date_label,
-            'total_sales_count': total_sales_count,
-            'total_order_amount': total_order_amount,
-            'total_discount': total_discount,
-            'total_coupon_discount': total_coupon_discount,
-            'total_tax': total_tax,
-            'total_shipping': total_shipping,
-            'net_revenue': net_revenue,
-            'avg_order_value': avg_order_value,
-            'top_products': list(top_products),
-            'coupon_stats': list(coupon_stats),
-            'payment_methods': list(payment_methods),
-        }, export_format)
+    # Get daily sales for chart (last 7 days)
+    week_sales = SalesReport(today - timedelta(days=6), today).get_data()['daily_sales']
+    last_7_days = [day.strftime('%b %d') for day, total in week_sales]
+    daily_sales_data = [float(total) for day, total in week_sales]
     
     context = {
         'report_type': report_type,
@@ -166,19 +133,19 @@ def sales_report(request):
         'today': today,
         
         # Summary stats
-        'total_sales_count': total_sales_count,
-        'total_order_amount': total_order_amount,
-        'total_discount': total_discount,
-        'total_coupon_discount': total_coupon_discount,
-        'total_tax': total_tax,
-        'total_shipping': total_shipping,
-        'net_revenue': net_revenue,
-        'avg_order_value': avg_order_value,
+        'total_sales_count': report['total_sales_count'],
+        'total_order_amount': report['total_order_amount'],
+        'total_discount': report['total_discount'],
+        'total_coupon_discount': report['total_coupon_discount'],
+        'total_tax': report['total_tax'],
+        'total_shipping': report['total_shipping'],
+        'net_revenue': report['net_revenue'],
+        'avg_order_value': report['avg_order_value'],
         
         # Detailed data
-        'top_products': top_products,
-        'coupon_stats': coupon_stats,
-        'payment_methods': payment_methods,
+        'top_products': report['top_products'],
+        'coupon_stats': report['coupon_stats'],
+        'payment_methods': report['payment_methods'],
         
         # Chart data
         'last_7_days': json.dumps(last_7_days),
@@ -186,111 +153,136 @@ def sales_report(request):
         
         # For template
         'orders': orders[:50],  # Recent 50 orders
+        
+        # Export queued by the links above, followed until it downloads
+        'report_job': ReportJobService.status_by_id(request.GET.get('job')),
     }
     
     return render(request, 'admin/sales_report/report.html', context)
 
+def sales_report_csv_rows(data):
+    """CSV rows for export_report: summary first, then orders streamed in chunks"""
+    yield [data['date_label']]
+    yield []
+    yield ['SUMMARY']
+    yield ['Total Sales Count', data['total_sales_count']]
+    yield ['Total Order Amount', f"₹{data['total_order_amount']}"]
+    yield ['Total Discount', f"₹{data['total_discount']}"]
+    yield ['Total Coupon Discount', f"₹{data['total_coupon_discount']}"]
+    yield ['Total Tax', f"₹{data['total_tax']}"]
+    yield ['Total Shipping', f"₹{data['total_shipping']}"]
+    yield ['Net Revenue', f"₹{data['net_revenue']}"]
+    yield ['Average Order Value', f"₹{data['avg_order_value']:.2f}"]
+    yield []
+    yield []
+    
+    # Order details
+    yield ['ORDER DETAILS']
+    yield ['Order ID', 'Date', 'Customer', 'Amount', 'Discount', 'Coupon', 'Status', 'Payment']
+    
+    orders = data['orders'].select_related('user', 'coupon').iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for order in orders:
+        yield [
+            order.id,
+            order.created_at.strftime('%Y-%m-%d %H:%M'),
+            order.user.email if order.user else 'Guest',
+            f"₹{order.total_amount}",
+            f"₹{order.discount_amount}",
+            order.coupon.code if order.coupon else '-',
+            order.get_status_display(),
+            order.get_payment_method_display()
+        ]
+
+def sales_report_workbook(data):
+    """
+    Sales report as a write-only workbook: Summary, Orders and Items sheets,
+    each filled in a single pass over its own streaming queryset.
+    """
+    workbook = XlsxExport()
+    workbook.add_sheet('Summary', column_widths=[30, 18, 14, 18])
+    workbook.add_sheet('Orders', column_widths=[10, 18, 32, 14, 14, 16, 16, 16])
+    workbook.add_sheet('Items', column_widths=[10, 18, 32, 10, 10, 10, 14, 14])
+    
+    # Summary
+    workbook.append('Summary', [data['date_label']], 'title')
+    workbook.append('Summary', [])
+    workbook.append('Summary', ['SUMMARY', ''], 'header')
+    workbook.append('Summary', ['Total Sales Count', data['total_sales_count']], 'cell')
+    summary_data = [
+        ['Total Order Amount', data['total_order_amount']],
+        ['Total Discount', data['total_discount']],
+        ['Total Coupon Discount', data['total_coupon_discount']],
+        ['Total Tax', data['total_tax']],
+        ['Total Shipping', data['total_shipping']],
+        ['Net Revenue', data['net_revenue']],
+        ['Average Order Value', round(data['avg_order_value'], 2)],
+    ]
+    for row in summary_data:
+        workbook.append('Summary', row, ['cell', 'money'])
+    
+    workbook.append('Summary', [])
+    workbook.append('Summary', ['Payment Method', 'Orders', '', 'Total'], 'header')
+    for method in data['payment_methods']:
+        workbook.append('Summary', [method['payment_method'], method['count'], '', method['total']],
+                        ['cell', 'cell', 'cell', 'money'])
+    
+    if data['coupon_stats']:
+        workbook.append('Summary', [])
+        workbook.append('Summary', ['Coupon', 'Uses', '', 'Discount'], 'header')
+        for coupon in data['coupon_stats']:
+            workbook.append('Summary', [coupon['coupon__code'], coupon['usage_count'], '', coupon['total_discount']],
+                            ['cell', 'cell', 'cell', 'money'])
+    
+    # Orders
+    workbook.append('Orders', ['Order ID', 'Date', 'Customer', 'Amount', 'Discount', 'Coupon', 'Status', 'Payment'], 'header')
+    order_styles = [None, None, None, 'number', 'number', None, None, None]
+    for order in data['orders'].select_related('user', 'coupon').iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        workbook.append('Orders', [
+            order.id,
+            order.created_at.strftime('%Y-%m-%d %H:%M'),
+            order.user.email if order.user else 'Guest',
+            order.total_amount,
+            order.discount_amount,
+            order.coupon.code if order.coupon else '-',
+            order.get_status_display(),
+            order.get_payment_method_display()
+        ], order_styles)
+    
+    # Items
+    workbook.append('Items', ['Order ID', 'Date', 'Product', 'Size (ml)', 'Gender', 'Quantity', 'Unit Price', 'Total'], 'header')
+    item_styles = [None, None, None, None, None, None, 'number', 'number']
+    items = OrderItem.objects.filter(
+        order__in=data['orders'].order_by()
+    ).select_related(
+        'order', 'variant__product'
+    ).order_by('order__created_at', 'order_id', 'id')
+    for item in items.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        workbook.append('Items', [
+            item.order_id,
+            item.order.created_at.strftime('%Y-%m-%d %H:%M'),
+            item.variant.product.name,
+            item.variant.volume_ml,
+            item.variant.gender,
+            item.quantity,
+            item.unit_price,
+            item.total_price
+        ], item_styles)
+    
+    return workbook
+
 def export_report(request, data, export_format):
     """Export report in various formats"""
     
     if export_format == 'csv':
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="sales_report_{data["start_date"]}_to_{data["end_date"]}.csv"'
-        
-        writer = csv.writer(response)
-        
-        # Write header
-        writer.writerow([data['date_label']])
-        writer.writerow([])
-        writer.writerow(['SUMMARY'])
-        writer.writerow(['Total Sales Count', data['total_sales_count']])
-        writer.writerow(['Total Order Amount', f"₹{data['total_order_amount']}"])
-        writer.writerow(['Total Discount', f"₹{data['total_discount']}"])
-        writer.writerow(['Total Coupon Discount', f"₹{data['total_coupon_discount']}"])
-        writer.writerow(['Total Tax', f"₹{data['total_tax']}"])
-        writer.writerow(['Total Shipping', f"₹{data['total_shipping']}"])
-        writer.writerow(['Net Revenue', f"₹{data['net_revenue']}"])
-        writer.writerow(['Average Order Value', f"₹{data['avg_order_value']:.2f}"])
-        writer.writerow([])
-        writer.writerow([])
-        
-        # Write order details
-        writer.writerow(['ORDER DETAILS'])
-        writer.writerow(['Order ID', 'Date', 'Customer', 'Amount', 'Discount', 'Coupon', 'Status', 'Payment'])
-        
-        for order in data['orders']:
-            writer.writerow([
-                order.id,
-                order.created_at.strftime('%Y-%m-%d %H:%M'),
-                order.user.email if order.user else 'Guest',
-                f"₹{order.total_amount}",
-                f"₹{order.discount_amount}",
-                order.coupon.code if order.coupon else '-',
-                order.get_status_display(),
-                order.get_payment_method_display()
-            ])
-        
-        return response
+        return streaming_csv_response(
+            f'sales_report_{data["start_date"]}_to_{data["end_date"]}.csv',
+            sales_report_csv_rows(data)
+        )
     
     elif export_format == 'excel':
-        response = HttpResponse(content_type='application/ms-excel')
-        response['Content-Disposition'] = f'attachment; filename="sales_report_{data["start_date"]}_to_{data["end_date"]}.xls"'
-        
-        wb = xlwt.Workbook(encoding='utf-8')
-        ws = wb.add_sheet('Sales Report')
-        
-        row_num = 0
-        
-        # Title
-        title_style = xlwt.easyxf('font: bold 1, height 280; align: horiz center')
-        ws.write_merge(row_num, row_num, 0, 7, data['date_label'], title_style)
-        row_num += 2
-        
-        # Summary header
-        header_style = xlwt.easyxf('font: bold 1; pattern: pattern solid, fore_colour light_green;')
-        ws.write(row_num, 0, 'SUMMARY', header_style)
-        ws.write(row_num, 1, '', header_style)
-        row_num += 1
-        
-        # Summary data
-        summary_data = [
-            ['Total Sales Count', data['total_sales_count']],
-            ['Total Order Amount', f"₹{data['total_order_amount']}"],
-            ['Total Discount', f"₹{data['total_discount']}"],
-            ['Total Coupon Discount', f"₹{data['total_coupon_discount']}"],
-            ['Total Tax', f"₹{data['total_tax']}"],
-            ['Total Shipping', f"₹{data['total_shipping']}"],
-            ['Net Revenue', f"₹{data['net_revenue']}"],
-            ['Average Order Value', f"₹{data['avg_order_value']:.2f}"],
-        ]
-        
-        for row in summary_data:
-            ws.write(row_num, 0, row[0])
-            ws.write(row_num, 1, row[1])
-            row_num += 1
-        
-        row_num += 1
-        
-        # Orders header
-        order_header = ['Order ID', 'Date', 'Customer', 'Amount', 'Discount', 'Coupon', 'Status', 'Payment']
-        for col_num, header in enumerate(order_header):
-            ws.write(row_num, col_num, header, header_style)
-        row_num += 1
-        
-        # Orders data
-        for order in data['orders']:
-            ws.write(row_num, 0, order.id)
-            ws.write(row_num, 1, order.created_at.strftime('%Y-%m-%d %H:%M'))
-            ws.write(row_num, 2, order.user.email if order.user else 'Guest')
-            ws.write(row_num, 3, float(order.total_amount))
-            ws.write(row_num, 4, float(order.discount_amount))
-            ws.write(row_num, 5, order.coupon.code if order.coupon else '-')
-            ws.write(row_num, 6, order.get_status_display())
-            ws.write(row_num, 7, order.get_payment_method_display())
-            row_num += 1
-        
-        wb.save(response)
-        return response
+        return sales_report_workbook(data).response(
+            f'sales_report_{data["start_date"]}_to_{data["end_date"]}.xlsx'
+        )
     
     elif export_format == 'pdf':
         response = HttpResponse(content_type='application/pdf')
@@ -337,7 +329,7 @@ def export_report(request, data, export_format):
         elements.append(Paragraph("RECENT ORDERS", styles['Heading2']))
         
         order_data = [['Order ID', 'Date', 'Customer', 'Amount', 'Status']]
-        for order in list(data['orders'])[:20]:  # Limit to 20 in PDF
+        for order in data['orders'].select_related('user')[:20]:  # Limit to 20 in PDF
             customer_email = order.user.email if order.user else 'Guest'
             if len(customer_email) > 20:
                 customer_email = customer_email[:20] + '...'
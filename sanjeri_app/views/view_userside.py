@@ -6,9 +6,9 @@ from django.http import HttpResponse
 from django.db.models import Q
 from django.db import models 
 from django.db.models.functions import Coalesce
-from ..models import Wishlist,WishlistItem
 from ..models.offer_models import ProductOffer, CategoryOffer
 from django.utils import timezone
+from ..services.personalization_service import PersonalizationService
 
 def home(request):
     """Home page view showing variants individually"""
@@ -75,19 +75,14 @@ def men_products(request):
     gender_filter = request.GET.get('gender', 'Male')  # Add this line
     
     cart_item_count = 0
-    wishlist_product_ids = []
+    # Wishlist membership comes from the cached per-user set, applied to the page only
+    personalization = PersonalizationService.for_request(request)
     if request.user.is_authenticated:
         try:
             cart = Cart.objects.get(user=request.user)
             cart_item_count = cart.total_items
         except Cart.DoesNotExist:
             pass
-            
-        try:
-            wishlist = Wishlist.objects.get(user=request.user)
-            wishlist_product_ids = list(wishlist.products.values_list('id', flat=True))
-        except Wishlist.DoesNotExist:
-            pass
 
     
     # Start with VARIANTS, not products
@@ -152,11 +147,6 @@ def men_products(request):
     else:  # featured (default)
         variants = variants.filter(product__is_featured=True).order_by('-product__created_at')
     
-    # Add wishlist status to each variant's product
-    for variant in variants:
-        variant.product.is_in_wishlist = variant.product.id in wishlist_product_ids
-    
-
     # Get available filter options
     available_volumes = ProductVariant.objects.filter(
         product__is_active=True,
@@ -185,11 +175,12 @@ def men_products(request):
     paginator = Paginator(variants, 5)  # Changed from 5 to 12 for 4 per row × 3 rows
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    personalization.apply(page_obj)
     
     context = {
         'variants': page_obj,  # Use paginated variants
         'page_obj': page_obj,
-        'products_count': variants.count(),
+        'products_count': paginator.count,
         'search_query': search_query,
         'sort_by': sort_by,
         'available_volumes': available_volumes,
@@ -220,21 +211,14 @@ def women_products(request):
     volume = request.GET.get('volume', '')
     
     cart_item_count = 0
-    wishlist_product_ids = []
+    # Wishlist membership comes from the cached per-user set, applied to the page only
+    personalization = PersonalizationService.for_request(request)
     if request.user.is_authenticated:
         try:
             cart = Cart.objects.get(user=request.user)
             cart_item_count = cart.total_items
         except Cart.DoesNotExist:
             pass
-
-        try:
-            wishlist = Wishlist.objects.get(user=request.user)
-            wishlist_product_ids = list(WishlistItem.objects.filter(
-                wishlist=wishlist
-            ).values_list('product_id', flat=True))        
-        except Wishlist.DoesNotExist:
-            pass
     
     # DEBUG: Print filter parameters
     print(f"=== DEBUG WOMEN FILTERS ===")
@@ -333,11 +317,6 @@ def women_products(request):
     else:  # featured (default)
         variants = variants.filter(product__is_featured=True).order_by('-product__created_at')
     
-    # Then for each variant, add:
-    for variant in variants:
-        variant.product.is_in_wishlist = variant.product.id in wishlist_product_ids
-
-
     print(f"Final variants count before pagination: {variants.count()}")
     print("=== END DEBUG ===")
     
@@ -345,6 +324,7 @@ def women_products(request):
     paginator = Paginator(variants, 5)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    personalization.apply(page_obj)
     
     # Get available filter options
     available_volumes = ProductVariant.objects.filter(
@@ -375,7 +355,7 @@ def women_products(request):
     context = {
         'variants': page_obj,  # Use paginated variants
         'page_obj': page_obj,
-        'products_count': variants.count(),
+        'products_count': paginator.count,
         'search_query': search_query,
         'sort_by': sort_by,
         'available_volumes': available_volumes,
@@ -383,7 +363,7 @@ def women_products(request):
         'available_occasions': available_occasions,
         'title': 'Women\'s Fragrances - Sanjeri',
         'cart_item_count': cart_item_count,
-        'wishlist_count': len(wishlist_product_ids),
+        'wishlist_count': len(personalization.wishlist_product_ids),
         'active_filters': {
             'price_range': price_range,
             'fragrance_type': fragrance_type,
@@ -406,19 +386,14 @@ def unisex_products(request):
     volume = request.GET.get('volume', '')
     
     cart_item_count = 0
-    wishlist_product_ids = []
+    # Wishlist membership comes from the cached per-user set, applied to the page only
+    personalization = PersonalizationService.for_request(request)
     if request.user.is_authenticated:
         try:
             cart = Cart.objects.get(user=request.user)
             cart_item_count = cart.total_items
         except Cart.DoesNotExist:
             pass
-
-        try:
-            wishlist = Wishlist.objects.get(user=request.user)
-            wishlist_product_ids = list(wishlist.products.values_list('id', flat=True))
-        except Wishlist.DoesNotExist:
-            pass
     
     # DEBUG: Print filter parameters
     print(f"=== DEBUG UNISEX FILTERS ===")
@@ -518,11 +493,6 @@ def unisex_products(request):
     else:  # featured (default)
         variants = variants.filter(product__is_featured=True).order_by('-product__created_at')
     
-     # Then for each variant, add:
-    for variant in variants:
-        variant.product.is_in_wishlist = variant.product.id in wishlist_product_ids
-
-
     print(f"Final variants count before pagination: {variants.count()}")
     print("=== END DEBUG ===")
     
@@ -556,13 +526,12 @@ def unisex_products(request):
     ).distinct()
     
     # For each variant, check if its product is in wishlist
-    for variant in page_obj.object_list:
-        variant.product.is_in_wishlist = variant.product.id in wishlist_product_ids
+    personalization.apply(page_obj)
     
     context = {
         'variants': page_obj,  # Use paginated variants, not all variants
         'page_obj': page_obj,
-        'products_count': variants.count(),
+        'products_count': paginator.count,
         'search_query': search_query,
         'sort_by': sort_by,
         'available_volumes': available_volumes,
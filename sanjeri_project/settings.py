@@ -141,6 +141,10 @@ AUTH_USER_MODEL = 'sanjeri_app.CustomUser'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Rendered invoice PDFs carry customer addresses, so they are kept out of
+# MEDIA_ROOT (and out of git); point this at persistent storage in production
+INVOICE_ROOT = os.getenv('INVOICE_ROOT', os.path.join(BASE_DIR, 'invoices'))
+
 # Email configuration - FROM .env
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
@@ -208,6 +212,44 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 
+# Shared cache for report figures and dashboard widgets. Set REDIS_URL in
+# production so the web workers and the refresh_dashboard process share
+# entries (needs the redis package); without it each process keeps its own.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+    # Sessions read through the cache, so cache-only endpoints (the header
+    # summary's 304s) don't need the database
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Generated report exports (run_report_jobs command) hold customer data:
+# kept out of MEDIA_ROOT and git, and deleted this many days after they finish
+REPORT_ARTIFACT_ROOT = os.getenv('REPORT_ARTIFACT_ROOT', os.path.join(BASE_DIR, 'report_artifacts'))
+REPORT_ARTIFACT_MAX_AGE_DAYS = int(os.getenv('REPORT_ARTIFACT_MAX_AGE_DAYS', 7))
+
+# Catalog files uploaded from the admin, kept until process_catalog_imports
+# has imported them
+CATALOG_IMPORT_ROOT = os.getenv('CATALOG_IMPORT_ROOT', os.path.join(BASE_DIR, 'catalog_imports'))
+
+# Seconds between admin dashboard widget refreshes (refresh_dashboard command)
+DASHBOARD_REFRESH_INTERVAL = int(os.getenv('DASHBOARD_REFRESH_INTERVAL', 300))
+
+# Stock forecasting (forecast_stock command): reorder point = daily velocity
+# x (supplier lead time + safety days)
+STOCK_LEAD_TIME_DAYS = int(os.getenv('STOCK_LEAD_TIME_DAYS', 7))
+STOCK_SAFETY_DAYS = int(os.getenv('STOCK_SAFETY_DAYS', 3))
+
+# Wishlist price-drop / back-in-stock mails (send_wishlist_notifications
+# command): the same product and kind is mailed to a user at most once per
+# dedup window, and no user gets more than the cap in 24 hours
+WISHLIST_NOTIFICATION_DEDUP_HOURS = int(os.getenv('WISHLIST_NOTIFICATION_DEDUP_HOURS', 72))
+WISHLIST_NOTIFICATION_DAILY_CAP = int(os.getenv('WISHLIST_NOTIFICATION_DAILY_CAP', 3))
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000')
+
 # Razorpay Configuration - Load from .env file
 RAZORPAY_KEY_ID = os.getenv('RAZORPAY_KEY_ID')
 RAZORPAY_KEY_SECRET = os.getenv('RAZORPAY_KEY_SECRET')